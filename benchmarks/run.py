@@ -0,0 +1,250 @@
+"""
+CPU-only benchmarks of transcript formatting, prompt composition and pipeline orchestration.
+
+Usage (from the repository root):
+    python -m benchmarks.run                          # run and compare with benchmarks/baselines/default.json
+    python -m benchmarks.run --save_baseline          # run and overwrite the baseline
+    python -m benchmarks.run --sizes 10000 --repeat 5 --cases format_transcript,format_timestamp
+
+Each case reports the median wall time of `--repeat` runs. A case regresses when its median exceeds
+the baseline by more than `--tolerance` (relative), in which case the process exits with status 1.
+Baselines are machine-specific: regenerate them on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+SRC_DIR = Path(__file__).parent.parent / "src"
+# The packages import shared helpers (`utils`) as a top-level package, as they do under the entry points
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+# Wall time allowed for the CLI to print --help, independent of the baseline. Importing the model code
+# (torch, whisperx) alone takes several seconds, so exceeding this means a heavy import became eager.
+STARTUP_BUDGET_SECONDS = 1.0
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+SPEAKERS = [f"SPEAKER_{index:02d}" for index in range(8)]
+WORDS = "the quarterly numbers look good but we still need to review the hiring plan next week".split()
+
+
+def synthetic_segments(count: int, seed: int = 0, change_probability: float = 0.6) -> list[dict]:
+    """
+    Generates WhisperX-like speaker-labelled segments with frequent speaker changes.
+
+    Args:
+        count (int): Number of segments.
+        seed (int): Random seed, so every run formats the same input.
+        change_probability (float): Probability that a segment starts a new speaker turn.
+    """
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    speaker = SPEAKERS[0]
+    for _ in range(count):
+        if rng.random() < change_probability:
+            speaker = rng.choice(SPEAKERS)
+        duration = rng.uniform(0.5, 6.0)
+        text = " ".join(rng.choices(WORDS, k=rng.randint(3, 15)))
+        segments.append({"start": start, "end": start + duration, "text": f" {text} ", "speaker": speaker})
+        start += duration + rng.uniform(0.0, 0.5)
+    return segments
+
+
+def _time(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {"median_seconds": statistics.median(timings), "min_seconds": min(timings), "repeat": repeat}
+
+
+def bench_format_transcript(sizes: list[int], repeat: int) -> dict:
+    from src.voice.voice_module import format_transcript
+    results = {}
+    for size in sizes:
+        segments = synthetic_segments(size)
+        result = _time(lambda: format_transcript(segments), repeat)
+        result["segments_per_second"] = size / result["median_seconds"]
+        results[f"format_transcript[{size}]"] = result
+    return results
+
+
+def bench_format_timestamp(sizes: list[int], repeat: int) -> dict:
+    from src.voice.voice_module import format_timestamp
+    results = {}
+    for size in sizes:
+        rng = random.Random(size)
+        values = [rng.uniform(0, 36_000) for _ in range(size)]
+        result = _time(lambda: [format_timestamp(value) for value in values], repeat)
+        result["calls_per_second"] = size / result["median_seconds"]
+        results[f"format_timestamp[{size}]"] = result
+    return results
+
+
+def bench_composed_prompt(repeat: int, iterations: int = 1000) -> dict:
+    from src.llm.template_manager import TemplateManager
+    from src.voice.voice_module import format_transcript
+    template_manager = TemplateManager(base_dir=str(Path(__file__).parent.parent / "src" / "prompts"))
+    transcript = format_transcript(synthetic_segments(2_000))
+    languages = ["en", "ko", "ja", "fr", "zh"]
+
+    def compose():
+        for index in range(iterations):
+            template_manager.get_composed_prompt(languages[index % len(languages)])
+
+    def compose_and_render():
+        for language in languages:
+            template_manager.get_composed_prompt(language).format(transcript=transcript, language=language)
+
+    compose_result = _time(compose, repeat)
+    compose_result["calls_per_second"] = iterations / compose_result["median_seconds"]
+    return {f"get_composed_prompt[{iterations}]": compose_result,
+            "get_composed_prompt+format[2000 segments]": _time(compose_and_render, repeat)}
+
+
+def bench_end_to_end(sizes: list[int], repeat: int) -> dict:
+    """
+    Times parse_speakers_and_transcript -> LLMModule.summarize_transcript with every model stubbed,
+    which isolates the orchestration overhead (validation, model pool, formatting, prompt rendering).
+    """
+    from src.llm.llm_module import LLMModule
+    from src.voice import voice_module
+    from src.voice.model_pool import ModelPool
+
+    results = {}
+    for size in sizes:
+        segments = synthetic_segments(size)
+        model = MagicMock()
+        model.transcribe.return_value = {"language": "en", "segments": segments}
+        with patch.object(voice_module.torch.cuda, "is_available", return_value=False), \
+                patch.object(voice_module.whisperx, "load_audio", return_value=[0.0] * 16_000), \
+                patch.object(voice_module.whisperx, "load_model", return_value=model), \
+                patch.object(voice_module.whisperx, "load_align_model", return_value=(MagicMock(), {})), \
+                patch.object(voice_module.whisperx, "align", return_value={"segments": segments}), \
+                patch.object(voice_module.whisperx, "assign_word_speakers", return_value={"segments": segments}), \
+                patch.object(voice_module, "DiarizationPipeline"), \
+                patch.dict(os.environ, {"MODEL_TYPE": "stub", "COMPUTE_TYPE": "float32"}):
+            llm = LLMModule("stub-model", chunk_tokens=0)
+            pool = ModelPool()
+
+            def run():
+                transcript = voice_module.parse_speakers_and_transcript(
+                    "audio.wav", "en", 1, 8, "hf-token", model_pool=pool)
+                llm.summarize_transcript(transcript, "en")
+
+            result = _time(run, repeat)
+        result["segments_per_second"] = size / result["median_seconds"]
+        results[f"end_to_end[{size}]"] = result
+    return results
+
+
+def bench_cli_startup(repeat: int) -> dict:
+    """Times `main.py --help` and `server.py --help` in fresh interpreters (import and argument parsing cost)."""
+    results = {}
+    for script in ("main.py", "server.py"):
+        command = [sys.executable, str(SRC_DIR / script), "--help"]
+        result = _time(lambda: subprocess.run(command, check=True, capture_output=True), repeat)
+        result["budget_seconds"] = STARTUP_BUDGET_SECONDS
+        results[f"cli_startup[{script}]"] = result
+    return results
+
+
+CASES = {
+    "format_transcript": lambda sizes, repeat: bench_format_transcript(sizes, repeat),
+    "format_timestamp": lambda sizes, repeat: bench_format_timestamp(sizes, repeat),
+    "composed_prompt": lambda sizes, repeat: bench_composed_prompt(repeat),
+    # The stubbed pipeline is dominated by formatting, so its largest size is capped
+    "end_to_end": lambda sizes, repeat: bench_end_to_end([size for size in sizes if size <= 100_000], repeat),
+    "cli_startup": lambda sizes, repeat: bench_cli_startup(repeat),
+}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Returns a description of every case whose median time regressed beyond `tolerance` (relative), or
+    exceeded its absolute `budget_seconds`. Cases missing from the baseline are only checked against
+    their budget.
+    """
+    regressions = []
+    for name, result in results.items():
+        budget = result.get("budget_seconds")
+        if budget is not None and result["median_seconds"] > budget:
+            regressions.append(f"{name}: {result['median_seconds']:.4f}s exceeds the {budget:.2f}s budget")
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        ratio = result["median_seconds"] / reference["median_seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {result['median_seconds']:.4f}s vs baseline "
+                               f"{reference['median_seconds']:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="VoiceSummary benchmarks (CPU only)")
+    parser.add_argument("--sizes", type=str, help="Comma-separated segment counts",
+                        default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, help="Runs per case; the median is reported", default=3)
+    parser.add_argument("--cases", type=str, help=f"Comma-separated cases: {', '.join(CASES)}",
+                        default=",".join(CASES))
+    parser.add_argument("--baseline", type=str, help="Baseline file",
+                        default=str(BASELINE_DIR / "default.json"))
+    parser.add_argument("--save_baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, help="Allowed relative slowdown before failing", default=0.25)
+    parser.add_argument("--output", type=str, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    results = {}
+    for case in cases:
+        for name, result in CASES[case](sizes, args.repeat).items():
+            results[name] = result
+            print(f"{name:<45} {result['median_seconds'] * 1000:10.2f} ms")
+    report = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "results": results}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline saved: {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save_baseline to create one.")
+        return 0
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("environment") != report["environment"]:
+        print("Warning: baseline was recorded on a different environment, timings may not be comparable.")
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    # Silence the per-call INFO logs of the pipeline so they do not dominate the timings
+    import logging
+    logging.disable(logging.INFO)
+    sys.exit(main())
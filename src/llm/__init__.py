@@ -1,3 +1,25 @@
-from .llm_module import LLMModule
+import importlib
 
-__all__ = ["LLMModule"]
+# Public name -> submodule, imported on first access so that the LLM clients are only loaded when used
+_EXPORTS = {
+    "LLMModule": ".llm_module",
+    "estimate_tokens": ".chunking",
+    "iter_chunks": ".chunking",
+    "split_transcript": ".chunking",
+    "SummaryCache": ".summary_cache",
+    "summary_cache_from_env": ".summary_cache",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
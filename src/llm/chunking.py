@@ -0,0 +1,86 @@
+import re
+
+# Characters of CJK scripts (Hangul, Kana, CJK ideographs) are roughly one token each for common tokenizers
+_CJK_PATTERN = re.compile(r"[ᄀ-ᇿ぀-ヿ㄰-㆏㐀-䶿一-鿿가-힯豈-﫿]")
+BLOCK_SEPARATOR = "\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in a text without loading a tokenizer.
+
+    CJK characters count as one token each and other characters as a quarter token,
+    which is close enough for budgeting prompt sizes.
+    """
+    cjk_chars = len(_CJK_PATTERN.findall(text))
+    return cjk_chars + (len(text) - cjk_chars + 3) // 4
+
+
+def _split_oversized_block(block: str, max_tokens: int) -> list[str]:
+    pieces = []
+    current = []
+    current_tokens = 0
+    for word in block.split(" "):
+        word_tokens = estimate_tokens(word) + 1
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def iter_chunks(blocks, max_tokens: int):
+    """
+    Groups speaker blocks into chunks of at most `max_tokens` estimated tokens, lazily.
+
+    Each chunk is yielded as soon as the next block would overflow it, so `blocks` can be a
+    generator that is still being produced (see `voice.iter_transcript_blocks`). A single block
+    larger than the budget is split on word boundaries.
+
+    Args:
+        blocks (Iterable[str]): Speaker blocks in transcript order.
+        max_tokens (int): Token budget of one chunk.
+
+    Yields:
+        str: Chunks in transcript order, joined with the block separator.
+    """
+    if max_tokens < 1:
+        raise ValueError(f"max_tokens must be a positive integer. Current value: {max_tokens}")
+    current = []
+    current_tokens = 0
+    for block in blocks:
+        if not block.strip():
+            continue
+        block_tokens = estimate_tokens(block)
+        pieces = [block] if block_tokens <= max_tokens else _split_oversized_block(block, max_tokens)
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                yield BLOCK_SEPARATOR.join(current)
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        yield BLOCK_SEPARATOR.join(current)
+
+
+def split_transcript(transcript: str, max_tokens: int) -> list[str]:
+    """
+    Splits a formatted transcript into chunks of at most `max_tokens` estimated tokens.
+
+    Chunks are cut on the speaker-block boundaries produced by `format_transcript` (blocks
+    separated by blank lines); a single block larger than the budget is split on word boundaries.
+
+    Args:
+        transcript (str): Formatted transcript.
+        max_tokens (int): Token budget of one chunk.
+
+    Returns:
+        list[str]: Chunks in transcript order, joined back with the block separator.
+    """
+    return list(iter_chunks(transcript.split(BLOCK_SEPARATOR), max_tokens))
@@ -1,17 +1,121 @@
 # from huggingface_hub import hf_hub_download # TODO : future
 import os
+import asyncio
+import hashlib
 import logging
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Iterable
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
 from .template_manager import TemplateManager
+from .chunking import BLOCK_SEPARATOR, estimate_tokens, iter_chunks, split_transcript
+from .summary_cache import SummaryCache, summary_key
+from .usage import UsageCallbackHandler
 
 logger = logging.getLogger(__name__)
 
+# How often an async request polls for a free concurrency slot, which is shared with other threads
+SLOT_POLL_SECONDS = 0.01
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, default))
+    except ValueError:
+        raise ValueError(
+            f"{name} must be a number. Current value: {os.getenv(name)}")
+    if value < 0:
+        raise ValueError(
+            f"{name} must not be negative. Current value: {value}")
+    return value
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        raise ValueError(
+            f"{name} must be a number. Current value: {os.getenv(name)}")
+    if value < 0:
+        raise ValueError(
+            f"{name} must not be negative. Current value: {value}")
+    return value
+
+
+def _status_code(error: BaseException) -> int | None:
+    # ollama.ResponseError and openai.APIStatusError carry the status code, httpx.HTTPStatusError its response
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed LLM request may succeed when sent again: timeouts, connection errors, rate limiting
+    (429) and server errors (5xx). Authentication, bad requests and other client errors are not retried.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status_code = _status_code(error)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    # The client libraries are only checked once they are loaded by the selected backend
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, openai.APIConnectionError)
+
+
+def _stub_response(prompt_value) -> AIMessage:
+    # Deterministic offline answer so the service can be exercised without an LLM server
+    prompt = prompt_value.to_string()
+    return AIMessage(content=f"# Stub summary\n\nPrompt of {len(prompt)} characters, "
+                             f"{prompt.count(chr(10)) + 1} lines.")
+
 
 class LLMModule:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, chunk_tokens: int | None = None, max_concurrency: int | None = None,
+                 metrics=None, summary_cache: SummaryCache | None = None):
+        """
+        Args:
+            model_name (str): Name of the LLM model served by the backend selected with MODEL_TYPE.
+            chunk_tokens (int | None): Estimated token budget of one transcript chunk. Longer transcripts are
+                summarized with map-reduce. 0 disables chunking. Defaults to LLM_CHUNK_TOKENS (0, off).
+            max_concurrency (int | None): Maximum number of LLM requests in flight at once, which is also the
+                size of the HTTP connection pool. Defaults to LLM_MAX_CONCURRENCY (4).
+            metrics: Optional run metrics collector (see `pipeline.metrics.RunMetrics`). Each summary is timed
+                as the "summarize" stage and each LLM call's latency and token usage is recorded.
+            summary_cache (SummaryCache | None): Optional cache of finished summaries. A transcript summarized
+                before with the same prompts, language, model and backend is answered without an LLM call.
+                Hits and misses are counted as "summary_cache_hit" and "summary_cache_miss". None bypasses it.
+
+        Environment:
+            LLM_TIMEOUT: Timeout in seconds of one LLM request attempt (default: 600).
+            LLM_MAX_RETRIES: Retries of a failed request, with exponential backoff (default: 2).
+            LLM_RETRY_BACKOFF: Base backoff delay in seconds between retries (default: 1).
+        """
         self.model_name = model_name
         self.model = None
+        self.chunk_tokens = chunk_tokens if chunk_tokens is not None else _env_int("LLM_CHUNK_TOKENS", 0)
+        self.max_concurrency = max(
+            max_concurrency if max_concurrency is not None else _env_int("LLM_MAX_CONCURRENCY", 4), 1)
+        self.timeout = _env_float("LLM_TIMEOUT", 600) or None
+        self.max_retries = _env_int("LLM_MAX_RETRIES", 2)
+        self.retry_backoff = _env_float("LLM_RETRY_BACKOFF", 1)
+        # One limit for every request of this instance: sync and async, from any thread or event loop
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._request_executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix="llm-request")
+        self.metrics = metrics
+        self.summary_cache = summary_cache
+        self._callbacks = [UsageCallbackHandler(metrics, model_name)] if metrics is not None else []
         # TODO : Download LLM model from Hugging Face in Local inference mode.
         # self.model_path = os.path.join(
         #     os.getenv("MODEL_DIR", "./models"), self.model_name)
@@ -19,17 +123,21 @@ class LLMModule:
         #     self.download_llm_model() # TODO : Download LLM model from Hugging Face in Local inference mode.
         self.template_manager = TemplateManager(
             base_dir=os.getenv("PROMPTS_DIR", "src/prompts"))
-        model_type = os.getenv("MODEL_TYPE", "ollama")
+        # Only the client library of the selected backend is imported
+        model_type = self.model_type = os.getenv("MODEL_TYPE", "ollama")
         if model_type == "ollama":
+            from langchain_ollama import ChatOllama
             self.model = ChatOllama(model=self.model_name, base_url=os.getenv(
-                "BASE_URL", "http://localhost:11434"))
+                "BASE_URL", "http://localhost:11434"), client_kwargs={"timeout": self.timeout,
+                                                                      "limits": self._http_limits()})
         # TODO : Add other model types here.
+        elif model_type == "stub":
+            self.model = RunnableLambda(_stub_response)
         elif model_type == "chatgpt":
-            self.model = ChatOpenAI(
-                model=self.model_name, api_key=os.getenv("OPENAI_API_KEY"))
-        elif model_type == "llamacpp" or "vllm":
-            self.model = ChatOpenAI(model=self.model_name, base_url=os.getenv(
-                "BASE_URL", "http://localhost:8080/v1"), api_key="dummy_key")
+            self.model = self._openai_client(api_key=os.getenv("OPENAI_API_KEY"))
+        elif model_type in ("llamacpp", "vllm"):
+            self.model = self._openai_client(base_url=os.getenv("BASE_URL", "http://localhost:8080/v1"),
+                                             api_key="dummy_key")
         elif model_type == "groq":
             raise NotImplementedError("Groq model is not implemented yet.")
         elif model_type == "gemini":
@@ -40,14 +148,328 @@ class LLMModule:
             raise ValueError(f"Invalid model type: {model_type}")
     # TODO : Download LLM model from Hugging Face in Local inference mode.
 
+    def _http_limits(self):
+        import httpx
+        # Keep-alive connections to BASE_URL are pooled and sized to the concurrency limit
+        return httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+
+    def _openai_client(self, **kwargs):
+        import httpx
+        from langchain_openai import ChatOpenAI
+        limits = self._http_limits()
+        return ChatOpenAI(model=self.model_name, timeout=self.timeout, http_client=httpx.Client(limits=limits),
+                          http_async_client=httpx.AsyncClient(limits=limits), **kwargs)
+
+    def _timed(self, language: str):
+        if self.metrics is None:
+            return nullcontext({})
+        return self.metrics.stage("summarize", language=language)
+
+    def _config(self, **config) -> dict:
+        return {**config, "callbacks": self._callbacks} if self._callbacks else config
+
+    def _summary_key(self, transcript_digest: str, language: str) -> str:
+        templates = self.template_manager.templates
+        return summary_key(
+            transcript_digest, language=language, model=self.model_name, backend=self.model_type,
+            chunk_tokens=self.chunk_tokens, system_prompt=self.template_manager.get_system_prompt(),
+            summary_template=templates.get(language, templates.get("en", "")),
+            chunk_prompt=self.template_manager.chunk_prompt, merge_prompt=self.template_manager.merge_prompt)
+
+    def _cached_summary(self, key: str | None) -> str | None:
+        if key is None:
+            return None
+        summary = self.summary_cache.get(key)
+        if self.metrics is not None:
+            self.metrics.increment("summary_cache_hit" if summary is not None else "summary_cache_miss")
+        return summary
+
+    def _store_summary(self, key: str | None, summary: str, language: str) -> None:
+        if key is None:
+            return
+        try:
+            self.summary_cache.put(key, summary, model=self.model_name, backend=self.model_type, language=language)
+        except OSError as e:
+            logger.warning(f"Failed to store summary in cache: {e}")
+
+    def transcript_summary_key(self, transcript: str, language: str) -> str:
+        """Identifies the summary of `transcript` in `language` with this module's prompts, model and backend."""
+        return self._summary_key(hashlib.sha256(transcript.encode("utf-8")).hexdigest(), language)
+
+    def _transcript_summary_key(self, transcript: str, language: str) -> str | None:
+        if self.summary_cache is None:
+            return None
+        return self.transcript_summary_key(transcript, language)
+
     def summarize_transcript(self, transcript: str, language: str) -> str:
+        key = self._transcript_summary_key(transcript, language)
+        summary = self._cached_summary(key)
+        if summary is None:
+            summary = self._summarize_transcript(transcript, language)
+            self._store_summary(key, summary, language)
+        return summary
+
+    def summarize_languages(self, transcript: str, languages: list[str]) -> dict:
+        """
+        Summarizes one transcript in several languages concurrently (up to `max_concurrency` languages at once).
+        The `max_concurrency` limit on in-flight requests holds across all languages together.
+
+        The prompts of all languages start with the same instructions and transcript and differ only in
+        the language and template after it, so a backend with prefix (KV) caching, such as vLLM or
+        llama.cpp, processes the shared transcript prefix once.
+
+        Returns:
+            dict: Maps each language to its summary, or to the exception that made it fail.
+        """
+        languages = list(dict.fromkeys(languages))
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(languages)) or 1,
+                                thread_name_prefix="summarize-language") as executor:
+            futures = {language: executor.submit(self.summarize_transcript, transcript, language)
+                       for language in languages}
+        return {language: future.exception() or future.result() for language, future in futures.items()}
+
+    def _summarize_transcript(self, transcript: str, language: str) -> str:
+        logger.debug(f"Summarizing transcript: {transcript}")
+        with self._timed(language):
+            if self.chunk_tokens and estimate_tokens(transcript) > self.chunk_tokens:
+                return self.summarize_transcript_chunked(transcript, language)
+            chain = self.template_manager.get_composed_prompt(
+                language) | self.model
+            try:
+                response = self._invoke(chain, {"transcript": transcript, "language": language})
+                return response.content
+            except Exception as e:
+                logger.error(f"LLM invocation failed: {e}", exc_info=True)
+                raise RuntimeError(f"Failed to generate summary: {str(e)}") from e
+
+    def summarize_transcript_chunked(self, transcript: str, language: str) -> str:
+        """
+        Summarizes a transcript that exceeds the context budget with map-reduce.
+
+        The transcript is split on speaker-block boundaries into chunks of at most `chunk_tokens`
+        estimated tokens, the chunks are summarized into notes concurrently (up to `max_concurrency`
+        requests in flight), and the notes are merged into the language template. If the notes
+        themselves exceed the budget, they are reduced again hierarchically before the merge.
+        """
+        chunks = split_transcript(transcript, self.chunk_tokens)
+        logger.info(f"Transcript exceeds {self.chunk_tokens} tokens, summarizing {len(chunks)} chunks...")
+        try:
+            return self._merge_notes(self._summarize_chunks(chunks, language), language)
+        except Exception as e:
+            logger.error(f"LLM invocation failed: {e}", exc_info=True)
+            raise RuntimeError(f"Failed to generate summary: {str(e)}") from e
+
+    def _reduction_chunks(self, notes: list[str]) -> list[str] | None:
+        """
+        Returns the chunks the notes must be summarized into again before the merge, or None when they
+        fit in one request (or no longer shrink, in which case the merge step handles them as they are).
+        """
+        joined_notes = self._join_notes(notes)
+        if len(notes) <= 1 or estimate_tokens(joined_notes) <= self.chunk_tokens:
+            return None
+        chunks = split_transcript(joined_notes, self.chunk_tokens)
+        if len(chunks) >= len(notes):
+            return None
+        logger.info(f"Notes exceed {self.chunk_tokens} tokens, reducing {len(chunks)} chunks...")
+        return chunks
+
+    def _merge_notes(self, notes: list[str], language: str) -> str:
+        while (chunks := self._reduction_chunks(notes)) is not None:
+            notes = self._summarize_chunks(chunks, language)
+        chain = self.template_manager.get_merge_prompt(language) | self.model
+        response = self._invoke(chain, {"notes": self._join_notes(notes), "language": language})
+        return response.content
+
+    def summarize_blocks(self, blocks: Iterable[str], language: str,
+                         on_note: Callable[[int, str], None] | None = None) -> str:
+        """
+        Summarizes a transcript while its speaker blocks are still being produced.
+
+        Blocks are grouped into chunks of `chunk_tokens` as they arrive, and each full chunk is sent
+        for notes right away (up to `max_concurrency` requests in flight) while later blocks are
+        still being transcribed. Only the current chunk and the notes are held in memory. A
+        transcript that never fills one chunk is summarized in one request, like `summarize_transcript`.
+
+        Args:
+            blocks (Iterable[str]): Formatted speaker blocks in transcript order (see `voice.iter_speaker_blocks`).
+            language (str): Language of the summary.
+            on_note (Callable[[int, str], None] | None): Called with the 1-based part number and notes of each
+                chunk as soon as they are ready, in part order.
+
+        Returns:
+            str: The summary.
+        """
+        if not self.chunk_tokens:
+            return self.summarize_transcript(BLOCK_SEPARATOR.join(blocks), language)
+        digest = hashlib.sha256()
+
+        def hashed(blocks):
+            # Hashes the transcript as `summarize_transcript` sees it, so both share cache entries
+            for index, block in enumerate(blocks):
+                digest.update(((BLOCK_SEPARATOR if index else "") + block).encode("utf-8"))
+                yield block
+
+        blocks = hashed(blocks)
+        chain = self.template_manager.get_chunk_prompt() | self.model
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="summarize-chunk")
+        pending = []
+        notes = []
+
+        def submit(chunk: str, total) -> None:
+            inputs = {"transcript": chunk, "language": language, "part": len(notes) + len(pending) + 1,
+                      "total": total}
+            pending.append(executor.submit(self._invoke, chain, inputs))
+
+        def collect(wait: bool) -> None:
+            while pending and (wait or pending[0].done()):
+                try:
+                    notes.append(pending.pop(0).result().content)
+                except Exception as e:
+                    logger.error(f"LLM invocation failed: {e}", exc_info=True)
+                    raise RuntimeError(f"Failed to generate summary: {str(e)}") from e
+                if on_note is not None:
+                    on_note(len(notes), notes[-1])
+
+        try:
+            last_chunk = None
+            for chunk in iter_chunks(blocks, self.chunk_tokens):
+                if last_chunk is not None:
+                    # The number of parts is unknown until the transcript ends
+                    submit(last_chunk, "?")
+                    collect(wait=False)
+                last_chunk = chunk
+            if not notes and not pending:
+                return self.summarize_transcript(last_chunk or "", language)
+            submit(last_chunk, len(notes) + len(pending) + 1)
+            collect(wait=True)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        logger.info(f"Merging notes of {len(notes)} transcript chunks...")
+        with self._timed(language):
+            try:
+                summary = self._merge_notes(notes, language)
+            except Exception as e:
+                logger.error(f"LLM invocation failed: {e}", exc_info=True)
+                raise RuntimeError(f"Failed to generate summary: {str(e)}") from e
+        if self.summary_cache is not None:
+            self._store_summary(self._summary_key(digest.hexdigest(), language), summary, language)
+        return summary
+
+    def _summarize_chunks(self, chunks: list[str], language: str) -> list[str]:
+        chain = self.template_manager.get_chunk_prompt() | self.model
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks)) or 1,
+                                thread_name_prefix="summarize-chunk") as executor:
+            responses = list(executor.map(lambda inputs: self._invoke(chain, inputs),
+                                          self._chunk_inputs(chunks, language)))
+        return [response.content for response in responses]
+
+    @staticmethod
+    def _chunk_inputs(chunks: list[str], language: str) -> list[dict]:
+        return [{"transcript": chunk, "language": language, "part": index + 1, "total": len(chunks)}
+                for index, chunk in enumerate(chunks)]
+
+    @staticmethod
+    def _join_notes(notes: list[str]) -> str:
+        return "\n\n".join(f"## Part {index + 1}/{len(notes)}\n{note}" for index, note in enumerate(notes))
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Returns the backoff before the next attempt, or raises `error` if it must not be retried."""
+        if attempt == self.max_retries or not _is_retryable(error):
+            raise error
+        delay = self.retry_backoff * 2 ** attempt * (1 + random.random())
+        logger.warning(
+            f"LLM request failed (attempt {attempt + 1}/{self.max_retries + 1}): {error!r}, retrying in {delay:.1f}s")
+        return delay
+
+    def _invoke(self, chain, inputs: dict):
+        """
+        Invokes `chain` with bounded in-flight concurrency, a per-attempt timeout and retries with backoff.
+        Only timeouts, connection errors, rate limiting and server errors are retried (see `_is_retryable`).
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._slots.acquire()
+                try:
+                    future = self._request_executor.submit(chain.invoke, inputs, config=self._config())
+                except BaseException:
+                    self._slots.release()
+                    raise
+                # A request abandoned after the timeout keeps its slot until it really ends
+                future.add_done_callback(lambda _: self._slots.release())
+                return future.result(timeout=self.timeout)
+            except Exception as e:
+                time.sleep(self._retry_delay(attempt, e))
+
+    async def _acquire_slot(self) -> None:
+        # The slots are shared with synchronous calls and other event loops, so poll instead of blocking this loop
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+
+    async def _ainvoke(self, chain, inputs: dict):
+        """Async counterpart of `_invoke`, drawing on the same concurrency slots."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._acquire_slot()
+                try:
+                    return await asyncio.wait_for(chain.ainvoke(inputs, config=self._config()), timeout=self.timeout)
+                finally:
+                    self._slots.release()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(attempt, e))
+
+    async def asummarize_transcript(self, transcript: str, language: str) -> str:
+        """
+        Async counterpart of `summarize_transcript`.
+
+        Requests share the pooled connections of the backend client and are limited to
+        `max_concurrency` in flight across all concurrent calls on this instance.
+        """
+        key = self._transcript_summary_key(transcript, language)
+        summary = self._cached_summary(key)
+        if summary is None:
+            summary = await self._asummarize_transcript(transcript, language)
+            self._store_summary(key, summary, language)
+        return summary
+
+    async def _asummarize_transcript(self, transcript: str, language: str) -> str:
         logger.debug(f"Summarizing transcript: {transcript}")
-        chain = self.template_manager.get_composed_prompt(
-            language) | self.model
         try:
-            response = chain.invoke(
-                {"transcript": transcript, "language": language})
-            return response.content
+            with self._timed(language):
+                if self.chunk_tokens and estimate_tokens(transcript) > self.chunk_tokens:
+                    return await self._asummarize_chunked(transcript, language)
+                chain = self.template_manager.get_composed_prompt(language) | self.model
+                response = await self._ainvoke(chain, {"transcript": transcript, "language": language})
+                return response.content
         except Exception as e:
             logger.error(f"LLM invocation failed: {e}", exc_info=True)
             raise RuntimeError(f"Failed to generate summary: {str(e)}") from e
+
+    async def summarize_many(self, requests: list[tuple[str, str]]) -> list:
+        """
+        Summarizes many transcripts concurrently.
+
+        Args:
+            requests (list[tuple[str, str]]): (transcript, language) pairs.
+
+        Returns:
+            list: The summary of each request in order, or the exception that made it fail.
+        """
+        return await asyncio.gather(
+            *(self.asummarize_transcript(transcript, language) for transcript, language in requests),
+            return_exceptions=True)
+
+    async def _asummarize_chunked(self, transcript: str, language: str) -> str:
+        chunks = split_transcript(transcript, self.chunk_tokens)
+        logger.info(f"Transcript exceeds {self.chunk_tokens} tokens, summarizing {len(chunks)} chunks...")
+        notes = await self._asummarize_chunks(chunks, language)
+        while (chunks := self._reduction_chunks(notes)) is not None:
+            notes = await self._asummarize_chunks(chunks, language)
+        chain = self.template_manager.get_merge_prompt(language) | self.model
+        response = await self._ainvoke(chain, {"notes": self._join_notes(notes), "language": language})
+        return response.content
+
+    async def _asummarize_chunks(self, chunks: list[str], language: str) -> list[str]:
+        chain = self.template_manager.get_chunk_prompt() | self.model
+        responses = await asyncio.gather(*(self._ainvoke(chain, inputs)
+                                           for inputs in self._chunk_inputs(chunks, language)))
+        return [response.content for response in responses]
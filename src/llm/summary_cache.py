@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from utils.atomic_io import evict_least_recently_used, write_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def summary_key(transcript_digest: str, **inputs) -> str:
+    """
+    Returns the cache key of a summary: a hash of the transcript digest and every other input that
+    shapes the answer (prompt texts, language, model name, backend type, chunk budget).
+    """
+    payload = json.dumps({"transcript": transcript_digest, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    On-disk cache of finished summaries, keyed by `summary_key`.
+
+    Entries are stored as `<cache_dir>/<key[:2]>/<key>.json` and written with a temp file + rename,
+    so a concurrent reader never sees a partial entry. Entries older than `ttl_seconds` are treated as
+    misses and removed. When `max_size_mb` is set, the least recently read or written entries are
+    evicted until the cache fits.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float | None = None, ttl_seconds: float | None = None):
+        if max_size_mb is not None and max_size_mb < 0:
+            raise ValueError(
+                f"Summary cache size must not be negative. Current value: {max_size_mb}")
+        if ttl_seconds is not None and ttl_seconds < 0:
+            raise ValueError(
+                f"Summary cache TTL must not be negative. Current value: {ttl_seconds}")
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.ttl_seconds = ttl_seconds or None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached summary for `key`, or None on a miss or an expired entry."""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            summary = entry["summary"]
+            created_at = entry["created_at"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable summary cache entry {path}: {e}")
+            return None
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            logger.info(f"Summary cache entry expired: {key[:12]}")
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            # Refresh the modification time so eviction is least-recently-used
+            os.utime(path)
+        except OSError:
+            pass
+        logger.info(f"Summary cache hit: {key[:12]}")
+        return summary
+
+    def put(self, key: str, summary: str, **metadata) -> None:
+        """Stores `summary` under `key`, then enforces the size budget."""
+        write_atomic(self._entry_path(key),
+                     json.dumps({"summary": summary, "created_at": time.time(), **metadata}, ensure_ascii=False))
+        self._evict_to_budget()
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.cache_dir.glob("*/*.json"))
+
+    def _evict_to_budget(self) -> None:
+        if self.max_size_bytes is not None:
+            evict_least_recently_used(self.cache_dir, self.max_size_bytes, "summary cache")
+
+
+def summary_cache_from_env() -> SummaryCache:
+    """
+    Creates the summary cache configured by the environment.
+
+    Environment:
+        SUMMARY_CACHE_DIR: Cache directory (default: .cache/summaries).
+        SUMMARY_CACHE_MAX_MB: Size budget in megabytes (default: 64, 0 means unlimited).
+        SUMMARY_CACHE_TTL_HOURS: Age after which a summary is regenerated (default: 168, 0 means never).
+    """
+    try:
+        max_size_mb = float(os.getenv("SUMMARY_CACHE_MAX_MB", 64))
+        ttl_hours = float(os.getenv("SUMMARY_CACHE_TTL_HOURS", 168))
+    except ValueError:
+        raise ValueError(
+            "SUMMARY_CACHE_MAX_MB and SUMMARY_CACHE_TTL_HOURS must be numbers. Current values: "
+            f"{os.getenv('SUMMARY_CACHE_MAX_MB')}, {os.getenv('SUMMARY_CACHE_TTL_HOURS')}")
+    return SummaryCache(os.getenv("SUMMARY_CACHE_DIR", ".cache/summaries"), max_size_mb=max_size_mb or None,
+                        ttl_seconds=ttl_hours * 3600 or None)
@@ -4,11 +4,24 @@ from langchain_core.prompts import PromptTemplate
 
 logger = logging.getLogger(__name__)
 
+# Prompts put the language after the transcript, so the prompts of one transcript in several languages
+# share their longest prefix and the backend's prefix (KV) cache can reuse it
+DEFAULT_CHUNK_PROMPT = (
+    "Write detailed notes on part {part} of {total} of this meeting transcript, keeping the speaker labels, "
+    "in the language given after it:\n\n{transcript}\n\nLanguage: {language}"
+)
+DEFAULT_MERGE_PROMPT = (
+    "Merge these chronological notes on one meeting into a single summary written in {language}, "
+    "following the template below.\n\n{notes}\n\n{summary_template}"
+)
+
 
 class TemplateManager:
     def __init__(self, base_dir: str = "src/prompts"):
         self.base_dir = Path(base_dir)
         self.system_prompt = ""
+        self.chunk_prompt = ""
+        self.merge_prompt = ""
         self.templates = {}
         self._load_resources()
 
@@ -23,7 +36,11 @@ class TemplateManager:
                 f"System prompt not found at: {sys_path} using default prompt.")
             self.system_prompt = "You are a helpful assistant."
 
-        # 2. Load language-specific templates
+        # 2. Load map-reduce prompts used for transcripts longer than the context budget
+        self.chunk_prompt = self._load_prompt("chunk.txt", DEFAULT_CHUNK_PROMPT)
+        self.merge_prompt = self._load_prompt("merge.txt", DEFAULT_MERGE_PROMPT)
+
+        # 3. Load language-specific templates
         template_dir = self.base_dir / "templates"
         logger.info(f"Loading templates from: {template_dir}")
         if template_dir.exists():
@@ -38,6 +55,13 @@ class TemplateManager:
                 "en": "You are a helpful assistant.",
             }
 
+    def _load_prompt(self, file_name: str, default: str) -> str:
+        path = self.base_dir / file_name
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+        logger.warning(f"Prompt not found at: {path} using default prompt.")
+        return default
+
     def get_system_prompt(self) -> str:
         return self.system_prompt
 
@@ -60,3 +84,21 @@ class TemplateManager:
             template=self.system_prompt
         ).partial(summary_template=target_template)
         return prompt
+
+    def get_chunk_prompt(self) -> PromptTemplate:
+        """
+        Return the prompt used to summarize one part of a long transcript into notes
+        """
+        # Note: chunk.txt contains {transcript}, {language}, {part}, {total} variables
+        return PromptTemplate.from_template(template=self.chunk_prompt)
+
+    def get_merge_prompt(self, language: str) -> PromptTemplate:
+        """
+        Compose the merge prompt with the summary template for the given language and return it
+        """
+        target_template = self.templates.get(
+            language, self.templates.get('en', ""))
+        # Note: merge.txt contains {notes}, {language}, {summary_template} variables
+        return PromptTemplate.from_template(
+            template=self.merge_prompt
+        ).partial(summary_template=target_template)
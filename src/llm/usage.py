@@ -0,0 +1,57 @@
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback that reports the latency and token usage of every chat model call.
+
+    Works for `invoke`, `batch` and `ainvoke` alike, since the callback manager pairs the start and
+    end events of each call by run id. Usage is read from the response's `usage_metadata` (filled by
+    the Ollama and OpenAI-compatible clients); calls without it are recorded with unknown tokens.
+    """
+
+    def __init__(self, metrics, model_name: str):
+        """
+        Args:
+            metrics: Collector with a `record_llm_call(model, prompt_tokens, completion_tokens, latency_seconds)`
+                method, e.g. `pipeline.metrics.RunMetrics`.
+            model_name (str): Model name reported with each call.
+        """
+        self.metrics = metrics
+        self.model_name = model_name
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id) -> None:
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        latency = time.perf_counter() - started if started is not None else 0.0
+        prompt_tokens = completion_tokens = None
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens = (prompt_tokens or 0) + usage.get("input_tokens", 0)
+                    completion_tokens = (completion_tokens or 0) + usage.get("output_tokens", 0)
+        if prompt_tokens is None and response.llm_output:
+            token_usage = response.llm_output.get("token_usage") or {}
+            prompt_tokens = token_usage.get("prompt_tokens")
+            completion_tokens = token_usage.get("completion_tokens")
+        self.metrics.record_llm_call(self.model_name, prompt_tokens, completion_tokens, latency)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._started.pop(run_id, None)
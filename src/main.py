@@ -1,12 +1,30 @@
 import dotenv
 import logging
-from voice import parse_speakers_and_transcript
+# Only light modules are imported here. The model code (whisperx, torch, pyannote) and the LLM clients
+# are imported inside the functions that use them, so --help and argument validation start instantly.
+from voice import (StageCache, file_digest, stage_cache_from_env, format_transcript, SpeakerStitcher,
+                   audio_duration, stitch_window, window_offsets, TranscriptArtifact, TranscriptArtifactBuilder,
+                   JobCheckpoints, JobInProgressError, LayeredStageCache, jobs_dir_from_env)
+from voice.stage_cache import SUMMARY_STAGE
+from voice.streaming import streaming_window_from_env
+from voice.transcript_artifact import ARTIFACT_EXT
 import os
 import argparse
+import asyncio
+import json
 from pathlib import Path
-from llm import LLMModule
+from llm import SummaryCache, summary_cache_from_env
+from pipeline import DevicePool, PipelineExecutor, RunMetrics, Stage, parse_devices
+from utils.atomic_io import write_atomic
 from datetime import datetime
 
+SUPPORTED_LANGUAGES = {"en", "fr", "de", "es",
+                       "it", "pt", "nl", "pl", "ru", "zh", "ja", "ko"}
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma", ".webm", ".mp4"}
+# Suffix of a transcript that is still being written by --incremental
+PARTIAL_SUFFIX = ".partial"
+PIPELINE_STAGES = ("decode", "transcribe", "align", "diarize", "format", "summarize", "write")
+
 
 def validate_audio_path(audio_path: str) -> None:
     """
@@ -23,25 +41,777 @@ def validate_audio_path(audio_path: str) -> None:
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
 
-def save_result(result: str, language: str, audio_path: str, time_stamp: str, result_type: str, ext: str) -> None:
+def parse_summary_languages(spec: str | None, default: str) -> list[str]:
+    """
+    Parses a comma-separated list of summary languages such as "en,ko,ja".
+
+    Returns:
+        list[str]: The languages in the given order without duplicates, or [default] if none are given.
+
+    Raises:
+        ValueError: If a language is not supported.
+    """
+    languages = list(dict.fromkeys(part.strip() for part in (spec or "").split(",") if part.strip()))
+    for language in languages:
+        if language.lower() not in SUPPORTED_LANGUAGES:
+            raise ValueError(
+                f"Unsupported summary language: {language}. "
+                f"Supported languages: {', '.join(sorted(SUPPORTED_LANGUAGES))}")
+    return languages or [default]
+
+
+def save_summaries(summaries: dict, audio_path: str, time_stamp: str) -> dict:
+    """
+    Saves each successful summary as summary_{language}_... and returns the files by language.
+
+    Raises:
+        Exception: The first failure in `summaries`, after the other summaries are saved.
     """
-    Saves the result to the results directory.
+    logger = logging.getLogger(__name__)
+    files = {language: save_result(summary, language, audio_path, time_stamp, "summary", "md")
+             for language, summary in summaries.items() if not isinstance(summary, Exception)}
+    for language, summary in summaries.items():
+        if isinstance(summary, Exception):
+            logger.error(f"Failed to summarize {audio_path} in {language}: {summary}")
+            raise summary
+    return files
+
+
+def summary_files_entry(files: dict) -> dict:
+    """Report fields of the summary files: the first file, and every file by language if there are several."""
+    entry = {"summary_file": next(iter(files.values()))}
+    if len(files) > 1:
+        entry["summary_files"] = files
+    return entry
+
+
+def collect_audio_paths(audio_dir: str | None = None, audio_glob: str | None = None,
+                        manifest: str | None = None) -> list[str]:
     """
+    Collects the audio files of a batch run from a directory, a glob pattern or a manifest file.
+
+    Args:
+        audio_dir (str | None): Directory whose audio files (by extension) are processed, non-recursively.
+        audio_glob (str | None): Glob pattern such as "recordings/**/*.mp3" (recursive patterns are supported).
+        manifest (str | None): Text file with one audio path per line. Blank lines and lines starting
+            with "#" are ignored, and relative paths are resolved against the manifest's directory.
+
+    Returns:
+        list[str]: Sorted, de-duplicated audio paths (manifest order is preserved).
+
+    Raises:
+        FileNotFoundError: If the directory or manifest does not exist.
+    """
+    if audio_dir is not None:
+        directory = Path(audio_dir)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Audio directory not found: {audio_dir}")
+        return sorted(str(p) for p in directory.iterdir()
+                      if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+    if audio_glob is not None:
+        import glob
+        return sorted(p for p in glob.glob(audio_glob, recursive=True) if Path(p).is_file())
+    if manifest is not None:
+        manifest_path = Path(manifest)
+        if not manifest_path.is_file():
+            raise FileNotFoundError(f"Manifest file not found: {manifest}")
+        paths = []
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = Path(line)
+            if not path.is_absolute():
+                path = manifest_path.parent / path
+            paths.append(str(path))
+        return list(dict.fromkeys(paths))
+    return []
+
+
+def save_result(result: str, language: str, audio_path: str, time_stamp: str, result_type: str, ext: str) -> str:
+    """
+    Saves the result to the results directory and returns the path of the written file.
+    """
+    path = result_path(language, audio_path, time_stamp, result_type, ext)
+    write_atomic(path, result)
+    return path
+
+
+def result_path(language: str, audio_path: str, time_stamp: str, result_type: str, ext: str) -> str:
+    """Returns the path of a result file in the results directory."""
     result_file_name = f"{result_type}_{language}_{Path(audio_path).name}_{time_stamp}.{ext}"
-    with open(os.path.join(os.getenv("RESULTS_DIR", "results"), result_file_name), "w", encoding="utf-8") as f:
-        f.write(result)
+    return os.path.join(os.getenv("RESULTS_DIR", "results"), result_file_name)
+
+
+def save_transcript(segments: list[dict], language: str, audio_path: str, time_stamp: str) -> tuple[str, str, str]:
+    """
+    Saves the formatted transcript and, next to it, the structured transcript artifact with word-level
+    timings (see `voice.transcript_artifact`), from which text, SRT/VTT or per-speaker views can be
+    rendered again without re-running the GPU stages.
+
+    Returns:
+        tuple[str, str, str]: The formatted transcript, the transcript file and the artifact file.
+    """
+    transcript = format_transcript(segments)
+    transcript_file = save_result(transcript, language, audio_path, time_stamp, "transcript", "txt")
+    artifact_file = TranscriptArtifact.from_segments(segments, language).save(
+        result_path(language, audio_path, time_stamp, "transcript", ARTIFACT_EXT))
+    return transcript, transcript_file, artifact_file
+
+
+def append_blocks(blocks, path: str, separator: str = "\n\n"):
+    """
+    Appends each block to `<path>.partial` as it passes through and flushes it, so the transcript can be
+    followed at that fixed path while the blocks are still being produced. Once every block is written
+    the file is renamed to `path`, so an interrupted run leaves only the `.partial` file and never a
+    truncated transcript that looks finished. Yields the blocks unchanged.
+    """
+    partial_path = f"{path}{PARTIAL_SUFFIX}"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        for index, block in enumerate(blocks):
+            f.write(block if index == 0 else separator + block)
+            f.flush()
+            yield block
+    os.replace(partial_path, path)
+
+
+def write_run_metrics(metrics: RunMetrics, language: str, audio_path: str, time_stamp: str,
+                      prometheus_file: str | None = None) -> str:
+    """
+    Saves the JSON run report next to the other results and, if requested, the Prometheus text file.
+    Returns the path of the JSON report.
+    """
+    logger = logging.getLogger(__name__)
+    metrics_path = save_result(metrics.to_json(), language, audio_path, time_stamp, "metrics", "json")
+    for name, stage in metrics.stage_summary().items():
+        rtf = f" rtf={stage['real_time_factor']:.3f}" if stage["real_time_factor"] is not None else ""
+        logger.info(f"  {name:<24} runs={stage['count']} wall={stage['wall_seconds']:.1f}s "
+                    f"audio={stage['audio_seconds']:.1f}s{rtf}")
+    llm = metrics.llm_summary()
+    logger.info(f"  LLM requests={llm['requests']} prompt_tokens={llm['prompt_tokens']} "
+                f"completion_tokens={llm['completion_tokens']} latency={llm['latency_seconds']:.1f}s")
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+        logger.info(f"Prometheus metrics written to {prometheus_file}")
+    logger.info(f"Run metrics saved: {metrics_path}")
+    return metrics_path
+
+
+def prepare_stage_cache(audio_paths: list[str], no_cache: bool, invalidate_cache: bool) -> StageCache | None:
+    """
+    Creates the stage cache for this run, or returns None when it is bypassed with --no_cache.
+    With --invalidate_cache, the cached entries of the given audio files are removed first.
+    """
+    if no_cache:
+        return None
+    stage_cache = stage_cache_from_env()
+    if invalidate_cache:
+        for audio_path in audio_paths:
+            if Path(audio_path).is_file():
+                stage_cache.invalidate(file_digest(audio_path))
+    return stage_cache
+
+
+def prepare_checkpoints(audio_paths: list[str], resume: bool, no_cache: bool) -> JobCheckpoints | None:
+    """
+    Starts the resumable job of every existing input file under RESULTS_DIR/jobs, or returns None when
+    stage outputs are not to be stored (--no_cache), since such a run could not be resumed. With
+    `resume`, the stages, summaries and result files completed by an earlier run of a file are reused
+    instead of computed and written again.
+
+    Raises:
+        JobInProgressError: If another run is still processing one of the files.
+    """
+    if no_cache:
+        return None
+    checkpoints = JobCheckpoints(jobs_dir_from_env())
+    for audio_path in audio_paths:
+        if Path(audio_path).is_file():
+            checkpoints.start(audio_path, resume=resume)
+    return checkpoints
+
+
+def record_job_outcomes(checkpoints: JobCheckpoints | None, files: list[dict]) -> None:
+    """Marks the job of each batch report entry as completed (removing its checkpoints) or failed."""
+    if checkpoints is None:
+        return
+    for entry in files:
+        if entry["audio_path"] not in checkpoints.jobs:
+            continue
+        if entry["status"] == "success":
+            checkpoints.finish(entry["audio_path"])
+        else:
+            checkpoints.fail(entry["audio_path"], entry["error"])
+
+
+def transcript_params(language: str, min_speakers: int, max_speakers: int, streaming: bool = False,
+                      vad: bool = False) -> dict:
+    """Options that shape a saved transcript; recorded transcript files are only reused for the same options."""
+    return {"language": language, "min_speakers": min_speakers, "max_speakers": max_speakers,
+            "streaming": streaming, "vad": vad}
+
+
+def save_job_transcript(segments: list[dict], language: str, audio_path: str, checkpoints: JobCheckpoints | None,
+                        params: dict) -> tuple[str, dict]:
+    """
+    Saves the transcript of a job (see `save_transcript`) and records its files in the job manifest. When
+    a resumed job already saved the transcript with the same `params`, its files are reused instead.
+
+    Returns:
+        tuple[str, dict]: The formatted transcript, and the "time_stamp", "transcript_file" and "artifact_file"
+        of the job. Later results of the job are saved with the same time stamp.
+    """
+    logger = logging.getLogger(__name__)
+    outputs = checkpoints.saved_outputs(audio_path, params) if checkpoints is not None else None
+    if outputs is not None:
+        logger.info(f"Reusing the transcript saved by an earlier run: {outputs['transcript_file']}")
+        return Path(outputs["transcript_file"]).read_text(encoding="utf-8"), outputs
+    time_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    transcript, transcript_file, artifact_file = save_transcript(segments, language, audio_path, time_stamp)
+    outputs = {"time_stamp": time_stamp, "transcript_file": transcript_file, "artifact_file": artifact_file}
+    if checkpoints is not None and audio_path in checkpoints.jobs:
+        checkpoints.record_outputs(audio_path, params, **outputs)
+    return transcript, outputs
+
+
+def summary_checkpoint_params(llm_module, transcript: str, language: str) -> dict:
+    return {"language": language, "summary_key": llm_module.transcript_summary_key(transcript, language)}
+
+
+def summarize_with_checkpoints(llm_module, transcript: str, languages: list[str],
+                               checkpoints: JobCheckpoints | None = None, audio_path: str | None = None) -> dict:
+    """
+    Summarizes `transcript` in each language, concurrently when there are several.
+
+    With `checkpoints`, the summaries completed by an earlier run of the job of `audio_path` are reused
+    and every new summary is checkpointed as soon as it is ready.
+
+    Returns:
+        dict: Maps each language to its summary, or to the exception that made it fail.
+    """
+    digest = checkpoints.jobs.get(audio_path) if checkpoints is not None else None
+    params = {language: summary_checkpoint_params(llm_module, transcript, language)
+              for language in languages} if digest else {}
+    summaries = {}
+    for language in languages:
+        cached = checkpoints.get(digest, SUMMARY_STAGE, params[language]) if digest else None
+        if cached is not None:
+            summaries[language] = cached
+    missing = [language for language in languages if language not in summaries]
+    if len(missing) == 1:
+        try:
+            summaries[missing[0]] = llm_module.summarize_transcript(transcript, missing[0])
+        except Exception as e:
+            summaries[missing[0]] = e
+    elif missing:
+        summaries.update(llm_module.summarize_languages(transcript, missing))
+    for language in missing:
+        if digest and not isinstance(summaries[language], Exception):
+            checkpoints.put(digest, SUMMARY_STAGE, params[language], summaries[language])
+    return {language: summaries[language] for language in languages}
+
+
+def _stitch_sharded_windows(pool: DevicePool, audio_path: str, window_args: tuple, window_seconds: float,
+                            overlap_seconds: float, window_kwargs: dict) -> list[dict]:
+    """Processes the windows of one recording in parallel on `pool` and stitches them in order."""
+    from voice import transcribe_window
+
+    def submit(offset):
+        return pool.submit(transcribe_window, audio_path, offset, window_seconds, *window_args, **window_kwargs)
+
+    pending = [submit(offset) for offset in window_offsets(audio_duration(audio_path), window_seconds,
+                                                           overlap_seconds)]
+    stitcher = SpeakerStitcher()
+    segments = []
+    while pending:
+        window = pending.pop(0).result()
+        if window is None:
+            break
+        segments.extend(stitch_window(stitcher, window, window_seconds, overlap_seconds))
+        if window["is_last"]:
+            break
+        if not pending:
+            # The container reported a shorter duration than was decoded, continue window by window
+            pending.append(submit(window["offset"] + window_seconds - overlap_seconds))
+    for future in pending:
+        future.cancel()
+    return segments
+
+
+def transcribe_sharded(audio_paths: list[str], language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                       devices: list[str], threads_per_worker: int | None = None,
+                       stage_cache: StageCache | None = None, streaming: bool = False, vad: bool = False) -> dict:
+    """
+    Transcribes recordings on a pool of worker processes, one per device entry.
+
+    Without streaming, whole files are distributed over the workers. With streaming, the windows of
+    each long file are distributed instead and stitched back together in order, so a single
+    recording also uses every device. Each worker keeps its models resident for the whole run.
+
+    The final (diarization) entries of `stage_cache` are looked up and, for streaming, stored in this
+    process, so fully cached recordings are never sent to a worker. Without streaming, each worker
+    also reads and writes the transcription and alignment entries of the files it processes.
+
+    Returns:
+        dict: Maps each audio path to its list of speaker-labelled segments, or to the exception that made
+        it fail (like `voice.transcribe_files`).
+    """
+    from voice import stage_cache_params, streaming_cache_params, transcribe_files
+    logger = logging.getLogger(__name__)
+    audio_paths = list(dict.fromkeys(audio_paths))
+    # The cache parameters do not depend on the device, so this process computes the workers' keys
+    # without resolving runtime options (or initializing CUDA) for a device of its own
+    _, diarize_params = stage_cache_params(language, min_speakers, max_speakers, vad=vad)
+    window_seconds, overlap_seconds = streaming_window_from_env()
+    final_params = (streaming_cache_params(diarize_params, window_seconds, overlap_seconds) if streaming
+                    else diarize_params)
+    outcomes = {}
+    pending = []
+    for path in audio_paths:
+        try:
+            segments = (stage_cache.get(file_digest(path), "diarize", final_params)
+                        if stage_cache is not None else None)
+        except OSError:
+            # Reported by the worker that processes the file
+            segments = None
+        if segments is None:
+            pending.append(path)
+        else:
+            outcomes[path] = segments
+    if not pending:
+        return outcomes
+    with DevicePool(devices, threads_per_worker) as pool:
+        if not streaming:
+            futures = {path: pool.submit(transcribe_files, [path], language, min_speakers, max_speakers, hf_token,
+                                         stage_cache=stage_cache, vad=vad)
+                       for path in pending}
+            for path, future in futures.items():
+                try:
+                    outcomes[path] = future.result()[path]
+                except Exception as e:
+                    outcomes[path] = e
+        else:
+            for path in pending:
+                try:
+                    outcomes[path] = _stitch_sharded_windows(
+                        pool, path, (language, min_speakers, max_speakers, hf_token), window_seconds,
+                        overlap_seconds, {"vad": vad})
+                    if stage_cache is not None:
+                        stage_cache.put(file_digest(path), "diarize", final_params, outcomes[path])
+                except Exception as e:
+                    logger.error(f"Failed to transcribe {path}: {e}", exc_info=True)
+                    outcomes[path] = e
+    return {path: outcomes[path] for path in audio_paths}
+
+
+def run_incremental(audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                    stage_cache: StageCache | None = None, streaming: bool = False, metrics: RunMetrics | None = None,
+                    prometheus_file: str | None = None, vad: bool = False,
+                    summary_cache: SummaryCache | None = None, checkpoints: JobCheckpoints | None = None) -> str:
+    """
+    Transcribes and summarizes one recording, writing results as soon as they exist.
+
+    Speaker blocks are appended to the transcript file as they are finalized and fed straight into
+    `LLMModule.summarize_blocks`, whose per-chunk notes are appended to a notes file as they arrive.
+    With `streaming`, both files grow while later windows are still being transcribed and the whole
+    transcript is never held in memory. The structured transcript artifact is built from compact
+    columns along the way and saved as soon as the transcript is complete.
+
+    With `checkpoints`, the transcription stages are checkpointed in the job directory (pass a
+    `LayeredStageCache` including them as `stage_cache`), the finished transcript is recorded in the
+    job and the summary is checkpointed like in `summarize_with_checkpoints`. A resumed job whose
+    transcript was already saved is summarized from that transcript without transcribing again.
+
+    Returns:
+        str: The summary.
+    """
+    from voice import iter_transcript_blocks
+    from llm import LLMModule
+    logger = logging.getLogger(__name__)
+    metrics = metrics if metrics is not None else RunMetrics()
+    llm_module = LLMModule(os.getenv("LLM_MODEL", "qwen3:8b"), metrics=metrics, summary_cache=summary_cache)
+    params = transcript_params(language, min_speakers, max_speakers, streaming, vad)
+    outputs = checkpoints.saved_outputs(audio_path, params) if checkpoints is not None else None
+    if outputs is not None:
+        logger.info(f"Reusing the transcript saved by an earlier run: {outputs['transcript_file']}")
+        transcript = Path(outputs["transcript_file"]).read_text(encoding="utf-8")
+        summary = summarize_with_checkpoints(llm_module, transcript, [language], checkpoints, audio_path)[language]
+        if isinstance(summary, Exception):
+            logger.error(f"An error occurred while summarizing the audio file: {summary}")
+            checkpoints.fail(audio_path, summary)
+            raise summary
+        return _finish_incremental(summary, language, audio_path, outputs["time_stamp"], checkpoints, metrics,
+                                   prometheus_file)
+
+    time_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    transcript_path = result_path(language, audio_path, time_stamp, "transcript", "txt")
+    notes_path = result_path(language, audio_path, time_stamp, "notes", "md")
+    artifact = TranscriptArtifactBuilder()
+    logger.info(f"Writing transcript incrementally to {transcript_path}")
+
+    def transcript_blocks():
+        blocks = iter_transcript_blocks(audio_path, language, min_speakers, max_speakers, hf_token,
+                                        stage_cache=stage_cache, streaming=streaming, metrics=metrics, vad=vad,
+                                        on_segment=artifact.add)
+        yield from append_blocks(blocks, transcript_path)
+        # The transcript is complete, so a resumed run only has to summarize it
+        artifact_file = artifact.build(language).save(
+            result_path(language, audio_path, time_stamp, "transcript", ARTIFACT_EXT))
+        if checkpoints is not None:
+            checkpoints.record_outputs(audio_path, params, time_stamp=time_stamp, transcript_file=transcript_path,
+                                       artifact_file=artifact_file)
+
+    with open(notes_path, "a", encoding="utf-8") as notes_file:
+        def write_note(part: int, note: str) -> None:
+            notes_file.write(f"## Part {part}\n{note}\n\n")
+            notes_file.flush()
+            logger.info(f"Notes of part {part} written to {notes_path}")
+
+        try:
+            summary = llm_module.summarize_blocks(transcript_blocks(), language, on_note=write_note)
+            if checkpoints is not None:
+                transcript = Path(transcript_path).read_text(encoding="utf-8")
+                checkpoints.put(checkpoints.jobs[audio_path], SUMMARY_STAGE,
+                                summary_checkpoint_params(llm_module, transcript, language), summary)
+        except Exception as e:
+            logger.error(f"An error occurred while summarizing the audio file: {e}", exc_info=True)
+            if checkpoints is not None:
+                checkpoints.fail(audio_path, e)
+            raise
+    if os.path.getsize(notes_path) == 0:
+        # The transcript fit in one request, so there were no partial notes
+        os.remove(notes_path)
+    return _finish_incremental(summary, language, audio_path, time_stamp, checkpoints, metrics, prometheus_file)
+
+
+def _finish_incremental(summary: str, language: str, audio_path: str, time_stamp: str,
+                        checkpoints: JobCheckpoints | None, metrics: RunMetrics, prometheus_file: str | None) -> str:
+    save_result(summary, language, audio_path, time_stamp, "summary", "md")
+    logging.getLogger(__name__).info("Summary saved to results directory!")
+    if checkpoints is not None:
+        checkpoints.finish(audio_path)
+    write_run_metrics(metrics, language, audio_path, time_stamp, prometheus_file)
+    return summary
+
+
+def run_batch(audio_paths: list[str], language: str, min_speakers: int, max_speakers: int, hf_token: str,
+              chunk_size: int | None = None, stage_cache: StageCache | None = None,
+              streaming: bool = False, metrics: RunMetrics | None = None,
+              prometheus_file: str | None = None, vad: bool = False, devices: list[str] | None = None,
+              threads_per_worker: int | None = None, summary_cache: SummaryCache | None = None,
+              summary_languages: list[str] | None = None, checkpoints: JobCheckpoints | None = None) -> dict:
+    """
+    Transcribes and summarizes many recordings in one process.
+
+    Transcription, alignment and diarization run stage by stage over each chunk of files (see
+    `voice.transcribe_files`), then the transcripts are summarized concurrently with a single
+    `LLMModule`. With `devices`, transcription is instead sharded over one worker process per
+    device (see `transcribe_sharded`). A file that fails at any step is recorded in the report and
+    does not abort the rest of the batch. Per-stage timings and LLM usage of the whole batch are
+    saved as one run report. With `summary_languages`, every transcript is summarized in each of
+    those languages (default: `language`) in the same concurrent request set. With `checkpoints`
+    (see `prepare_checkpoints`), transcript files and summaries completed by an earlier run are reused,
+    new summaries are checkpointed and each file's job is marked completed or failed.
+
+    Returns:
+        dict: Batch report with per-file status, output files and errors.
+    """
+    from voice import transcribe_files
+    from llm import LLMModule
+    logger = logging.getLogger(__name__)
+    metrics = metrics if metrics is not None else RunMetrics()
+    files = []
+    valid_paths = []
+    for audio_path in audio_paths:
+        try:
+            validate_audio_path(audio_path)
+            valid_paths.append(audio_path)
+        except FileNotFoundError as e:
+            logger.error(f"Audio file path validation failed: {e}")
+            files.append({"audio_path": audio_path, "status": "failed", "stage": "validate", "error": str(e)})
+
+    logger.info(f"Parsing speakers and transcripts of {len(valid_paths)} files...")
+    if devices:
+        # Worker processes do not report their stage timings, so the sharded run is timed as a whole
+        with metrics.stage("transcribe_sharded", devices=",".join(devices), files=len(valid_paths)):
+            outcomes = transcribe_sharded(valid_paths, language, min_speakers, max_speakers, hf_token, devices,
+                                          threads_per_worker=threads_per_worker, stage_cache=stage_cache,
+                                          streaming=streaming, vad=vad)
+    else:
+        outcomes = transcribe_files(valid_paths, language, min_speakers, max_speakers, hf_token,
+                                    chunk_size=chunk_size, stage_cache=stage_cache, streaming=streaming,
+                                    metrics=metrics, vad=vad)
+    logger.info("Parsing completed!")
+
+    pending = []
+    output_params = transcript_params(language, min_speakers, max_speakers, streaming, vad)
+    for audio_path in list(outcomes):
+        segments = outcomes.pop(audio_path)
+        entry = {"audio_path": audio_path}
+        files.append(entry)
+        if isinstance(segments, Exception):
+            entry.update(status="failed", stage="transcribe", error=str(segments))
+            continue
+        try:
+            transcript, outputs = save_job_transcript(segments, language, audio_path, checkpoints, output_params)
+            entry.update(outputs)
+            pending.append((entry, transcript))
+        except OSError as e:
+            logger.error(f"Failed to save transcript of {audio_path}: {e}", exc_info=True)
+            entry.update(status="failed", stage="save", error=str(e))
+
+    if pending:
+        # Summaries are requested concurrently so the LLM backend can batch them. The languages of one
+        # transcript are requested next to each other, so their shared prompt prefix is cached together.
+        languages = summary_languages or [language]
+        logger.info(f"Summarizing {len(pending)} transcripts in {', '.join(languages)}...")
+        all_summaries = [{} for _ in pending]
+        requests = []
+        try:
+            llm_module = LLMModule(os.getenv("LLM_MODEL", "qwen3:8b"), metrics=metrics, summary_cache=summary_cache)
+            for index, (entry, transcript) in enumerate(pending):
+                digest = checkpoints.jobs.get(entry["audio_path"]) if checkpoints is not None else None
+                for summary_language in languages:
+                    params = summary_checkpoint_params(llm_module, transcript, summary_language)
+                    cached = checkpoints.get(digest, SUMMARY_STAGE, params) if digest else None
+                    if cached is not None:
+                        all_summaries[index][summary_language] = cached
+                    else:
+                        requests.append((index, summary_language, transcript, digest, params))
+            results = asyncio.run(llm_module.summarize_many(
+                [(transcript, summary_language) for _, summary_language, transcript, _, _ in requests]))
+        except Exception as e:
+            logger.error(f"Failed to summarize transcripts: {e}", exc_info=True)
+            requests = [(index, summary_language, None, None, None) for index in range(len(pending))
+                        for summary_language in languages if summary_language not in all_summaries[index]]
+            results = [e] * len(requests)
+        for (index, summary_language, _, digest, params), summary in zip(requests, results):
+            all_summaries[index][summary_language] = summary
+            if digest and not isinstance(summary, Exception):
+                checkpoints.put(digest, SUMMARY_STAGE, params, summary)
+        for (entry, _), summaries in zip(pending, all_summaries):
+            audio_path = entry["audio_path"]
+            summaries = {summary_language: summaries[summary_language] for summary_language in languages}
+            try:
+                entry.update(summary_files_entry(save_summaries(summaries, audio_path, entry["time_stamp"])))
+                entry["status"] = "success"
+                logger.info(f"Summary saved for {audio_path}")
+            except OSError as e:
+                logger.error(f"Failed to save summary of {audio_path}: {e}", exc_info=True)
+                entry.update(status="failed", stage="save", error=str(e))
+            except Exception as e:
+                entry.update(status="failed", stage="summarize", error=str(e))
+
+    record_job_outcomes(checkpoints, files)
+    metrics_file = write_run_metrics(metrics, language, "batch", datetime.now().strftime('%Y%m%d_%H%M%S'),
+                                     prometheus_file)
+    return write_batch_report(files, language, metrics_file=metrics_file)
+
+
+def write_batch_report(files: list[dict], language: str, **extra) -> dict:
+    """
+    Logs the failed files of a batch and saves the JSON batch report to the results directory.
+    """
+    logger = logging.getLogger(__name__)
+    succeeded = sum(1 for entry in files if entry["status"] == "success")
+    report = {"total": len(files), "succeeded": succeeded, "failed": len(files) - succeeded, "files": files, **extra}
+    time_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    report_path = save_result(json.dumps(report, ensure_ascii=False, indent=2), language, "batch",
+                              time_stamp, "batch_report", "json")
+    for entry in files:
+        if entry["status"] == "failed":
+            logger.warning(f"FAILED {entry['audio_path']} ({entry['stage']}): {entry['error']}")
+    logger.info(f"Batch completed: {succeeded}/{len(files)} files succeeded. Report: {report_path}")
+    return report
+
+
+def parse_stage_workers(spec: str | None) -> dict[str, int]:
+    """
+    Parses a "stage=workers" list such as "decode=2,summarize=4" into a dict.
+
+    Raises:
+        ValueError: If a stage name is unknown or a worker count is not a positive integer.
+    """
+    workers = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, count = part.partition("=")
+        name = name.strip()
+        if name not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown pipeline stage: {name}. Stages: {', '.join(PIPELINE_STAGES)}")
+        try:
+            workers[name] = int(count)
+        except ValueError:
+            raise ValueError(f"Worker count of stage '{name}' must be a number. Current value: {count}")
+        if workers[name] < 1:
+            raise ValueError(f"Worker count of stage '{name}' must be a positive integer. Current value: {count}")
+    return workers
+
+
+def run_pipelined(audio_paths: list[str], language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                  stage_cache: StageCache | None = None, stage_workers: dict | None = None,
+                  queue_size: int = 2, metrics: RunMetrics | None = None,
+                  prometheus_file: str | None = None, vad: bool = False,
+                  summary_cache: SummaryCache | None = None, summary_languages: list[str] | None = None,
+                  checkpoints: JobCheckpoints | None = None) -> dict:
+    """
+    Transcribes and summarizes many recordings with overlapping stages.
+
+    Files flow through decode -> transcribe -> align -> diarize -> format -> summarize -> write, each
+    stage with its own workers and a bounded queue in front of it, so CPU decoding, GPU inference and
+    the remote LLM call run at the same time on different files. Models stay resident in the model
+    pool for the whole run. Per-stage throughput is logged and included in the batch report.
+
+    Args:
+        stage_workers (dict | None): Worker count per stage name. Defaults to 2 decode workers,
+            LLM_MAX_CONCURRENCY summarize workers and 1 worker for the other stages.
+        queue_size (int): Capacity of the queue in front of each stage.
+        metrics (RunMetrics | None): Collector of per-stage timings and LLM usage. A new one is used by default.
+        prometheus_file (str | None): Also write the metrics in Prometheus text format to this file.
+        vad (bool): Remove long silences before transcription and diarization.
+        summary_cache (SummaryCache | None): Cache of finished summaries; None bypasses it.
+        summary_languages (list[str] | None): Languages to summarize each transcript in, concurrently.
+            Defaults to `language`.
+        checkpoints (JobCheckpoints | None): Jobs of the input files (see `prepare_checkpoints`). Summaries are
+            checkpointed and reused like the stages in `stage_cache`, transcript files saved by an earlier run
+            are reused, and each job is marked completed or failed.
+
+    Returns:
+        dict: Batch report with per-file status, output files, errors and per-stage statistics.
+    """
+    from voice import FileStages
+    from llm import LLMModule
+    logger = logging.getLogger(__name__)
+    metrics = metrics if metrics is not None else RunMetrics()
+    file_stages = FileStages(language, min_speakers, max_speakers, hf_token, stage_cache=stage_cache,
+                             metrics=metrics, vad=vad)
+    llm_module = LLMModule(os.getenv("LLM_MODEL", "qwen3:8b"), metrics=metrics, summary_cache=summary_cache)
+    workers = {"decode": 2, "summarize": llm_module.max_concurrency, **(stage_workers or {})}
+    summary_languages = summary_languages or [language]
+    output_params = transcript_params(language, min_speakers, max_speakers, vad=vad)
+    # Audio path -> time stamp and transcript files, reported even when a later stage fails
+    outputs = {}
+
+    def model_stage(name: str):
+        def run(state: dict) -> dict:
+            try:
+                return getattr(file_stages, name)(state)
+            finally:
+                # Under the low-memory policy the stage's model is unloaded after every file
+                file_stages.release(name)
+        return run
+
+    def format_stage(state: dict) -> dict:
+        state["transcript"], outputs[state["audio_path"]] = save_job_transcript(
+            state.pop("segments"), language, state["audio_path"], checkpoints, output_params)
+        state["time_stamp"] = outputs[state["audio_path"]]["time_stamp"]
+        return state
+
+    def summarize_stage(state: dict) -> dict:
+        state["summaries"] = summarize_with_checkpoints(llm_module, state.pop("transcript"), summary_languages,
+                                                        checkpoints, state["audio_path"])
+        for summary in state["summaries"].values():
+            if isinstance(summary, Exception):
+                # The summaries that did succeed are checkpointed for a rerun with --resume
+                raise summary
+        return state
+
+    def write_stage(state: dict) -> dict:
+        state["summary_files"] = save_summaries(state.pop("summaries"), state["audio_path"], state["time_stamp"])
+        logger.info(f"Summary saved for {state['audio_path']}")
+        return state
+
+    stage_fns = {
+        "decode": file_stages.decode,
+        "transcribe": model_stage("transcribe"),
+        "align": model_stage("align"),
+        "diarize": model_stage("diarize"),
+        "format": format_stage,
+        "summarize": summarize_stage,
+        "write": write_stage,
+    }
+    executor = PipelineExecutor([Stage(name, stage_fns[name], workers.get(name, 1)) for name in PIPELINE_STAGES],
+                                queue_size=queue_size)
+    files = []
+    valid_paths = []
+    for audio_path in dict.fromkeys(audio_paths):
+        try:
+            validate_audio_path(audio_path)
+            valid_paths.append(audio_path)
+        except FileNotFoundError as e:
+            logger.error(f"Audio file path validation failed: {e}")
+            files.append({"audio_path": audio_path, "status": "failed", "stage": "validate", "error": str(e)})
+
+    logger.info(f"Running pipeline over {len(valid_paths)} files...")
+    for result in executor.run(valid_paths):
+        entry = {"audio_path": result.item, **outputs.get(result.item, {})}
+        if result.ok:
+            entry.update(status="success", **summary_files_entry(result.value["summary_files"]))
+        else:
+            entry.update(status="failed", stage=result.failed_stage, error=str(result.error))
+        files.append(entry)
+    executor.log_stats()
+    record_job_outcomes(checkpoints, files)
+    metrics.record("pipeline_stages", executor.stats_report())
+    metrics_file = write_run_metrics(metrics, language, "batch", datetime.now().strftime('%Y%m%d_%H%M%S'),
+                                     prometheus_file)
+    return write_batch_report(files, language, stages=executor.stats_report(), metrics_file=metrics_file)
 
 
 def main():
     parser = argparse.ArgumentParser(description='VoiceSummary')
-    parser.add_argument('--audio_path', type=str,
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--audio_path', type=str,
                         help='Path to the audio file')
+    inputs.add_argument('--audio_dir', type=str,
+                        help='Directory of audio files to process in batch mode')
+    inputs.add_argument('--audio_glob', type=str,
+                        help='Glob pattern of audio files to process in batch mode')
+    inputs.add_argument('--manifest', type=str,
+                        help='Text file listing one audio path per line to process in batch mode')
     parser.add_argument('--language', type=str,
                         help='Language of the audio file', default='en')
+    parser.add_argument('--summary_languages', type=str,
+                        help='Comma-separated languages to summarize in, e.g. "en,ko,ja". The audio is transcribed '
+                             'once and the summaries are generated concurrently (default: --language)')
     parser.add_argument('--min_speakers', type=int,
                         help='Minimum number of speakers to expect in the audio', default=1)
     parser.add_argument('--max_speakers', type=int,
                         help='Maximum number of speakers to expect in the audio', default=4)
+    parser.add_argument('--batch_chunk_size', type=int,
+                        help='Number of files decoded and processed together per stage in batch mode', default=16)
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Overlap decoding, GPU stages and summarization of different files in batch mode')
+    parser.add_argument('--stage_workers', type=str,
+                        help='Worker count per pipeline stage, e.g. "decode=2,summarize=4" (with --pipelined)')
+    parser.add_argument('--pipeline_queue_size', type=int,
+                        help='Capacity of the queue in front of each pipeline stage (with --pipelined)', default=2)
+    parser.add_argument('--streaming', action='store_true',
+                        help='Decode and process long recordings in bounded overlapping windows')
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Bypass the transcription/alignment/diarization stage cache')
+    parser.add_argument('--no_summary_cache', action='store_true',
+                        help='Bypass the summary cache and always call the LLM')
+    parser.add_argument('--invalidate_cache', action='store_true',
+                        help='Drop cached stage outputs of the input audio files before processing')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the unfinished jobs of the input files from their last completed stage '
+                             '(checkpoints in RESULTS_DIR/jobs), reusing their saved transcripts, instead of '
+                             'starting them over')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Write transcript blocks and summary notes as they are produced (single file mode); '
+                             'with --streaming, summarization starts before transcription ends')
+    parser.add_argument('--vad', action='store_true',
+                        help='Detect speech and skip long silences before transcription and diarization')
+    parser.add_argument('--devices', type=str,
+                        help='Shard transcription over one worker process per device, e.g. "cuda:0,cuda:1", '
+                             '"cuda*2", "cpu*4" or "auto" (with --streaming, windows of long files are sharded)')
+    parser.add_argument('--threads_per_worker', type=int,
+                        help='CPU threads of each --devices worker (default: an even share of the cores)')
+    parser.add_argument('--prometheus_file', type=str,
+                        help='Also write run metrics in Prometheus text format to this file '
+                             '(e.g. for the node_exporter textfile collector)')
     args = parser.parse_args()
     dotenv.load_dotenv()
     # Ensure the 'logs' directory exists before setting up logging
@@ -54,23 +824,47 @@ def main():
     logger.info("VoiceSummary started!")
 
     # Validate language parameter
-    supported_languages = {"en", "fr", "de", "es",
-                           "it", "pt", "nl", "pl", "ru", "zh", "ja", "ko"}
-    if args.language.lower() not in supported_languages:
+    if args.language.lower() not in SUPPORTED_LANGUAGES:
         logger.error(
-            f"Unsupported language: {args.language}. Supported languages: {', '.join(sorted(supported_languages))}"
+            f"Unsupported language: {args.language}. Supported languages: {', '.join(sorted(SUPPORTED_LANGUAGES))}"
         )
         raise ValueError(
-            f"Unsupported language: {args.language}. Supported languages: {', '.join(sorted(supported_languages))}"
+            f"Unsupported language: {args.language}. Supported languages: {', '.join(sorted(SUPPORTED_LANGUAGES))}"
         )
-    # Validate audio file path
-    try:
-        logger.info(f"Validating audio file path: {args.audio_path}")
-        validate_audio_path(args.audio_path)
-        logger.info("Audio file path is valid!")
-    except (FileNotFoundError, ValueError) as e:
-        logger.error(f"Audio file path validation failed: {e}")
-        raise
+    if args.pipelined and args.streaming:
+        logger.error("--pipelined cannot be combined with --streaming.")
+        raise ValueError("--pipelined cannot be combined with --streaming.")
+    if args.pipelined and args.devices:
+        logger.error("--pipelined cannot be combined with --devices.")
+        raise ValueError("--pipelined cannot be combined with --devices.")
+    summary_languages = parse_summary_languages(args.summary_languages, args.language)
+    stage_workers = parse_stage_workers(args.stage_workers)
+    devices = parse_devices(args.devices) if args.devices else None
+    if args.incremental and (args.audio_path is None or devices):
+        logger.error("--incremental requires --audio_path and cannot be combined with --devices.")
+        raise ValueError("--incremental requires --audio_path and cannot be combined with --devices.")
+    if args.resume and args.no_cache:
+        logger.error("--resume cannot be combined with --no_cache, which stores no stage outputs to resume from.")
+        raise ValueError("--resume cannot be combined with --no_cache, which stores no stage outputs to resume from.")
+    if args.incremental and summary_languages != [args.language]:
+        logger.error("--incremental summarizes in --language only and cannot be combined with --summary_languages.")
+        raise ValueError("--incremental summarizes in --language only and cannot be combined with --summary_languages.")
+    batch_mode = args.audio_path is None
+    if batch_mode:
+        audio_paths = collect_audio_paths(args.audio_dir, args.audio_glob, args.manifest)
+        if not audio_paths:
+            logger.error("No audio files found for batch mode.")
+            raise FileNotFoundError("No audio files found for batch mode.")
+        logger.info(f"Batch mode: {len(audio_paths)} audio files found.")
+    else:
+        # Validate audio file path
+        try:
+            logger.info(f"Validating audio file path: {args.audio_path}")
+            validate_audio_path(args.audio_path)
+            logger.info("Audio file path is valid!")
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Audio file path validation failed: {e}")
+            raise
 
     logger.info("Loading environment variables...")
     hf_token = os.getenv("HF_TOKEN")
@@ -78,32 +872,85 @@ def main():
         logger.error("HF_TOKEN environment variable is not set.")
         raise ValueError("HF_TOKEN environment variable is required.")
     logger.info("Environment variables loaded!")
+
+    stage_cache = prepare_stage_cache(audio_paths if batch_mode else [args.audio_path],
+                                      args.no_cache, args.invalidate_cache)
+    summary_cache = None if args.no_summary_cache else summary_cache_from_env()
+    # Every stage is checkpointed in the job directory of its file, in front of the shared stage cache
+    try:
+        checkpoints = prepare_checkpoints(audio_paths if batch_mode else [args.audio_path], args.resume,
+                                          args.no_cache)
+    except JobInProgressError as e:
+        logger.error(str(e))
+        raise
+    if checkpoints is not None:
+        stage_cache = LayeredStageCache(checkpoints, stage_cache)
+    metrics = RunMetrics()
+    if batch_mode and args.pipelined:
+        return run_pipelined(audio_paths, args.language, args.min_speakers, args.max_speakers, hf_token,
+                             stage_cache=stage_cache, stage_workers=stage_workers,
+                             queue_size=args.pipeline_queue_size, metrics=metrics,
+                             prometheus_file=args.prometheus_file, vad=args.vad, summary_cache=summary_cache,
+                             summary_languages=summary_languages, checkpoints=checkpoints)
+    if batch_mode:
+        return run_batch(audio_paths, args.language, args.min_speakers, args.max_speakers, hf_token,
+                         chunk_size=args.batch_chunk_size, stage_cache=stage_cache, streaming=args.streaming,
+                         metrics=metrics, prometheus_file=args.prometheus_file, vad=args.vad, devices=devices,
+                         threads_per_worker=args.threads_per_worker, summary_cache=summary_cache,
+                         summary_languages=summary_languages, checkpoints=checkpoints)
+
+    if args.incremental:
+        return run_incremental(args.audio_path, args.language, args.min_speakers, args.max_speakers, hf_token,
+                               stage_cache=stage_cache, streaming=args.streaming, metrics=metrics,
+                               prometheus_file=args.prometheus_file, vad=args.vad, summary_cache=summary_cache,
+                               checkpoints=checkpoints)
+
     logger.info("Parsing speakers and transcript...")
+    from voice import transcribe_files
+    from llm import LLMModule
 
     try:
-        transcripts = parse_speakers_and_transcript(
-            args.audio_path, args.language, args.min_speakers, args.max_speakers, hf_token)
+        if devices:
+            with metrics.stage("transcribe_sharded", devices=",".join(devices), files=1):
+                segments = transcribe_sharded(
+                    [args.audio_path], args.language, args.min_speakers, args.max_speakers, hf_token, devices,
+                    threads_per_worker=args.threads_per_worker, stage_cache=stage_cache,
+                    streaming=args.streaming, vad=args.vad)[args.audio_path]
+        else:
+            segments = transcribe_files(
+                [args.audio_path], args.language, args.min_speakers, args.max_speakers, hf_token,
+                stage_cache=stage_cache, streaming=args.streaming, metrics=metrics, vad=args.vad)[args.audio_path]
+        if isinstance(segments, Exception):
+            raise segments
         logger.info("Parsing completed!")
-        time_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         logger.info("Saving transcript to results directory...")
-        save_result(transcripts, args.language, args.audio_path,
-                    time_stamp, "transcript", "txt")
+        transcripts, outputs = save_job_transcript(
+            segments, args.language, args.audio_path, checkpoints,
+            transcript_params(args.language, args.min_speakers, args.max_speakers, args.streaming, args.vad))
+        time_stamp = outputs["time_stamp"]
+        del segments
         logger.info("Transcript saved to results directory!")
         model_name = os.getenv("LLM_MODEL", "qwen3:8b")
-        llm_module = LLMModule(model_name)
-        summary = llm_module.summarize_transcript(transcripts, args.language)
+        llm_module = LLMModule(model_name, metrics=metrics, summary_cache=summary_cache)
+        logger.info(f"Summarizing in {', '.join(summary_languages)}...")
+        summaries = summarize_with_checkpoints(llm_module, transcripts, summary_languages, checkpoints,
+                                               args.audio_path)
         logger.info("Summary completed!")
         logger.info("Saving summary to results directory...")
-        save_result(summary, args.language, args.audio_path,
-                    time_stamp, "summary", "md")
+        save_summaries(summaries, args.audio_path, time_stamp)
         logger.info("Summary saved to results directory!")
-        return summary
+        if checkpoints is not None:
+            checkpoints.finish(args.audio_path)
+        write_run_metrics(metrics, args.language, args.audio_path, time_stamp, args.prometheus_file)
+        return summaries if len(summaries) > 1 else summaries[summary_languages[0]]
     except Exception as e:
         logger.error(
             f"An error occurred while summarizing the audio file: {e}", exc_info=True)
+        if checkpoints is not None:
+            checkpoints.fail(args.audio_path, e)
         raise
 
 
 if __name__ == "__main__":
     summary = main()
-    print(summary)
+    print(json.dumps(summary, ensure_ascii=False, indent=2) if isinstance(summary, dict) else summary)
@@ -0,0 +1,5 @@
+from .executor import PipelineExecutor, PipelineResult, Stage
+from .metrics import RunMetrics
+from .sharding import DevicePool, parse_devices
+
+__all__ = ["DevicePool", "PipelineExecutor", "PipelineResult", "RunMetrics", "Stage", "parse_devices"]
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline stage: `fn` maps an item's value to the value handed to the next stage."""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one input item: the last stage's output, or the error and the stage that raised it."""
+    item: Any
+    value: Any = None
+    error: Exception | None = None
+    failed_stage: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class StageStats:
+    """Counters of one stage. Times are summed over the stage's workers."""
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    idle_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self, wall_seconds: float) -> dict:
+        processed = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "idle_seconds": round(self.idle_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(processed / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+            "mean_seconds_per_item": round(self.busy_seconds / processed, 3) if processed else 0.0,
+            "utilization": round(self.busy_seconds / (wall_seconds * self.workers), 3) if wall_seconds > 0 else 0.0,
+        }
+
+
+class PipelineExecutor:
+    """
+    Runs items through a chain of stages concurrently, with bounded queues between stages.
+
+    Every stage has its own pool of worker threads, so different items can be in different stages
+    at the same time (e.g. CPU decoding of file N+2, GPU transcription of file N+1 and the remote LLM
+    call of file N). The queue in front of each stage holds at most `queue_size` items; a stage whose
+    output queue is full blocks, which bounds how many items (and how much decoded audio) are in
+    flight. An item whose stage raises is reported as failed and skips the remaining stages.
+    """
+
+    def __init__(self, stages: list[Stage], queue_size: int = 2):
+        if not stages:
+            raise ValueError("At least one stage is required.")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be a positive integer. Current value: {queue_size}")
+        for stage in stages:
+            if stage.workers < 1:
+                raise ValueError(
+                    f"Stage '{stage.name}' must have at least one worker. Current value: {stage.workers}")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = {stage.name: StageStats(stage.name, stage.workers) for stage in stages}
+        self.wall_seconds = 0.0
+
+    def run(self, items: list) -> list[PipelineResult]:
+        """
+        Processes `items` and returns one `PipelineResult` per item, in input order.
+        """
+        self.stats = {stage.name: StageStats(stage.name, stage.workers) for stage in self.stages}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: list[PipelineResult | None] = [None] * len(items)
+        remaining_workers = [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+
+        def worker(position: int) -> None:
+            stage = self.stages[position]
+            stats = self.stats[stage.name]
+            while True:
+                wait_start = time.perf_counter()
+                job = queues[position].get()
+                started = time.perf_counter()
+                with stats._lock:
+                    stats.idle_seconds += started - wait_start
+                if job is _DONE:
+                    with lock:
+                        remaining_workers[position] -= 1
+                        last_worker = remaining_workers[position] == 0
+                    if last_worker and position + 1 < len(self.stages):
+                        for _ in range(self.stages[position + 1].workers):
+                            queues[position + 1].put(_DONE)
+                    return
+                index, value = job
+                try:
+                    output = stage.fn(value)
+                    error = None
+                except Exception as e:
+                    logger.error(f"Stage '{stage.name}' failed for item {items[index]!r}: {e}", exc_info=True)
+                    output, error = None, e
+                finished = time.perf_counter()
+                with stats._lock:
+                    stats.busy_seconds += finished - started
+                    if error is None:
+                        stats.processed += 1
+                    else:
+                        stats.failed += 1
+                if error is not None:
+                    results[index] = PipelineResult(items[index], error=error, failed_stage=stage.name)
+                elif position + 1 < len(self.stages):
+                    queues[position + 1].put((index, output))
+                    with stats._lock:
+                        stats.blocked_seconds += time.perf_counter() - finished
+                else:
+                    results[index] = PipelineResult(items[index], value=output)
+
+        started = time.perf_counter()
+        threads = []
+        for position, stage in enumerate(self.stages):
+            for worker_index in range(stage.workers):
+                thread = threading.Thread(target=worker, args=(position,),
+                                          name=f"pipeline-{stage.name}-{worker_index}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        for index, item in enumerate(items):
+            queues[0].put((index, item))
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.wall_seconds = time.perf_counter() - started
+        return results
+
+    def stats_report(self) -> dict:
+        """Returns per-stage counters, throughput and utilization of the last run."""
+        return {name: stats.to_dict(self.wall_seconds) for name, stats in self.stats.items()}
+
+    def log_stats(self) -> None:
+        logger.info(f"Pipeline finished in {self.wall_seconds:.1f}s")
+        for name, stats in self.stats_report().items():
+            logger.info(
+                f"  {name:<12} workers={stats['workers']} done={stats['processed']} failed={stats['failed']} "
+                f"items/s={stats['items_per_second']} busy={stats['busy_seconds']}s "
+                f"blocked={stats['blocked_seconds']}s utilization={stats['utilization']:.0%}")
@@ -0,0 +1,225 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from utils.atomic_io import write_atomic
+
+
+def _current_rss_bytes() -> int | None:
+    """Returns the current resident set size of the process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_bytes() -> int | None:
+    """Returns the high-water mark of the process resident set size over the whole process lifetime."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _cuda():
+    # Only use torch if a stage has already imported it; metrics must not pull it in
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        return torch.cuda
+    return None
+
+
+def _cuda_devices(cuda) -> list[int]:
+    """Returns the indices of the CUDA devices this process holds memory on."""
+    return [index for index in range(cuda.device_count()) if cuda.memory_reserved(index)]
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RunMetrics:
+    """
+    Thread-safe collector of per-stage timings, memory and LLM usage for one run.
+
+    Stages are timed with the `stage` context manager, which records wall time, audio seconds and
+    real-time factor (wall time / audio time), the resident set size at the end of the stage and its
+    change during the stage and, on CUDA, the peak allocated device memory during the stage, summed
+    over the devices in use. CUDA peaks are reset on every device in use at each stage start, so when
+    stages run concurrently (pipelined mode) they are process-wide rather than per stage. The peak
+    RSS of the whole process is reported once, in `report`.
+
+    Per-stage and LLM totals are kept as running aggregates. The raw records are kept as well unless
+    `keep_records` is False, which a long-running process (the job server) uses so that memory and the
+    cost of a scrape stay bounded however many jobs it has run.
+    """
+
+    def __init__(self, keep_records: bool = True):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.keep_records = keep_records
+        self.stages: list[dict] = []
+        self.llm_calls: list[dict] = []
+        self.values: dict = {}
+        self.counters: dict[str, int] = {}
+        self._stage_totals: dict[str, dict] = {}
+        self._llm_totals = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_seconds": 0.0,
+                            "max_latency_seconds": 0.0}
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """
+        Times one execution of a stage. The yielded dict can be updated, e.g. with "audio_seconds".
+        """
+        record = {"stage": name, **fields}
+        cuda = _cuda()
+        if cuda is not None:
+            for device in _cuda_devices(cuda):
+                cuda.reset_peak_memory_stats(device)
+        rss_at_start = _current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["failed"] = True
+            raise
+        finally:
+            record["wall_seconds"] = time.perf_counter() - start
+            if record.get("audio_seconds"):
+                record["real_time_factor"] = record["wall_seconds"] / record["audio_seconds"]
+            record["rss_bytes"] = _current_rss_bytes()
+            if record["rss_bytes"] is not None and rss_at_start is not None:
+                record["rss_delta_bytes"] = record["rss_bytes"] - rss_at_start
+            if cuda is not None:
+                record["peak_cuda_bytes"] = sum(cuda.max_memory_allocated(device) for device in _cuda_devices(cuda))
+            with self._lock:
+                self._add_stage_record(record)
+                if self.keep_records:
+                    self.stages.append(record)
+
+    def _add_stage_record(self, record: dict) -> None:
+        entry = self._stage_totals.setdefault(record["stage"], {
+            "count": 0, "failed": 0, "wall_seconds": 0.0, "audio_seconds": 0.0,
+            "max_rss_bytes": None, "peak_cuda_bytes": None})
+        entry["count"] += 1
+        entry["failed"] += int(record.get("failed", False))
+        entry["wall_seconds"] += record["wall_seconds"]
+        entry["audio_seconds"] += record.get("audio_seconds") or 0.0
+        for peak, key in (("max_rss_bytes", "rss_bytes"), ("peak_cuda_bytes", "peak_cuda_bytes")):
+            if record.get(key) is not None:
+                entry[peak] = max(entry[peak] or 0, record[key])
+
+    def record_llm_call(self, model: str, prompt_tokens: int | None, completion_tokens: int | None,
+                        latency_seconds: float) -> None:
+        with self._lock:
+            totals = self._llm_totals
+            totals["requests"] += 1
+            totals["prompt_tokens"] += prompt_tokens or 0
+            totals["completion_tokens"] += completion_tokens or 0
+            totals["latency_seconds"] += latency_seconds
+            totals["max_latency_seconds"] = max(totals["max_latency_seconds"], latency_seconds)
+            if self.keep_records:
+                self.llm_calls.append({"model": model, "prompt_tokens": prompt_tokens,
+                                       "completion_tokens": completion_tokens, "latency_seconds": latency_seconds})
+
+    def record(self, key: str, value) -> None:
+        """Records a run-level value, such as the batch size chosen for transcription."""
+        with self._lock:
+            self.values[key] = value
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def stage_summary(self) -> dict:
+        """Returns the stage totals by stage name."""
+        with self._lock:
+            summary = {name: dict(entry) for name, entry in self._stage_totals.items()}
+        for entry in summary.values():
+            entry["real_time_factor"] = (entry["wall_seconds"] / entry["audio_seconds"]
+                                         if entry["audio_seconds"] else None)
+        return summary
+
+    def llm_summary(self) -> dict:
+        with self._lock:
+            return dict(self._llm_totals)
+
+    def report(self) -> dict:
+        """
+        Returns the full run report: aggregates, recorded values and the raw stage and LLM records (empty
+        without `keep_records`).
+        """
+        with self._lock:
+            stages = list(self.stages)
+            llm_calls = list(self.llm_calls)
+            values = dict(self.values)
+            counters = dict(self.counters)
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": time.time() - self.started_at,
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "values": values,
+            "counters": counters,
+            "stage_summary": self.stage_summary(),
+            "llm_summary": self.llm_summary(),
+            "stages": stages,
+            "llm_calls": llm_calls,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), ensure_ascii=False, indent=2, default=str)
+
+    def to_prometheus(self, prefix: str = "voicesummary") -> str:
+        """Renders the aggregates in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{prefix}_{name} {value}")
+
+        stages = self.stage_summary()
+        metric("stage_runs_total", "counter", "Number of stage executions.",
+               [({"stage": name}, entry["count"]) for name, entry in stages.items()])
+        metric("stage_failures_total", "counter", "Number of failed stage executions.",
+               [({"stage": name}, entry["failed"]) for name, entry in stages.items()])
+        metric("stage_seconds_total", "counter", "Wall time spent in each stage.",
+               [({"stage": name}, round(entry["wall_seconds"], 6)) for name, entry in stages.items()])
+        metric("stage_audio_seconds_total", "counter", "Audio seconds processed by each stage.",
+               [({"stage": name}, round(entry["audio_seconds"], 6)) for name, entry in stages.items()])
+        llm = self.llm_summary()
+        metric("llm_requests_total", "counter", "Number of LLM requests.", [({}, llm["requests"])])
+        metric("llm_prompt_tokens_total", "counter", "LLM prompt tokens.", [({}, llm["prompt_tokens"])])
+        metric("llm_completion_tokens_total", "counter", "LLM completion tokens.", [({}, llm["completion_tokens"])])
+        metric("llm_latency_seconds_total", "counter", "Total LLM request latency.",
+               [({}, round(llm["latency_seconds"], 6))])
+        with self._lock:
+            counters = dict(self.counters)
+        if counters:
+            metric("events_total", "counter", "Event counters such as cache hits and misses.",
+                   [({"event": name}, value) for name, value in counters.items()])
+        peak_rss = _peak_rss_bytes()
+        if peak_rss is not None:
+            metric("peak_rss_bytes", "gauge", "Peak resident set size of the process.", [({}, peak_rss)])
+        cuda = _cuda()
+        if cuda is not None:
+            metric("cuda_max_allocated_bytes", "gauge", "Peak allocated CUDA memory since the last reset.",
+                   [({"device": str(device)}, cuda.max_memory_allocated(device)) for device in _cuda_devices(cuda)])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes the Prometheus text to `path` atomically, for scraping by a textfile collector."""
+        write_atomic(path, self.to_prometheus())
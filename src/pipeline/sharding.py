@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Thread pools sized by these variables are created when torch/numpy are first used in a worker
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "CPU_THREADS")
+AUTO_CPU_THREADS = 4
+
+_worker_device = None
+
+
+def parse_devices(spec: str) -> list[str]:
+    """
+    Parses a device list into one entry per worker process.
+
+    Accepted forms (comma-separated): "cuda:0,cuda:1", "cuda*2" (cuda:0 and cuda:1), "cuda:0*2" (two workers
+    sharing one GPU), "cpu*4" (four CPU workers) and "auto" (every visible GPU, otherwise one CPU worker
+    per AUTO_CPU_THREADS cores).
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    if spec.strip() == "auto":
+        return auto_devices()
+    devices = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        device, _, count = part.partition("*")
+        try:
+            count = int(count) if count else 1
+        except ValueError:
+            raise ValueError(f"Worker count of device '{device}' must be a number. Current value: {count}")
+        device_type, _, index = device.partition(":")
+        if device_type not in {"cpu", "cuda"} or (index and not index.isdigit()) or count < 1:
+            raise ValueError(f"Invalid device: {part}. Use e.g. 'cuda:0,cuda:1', 'cuda*2' or 'cpu*4'.")
+        if device_type == "cuda" and not index and count > 1:
+            devices.extend(f"cuda:{i}" for i in range(count))
+        else:
+            devices.extend([device] * count)
+    if not devices:
+        raise ValueError("At least one device is required.")
+    return devices
+
+
+def auto_devices() -> list[str]:
+    """Returns every visible GPU, or CPU workers of AUTO_CPU_THREADS threads each when there is none."""
+    import torch
+    gpu_count = torch.cuda.device_count() if torch.cuda.is_available() else 0
+    if gpu_count:
+        return [f"cuda:{index}" for index in range(gpu_count)]
+    return ["cpu"] * max((os.cpu_count() or 1) // AUTO_CPU_THREADS, 1)
+
+
+def _init_worker(devices, threads: int) -> None:
+    global _worker_device
+    # Each worker process takes one device for its whole life, so its models stay resident there
+    _worker_device = devices.get()
+    try:
+        for name in THREAD_ENV_VARS:
+            os.environ[name] = str(threads)
+        # Spawned workers re-import the parent's main module, which may already have imported torch
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(threads)
+    except BaseException:
+        devices.put(_worker_device)
+        raise
+    # The device goes back to the queue when the worker exits, also after a failure, so the worker that
+    # replaces it does not block forever waiting for a device. Multiprocessing children skip atexit
+    # handlers, but run these finalizers (before the queue is flushed and closed).
+    multiprocessing.util.Finalize(None, devices.put, args=(_worker_device,), exitpriority=10)
+    logger.info(f"Worker {os.getpid()} using device {_worker_device} with {threads} threads")
+
+
+def _call_on_device(fn, args: tuple, kwargs: dict):
+    return fn(*args, device=_worker_device, **kwargs)
+
+
+class DevicePool:
+    """
+    Pool of worker processes, one per device entry, that run tasks on their own device.
+
+    Tasks are pulled by whichever worker is free, so long and short files balance across devices.
+    Every worker keeps its process (and so its model pool) for the pool's lifetime. CPU thread pools
+    of each worker are capped at `threads_per_worker`, which defaults to an even share of the cores,
+    so several workers do not oversubscribe torch's intra-op threads.
+    """
+
+    def __init__(self, devices: list[str], threads_per_worker: int | None = None):
+        if not devices:
+            raise ValueError("At least one device is required.")
+        if threads_per_worker is not None and threads_per_worker < 1:
+            raise ValueError(
+                f"threads_per_worker must be a positive integer. Current value: {threads_per_worker}")
+        self.devices = devices
+        self.threads_per_worker = threads_per_worker or max((os.cpu_count() or 1) // len(devices), 1)
+        # CUDA cannot be used in forked children of a process that already initialized it
+        context = multiprocessing.get_context("spawn")
+        device_queue = context.Queue()
+        for device in devices:
+            device_queue.put(device)
+        self._executor = ProcessPoolExecutor(max_workers=len(devices), mp_context=context,
+                                             initializer=_init_worker,
+                                             initargs=(device_queue, self.threads_per_worker))
+        logger.info(f"Started device pool: {', '.join(devices)} ({self.threads_per_worker} threads per worker)")
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Runs `fn(*args, device=<worker device>, **kwargs)` in a worker. `fn` must be picklable."""
+        return self._executor.submit(_call_on_device, fn, args, kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=exc_type is None)
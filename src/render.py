@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+from voice.transcript_artifact import TranscriptArtifact
+
+RENDERERS = {
+    "text": TranscriptArtifact.render_text,
+    "srt": TranscriptArtifact.render_srt,
+    "vtt": TranscriptArtifact.render_vtt,
+    "speakers": lambda artifact: json.dumps(artifact.render_speakers(), ensure_ascii=False, indent=2),
+}
+
+
+def parse_speaker_names(spec: str | None) -> dict:
+    """
+    Parses speaker renames such as "SPEAKER_00=Alice,SPEAKER_01=Bob".
+
+    Raises:
+        ValueError: If an entry is not of the form LABEL=NAME.
+    """
+    names = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        label, separator, name = part.partition("=")
+        if not separator or not label.strip() or not name.strip():
+            raise ValueError(f"Invalid speaker name: {part}. Use e.g. 'SPEAKER_00=Alice'.")
+        names[label.strip()] = name.strip()
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render a saved transcript artifact (.vst) again')
+    parser.add_argument('artifact_path', type=str, help='Path to a transcript_*.vst file')
+    parser.add_argument('--format', type=str, choices=sorted(RENDERERS), default='text',
+                        help='Output format')
+    parser.add_argument('--speaker_names', type=str,
+                        help='Rename speakers, e.g. "SPEAKER_00=Alice,SPEAKER_01=Bob"')
+    parser.add_argument('--output', type=str, help='Write to this file instead of standard output')
+    args = parser.parse_args()
+
+    artifact = TranscriptArtifact.load(args.artifact_path).relabel(parse_speaker_names(args.speaker_names))
+    rendered = RENDERERS[args.format](artifact)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered)
+    else:
+        sys.stdout.write(rendered + "\n")
+
+
+if __name__ == "__main__":
+    main()
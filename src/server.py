@@ -0,0 +1,123 @@
+import dotenv
+import logging
+import os
+import argparse
+import threading
+from datetime import datetime
+from voice import get_model_pool, stage_cache_from_env
+from llm import summary_cache_from_env
+from pipeline import RunMetrics
+from service import JobManager, JobServer, audio_root_from_env, upload_dir_from_env
+from main import SUPPORTED_LANGUAGES, save_result, save_transcript
+
+
+def validate_job_options(language: str, min_speakers: int, max_speakers: int) -> None:
+    """
+    Rejects job options the pipeline would fail on, before the job is queued.
+
+    Raises:
+        ValueError: If the language is unsupported or the speaker bounds are invalid.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        raise ValueError(
+            f"Unsupported language: {language}. Supported languages: {', '.join(sorted(SUPPORTED_LANGUAGES))}")
+    if min_speakers < 1:
+        raise ValueError(f"min_speakers must be at least 1. Current value: {min_speakers}")
+    if max_speakers < min_speakers:
+        raise ValueError(
+            f"max_speakers must be at least min_speakers. min: {min_speakers}, max: {max_speakers}")
+
+
+def create_server(host: str, port: int, workers: int, queue_size: int, hf_token: str,
+                  no_cache: bool = False, max_upload_mb: float | None = None, vad: bool = False,
+                  no_summary_cache: bool = False) -> JobServer:
+    """
+    Creates the job server with one warm model pool and one LLM client shared by all jobs.
+
+    GPU stages of different jobs are serialized, because the WhisperX and pyannote models are shared
+    and not safe to call concurrently; with more than one worker, the summarization of one job (a
+    remote LLM call) overlaps with the transcription of the next. Results are saved like the CLI saves
+    them (transcript, transcript artifact and summary under one time stamp), and the metrics keep only
+    running totals, so a long-running server stays bounded in memory.
+    """
+    from voice import transcribe_files
+    from llm import LLMModule
+    logger = logging.getLogger(__name__)
+    model_pool = get_model_pool()
+    if model_pool.policy != "keep":
+        logger.warning(f"MODEL_POOL_POLICY is {model_pool.policy}: models will be reloaded for every job.")
+    stage_cache = None if no_cache else stage_cache_from_env()
+    metrics = RunMetrics(keep_records=False)
+    summary_cache = None if no_summary_cache else summary_cache_from_env()
+    llm_module = LLMModule(os.getenv("LLM_MODEL", "qwen3:8b"), metrics=metrics, summary_cache=summary_cache)
+    gpu_lock = threading.Lock()
+
+    def transcribe(job) -> str:
+        with gpu_lock:
+            segments = transcribe_files(
+                [job.audio_path], job.language, job.min_speakers, job.max_speakers, hf_token,
+                model_pool=model_pool, stage_cache=stage_cache, metrics=metrics, vad=vad)[job.audio_path]
+        if isinstance(segments, Exception):
+            raise segments
+        time_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        transcript, transcript_file, artifact_file = save_transcript(
+            segments, job.language, job.audio_path, time_stamp)
+        job.outputs.update(time_stamp=time_stamp, transcript_file=transcript_file, artifact_file=artifact_file)
+        return transcript
+
+    def save(job) -> None:
+        job.outputs["summary_file"] = save_result(
+            job.summary, job.language, job.audio_path, job.outputs["time_stamp"], "summary", "md")
+
+    manager = JobManager(transcribe, llm_module.summarize_transcript, workers=workers, queue_size=queue_size,
+                         on_success=save)
+    server = JobServer((host, port), manager, upload_dir_from_env(), validate_options=validate_job_options,
+                       max_upload_bytes=int(max_upload_mb * 1024 * 1024) if max_upload_mb else None,
+                       metrics=metrics, audio_root=audio_root_from_env())
+    manager.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='VoiceSummary job server')
+    parser.add_argument('--host', type=str, help='Address to listen on', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='Port to listen on', default=8000)
+    parser.add_argument('--workers', type=int,
+                        help='Number of jobs processed concurrently (GPU stages are still serialized)', default=2)
+    parser.add_argument('--queue_size', type=int,
+                        help='Maximum number of jobs waiting for a worker; further submissions get 503', default=16)
+    parser.add_argument('--max_upload_mb', type=float, help='Largest accepted audio upload in MB', default=1024)
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Bypass the transcription/alignment/diarization stage cache')
+    parser.add_argument('--no_summary_cache', action='store_true',
+                        help='Bypass the summary cache and always call the LLM')
+    parser.add_argument('--vad', action='store_true',
+                        help='Detect speech and skip long silences before transcription and diarization')
+    args = parser.parse_args()
+    dotenv.load_dotenv()
+    os.makedirs('logs', exist_ok=True)
+    os.makedirs(os.getenv("RESULTS_DIR", "results"), exist_ok=True)
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(), logging.FileHandler('logs/voicesummary.log')])
+
+    hf_token = os.getenv("HF_TOKEN")
+    if not hf_token:
+        logger.error("HF_TOKEN environment variable is not set.")
+        raise ValueError("HF_TOKEN environment variable is required.")
+
+    server = create_server(args.host, args.port, args.workers, args.queue_size, hf_token,
+                           no_cache=args.no_cache, max_upload_mb=args.max_upload_mb, vad=args.vad,
+                           no_summary_cache=args.no_summary_cache)
+    logger.info(f"VoiceSummary server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        server.server_close()
+        server.manager.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from .jobs import Job, JobManager, JobQueueFullError
+from .http_server import JobServer, audio_root_from_env, upload_dir_from_env
+
+__all__ = ["Job", "JobManager", "JobQueueFullError", "JobServer", "audio_root_from_env", "upload_dir_from_env"]
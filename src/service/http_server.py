@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import re
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+from .jobs import SUCCEEDED, JobManager, JobQueueFullError
+
+logger = logging.getLogger(__name__)
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(?:/(transcript|summary))?$")
+# Uploads are copied to disk in chunks of this size, so memory use does not grow with the upload
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_JSON_BODY_BYTES = 64 * 1024
+# Unread request bodies up to this size are drained before an error response, so the client gets it
+# instead of a connection reset
+_MAX_DRAIN_BYTES = 16 * 1024 * 1024
+
+
+class _RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class JobServer(ThreadingHTTPServer):
+    """
+    HTTP front end of a `JobManager`.
+
+    Endpoints:
+        POST /jobs: Submits a job. Either a JSON body {"audio_path", "language", "min_speakers", "max_speakers"}
+            for a file under `audio_root`, or the raw audio bytes as the body with the options in the query
+            string (?filename=meeting.mp3&language=ko&min_speakers=2). Uploads are streamed to `upload_dir`
+            after the options are validated and deleted when the job finishes. Returns 202 with the job, or
+            503 when the queue is full.
+        GET /jobs/{id}: Job status.
+        GET /jobs/{id}/transcript, GET /jobs/{id}/summary: Results of a succeeded job (409 until then).
+        GET /health: Queue and job counters.
+        GET /metrics: Prometheus text of the optional metrics collector.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], manager: JobManager, upload_dir: str,
+                 validate_options: Callable[[str, int, int], None] | None = None,
+                 max_upload_bytes: int | None = None, metrics=None, audio_root: str | None = None):
+        """
+        Args:
+            address (tuple[str, int]): (host, port) to listen on. Port 0 picks a free port.
+            manager (JobManager): Manager that runs the submitted jobs.
+            upload_dir (str): Directory where uploaded audio is stored until its job finishes.
+            validate_options (Callable | None): Checks (language, min_speakers, max_speakers) and raises
+                ValueError if they are invalid, so bad requests fail with 400 before being queued.
+            max_upload_bytes (int | None): Largest accepted upload. None means unlimited.
+            metrics: Optional collector with a `to_prometheus()` method served at /metrics.
+            audio_root (str | None): Directory that the `audio_path` of JSON submissions must lie in (relative
+                paths are resolved against it). None rejects JSON submissions, so only uploads are accepted.
+        """
+        super().__init__(address, _JobRequestHandler)
+        self.manager = manager
+        self.upload_dir = Path(upload_dir)
+        self.audio_root = Path(audio_root).resolve() if audio_root else None
+        self.validate_options = validate_options
+        self.max_upload_bytes = max_upload_bytes
+        self.metrics = metrics
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    server: JobServer
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    def _send(self, status: HTTPStatus, body: str, content_type: str, headers: dict | None = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: HTTPStatus, payload: dict, headers: dict | None = None) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False), "application/json", headers)
+
+    def _content_length(self) -> int:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Content-Length must be an integer.")
+        if length < 0:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Content-Length must not be negative.")
+        return length
+
+    def _read_json(self) -> dict:
+        length = self._content_length()
+        if length > MAX_JSON_BODY_BYTES:
+            raise _RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                f"JSON body exceeds {MAX_JSON_BODY_BYTES} bytes.")
+        self._body_read = True
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}")
+        if not isinstance(params, dict):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "JSON body must be an object.")
+        return params
+
+    def _receive_upload(self, filename: str) -> str:
+        """Streams the request body to a new file in the upload directory and returns its path."""
+        length = self._content_length()
+        if not length:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Request body is empty.")
+        if self.server.max_upload_bytes is not None and length > self.server.max_upload_bytes:
+            raise _RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                f"Request body exceeds {self.server.max_upload_bytes} bytes.")
+        self._body_read = True
+        path = self.server.upload_dir / f"{uuid.uuid4().hex}_{filename}"
+        try:
+            with open(path, "wb") as f:
+                remaining = length
+                while remaining:
+                    chunk = self.rfile.read(min(UPLOAD_CHUNK_BYTES, remaining))
+                    if not chunk:
+                        raise _RequestError(HTTPStatus.BAD_REQUEST, "Request body ended before Content-Length.")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return str(path)
+
+    def _discard_body(self) -> None:
+        """Drains a body that was not read (e.g. a rejected upload), or closes the connection if it is large."""
+        if self._body_read:
+            return
+        try:
+            remaining = self._content_length()
+        except _RequestError:
+            remaining = 0
+        self.close_connection = True
+        if remaining > _MAX_DRAIN_BYTES:
+            return
+        while remaining:
+            chunk = self.rfile.read(min(UPLOAD_CHUNK_BYTES, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+
+    def _resolve_audio_path(self, audio_path: str) -> str:
+        """Resolves a submitted server-side path, which must lie in the audio root directory."""
+        root = self.server.audio_root
+        if root is None:
+            raise _RequestError(HTTPStatus.FORBIDDEN,
+                                "Submitting server-side audio paths is disabled. Upload the audio instead.")
+        path = (root / audio_path).resolve()
+        if not path.is_relative_to(root):
+            raise _RequestError(HTTPStatus.FORBIDDEN, "audio_path must be inside the server's audio directory.")
+        if not path.is_file():
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"Audio file not found: {audio_path}")
+        return str(path)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send_json(HTTPStatus.OK, {"status": "ok", **self.server.manager.stats()})
+        if url.path == "/metrics":
+            if self.server.metrics is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {"error": "Metrics are not enabled."})
+            return self._send(HTTPStatus.OK, self.server.metrics.to_prometheus(), "text/plain; version=0.0.4")
+        match = _JOB_PATH.match(url.path)
+        job = self.server.manager.get(match.group(1)) if match else None
+        if job is None:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "Job not found."})
+        result = match.group(2)
+        if result is None:
+            return self._send_json(HTTPStatus.OK, job.to_dict())
+        if job.status != SUCCEEDED:
+            return self._send_json(HTTPStatus.CONFLICT, {"error": f"Job is {job.status}.", **job.to_dict()})
+        if result == "transcript":
+            return self._send(HTTPStatus.OK, job.transcript, "text/plain")
+        return self._send(HTTPStatus.OK, job.summary, "text/markdown")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+        self._body_read = False
+        upload_path = None
+        try:
+            options, filename = self._job_options(url.query)
+            if self.server.validate_options is not None:
+                self.server.validate_options(options["language"], options["min_speakers"], options["max_speakers"])
+            if filename is None:
+                options["audio_path"] = self._resolve_audio_path(options["audio_path"])
+            else:
+                # The upload is only written once the options are known to be valid
+                options["audio_path"] = upload_path = self._receive_upload(filename)
+            job = self.server.manager.submit(**options, delete_audio=upload_path is not None)
+            upload_path = None
+        except _RequestError as e:
+            return self._send_error(e.status, {"error": str(e)})
+        except ValueError as e:
+            return self._send_error(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except JobQueueFullError as e:
+            return self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {"Retry-After": "5"})
+        finally:
+            if upload_path is not None:
+                # The job was not queued, so nothing else will delete the upload
+                Path(upload_path).unlink(missing_ok=True)
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    def _send_error(self, status: HTTPStatus, payload: dict, headers: dict | None = None) -> None:
+        self._discard_body()
+        self._send_json(status, payload, headers)
+
+    def _job_options(self, query: str) -> tuple[dict, str | None]:
+        """Returns the job options and, for an upload, the file name of the audio still to be received."""
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        if content_type == "application/json":
+            params = self._read_json()
+            if not params.get("audio_path"):
+                raise _RequestError(HTTPStatus.BAD_REQUEST, "audio_path is not provided.")
+            audio_path, filename = str(params["audio_path"]), None
+        else:
+            params = {key: values[-1] for key, values in parse_qs(query).items()}
+            audio_path, filename = None, Path(params.get("filename") or "upload").name
+        try:
+            options = {
+                "audio_path": audio_path,
+                "language": str(params.get("language", "en")).lower(),
+                "min_speakers": int(params.get("min_speakers", 1)),
+                "max_speakers": int(params.get("max_speakers", 4)),
+            }
+        except (TypeError, ValueError):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "min_speakers and max_speakers must be integers.")
+        return options, filename
+
+
+def upload_dir_from_env() -> str:
+    """Returns the upload directory (UPLOAD_DIR, default: <RESULTS_DIR>/uploads)."""
+    return os.getenv("UPLOAD_DIR", os.path.join(os.getenv("RESULTS_DIR", "results"), "uploads"))
+
+
+def audio_root_from_env() -> str | None:
+    """Returns the directory of audio files jobs may reference by path (AUDIO_ROOT, default: unset = uploads only)."""
+    return os.getenv("AUDIO_ROOT") or None
@@ -0,0 +1,190 @@
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the job queue is at capacity."""
+
+
+@dataclass
+class Job:
+    """One transcription + summarization request and its outcome."""
+    audio_path: str
+    language: str
+    min_speakers: int
+    max_speakers: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    stage: str | None = None
+    error: str | None = None
+    transcript: str | None = None
+    summary: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # Files written for the job, e.g. {"transcript_file": ..., "summary_file": ...}
+    outputs: dict = field(default_factory=dict)
+    # The audio is a temporary upload, deleted once the job has finished
+    delete_audio: bool = field(default=False, repr=False)
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "audio_path": self.audio_path,
+            "language": self.language,
+            "min_speakers": self.min_speakers,
+            "max_speakers": self.max_speakers,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "has_transcript": self.transcript is not None,
+            "has_summary": self.summary is not None,
+            "outputs": dict(self.outputs),
+        }
+
+
+class JobManager:
+    """
+    Runs jobs from a bounded queue on a fixed number of worker threads.
+
+    The transcription and summarization functions are injected, so the manager keeps whatever they
+    close over (the model pool, the LLM client and its connection pool) warm across jobs. Submitting
+    to a full queue fails fast with `JobQueueFullError` instead of buffering without bound. Finished
+    jobs are kept for polling, up to `history_limit` of them (oldest dropped first).
+    """
+
+    def __init__(self, transcribe: Callable[[Job], str], summarize: Callable[[str, str], str],
+                 workers: int = 1, queue_size: int = 16, history_limit: int = 1000,
+                 on_success: Callable[[Job], None] | None = None):
+        """
+        Args:
+            transcribe (Callable[[Job], str]): Produces the formatted transcript of a job's audio.
+            summarize (Callable[[str, str], str]): Summarizes a (transcript, language) pair.
+            workers (int): Number of jobs processed concurrently.
+            queue_size (int): Maximum number of jobs waiting for a worker.
+            history_limit (int): Maximum number of jobs remembered for polling.
+            on_success (Callable[[Job], None] | None): Called with each succeeded job, e.g. to save its results.
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be a positive integer. Current value: {workers}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be a positive integer. Current value: {queue_size}")
+        self.transcribe = transcribe
+        self.summarize = summarize
+        self.workers = workers
+        self.history_limit = history_limit
+        self.on_success = on_success
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Lets the workers finish the queued jobs, then stops them."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, audio_path: str, language: str, min_speakers: int, max_speakers: int,
+               delete_audio: bool = False) -> Job:
+        """
+        Queues a job and returns it immediately. With `delete_audio`, the audio file is deleted when the
+        job finishes, whether it succeeded or failed.
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity.
+        """
+        job = Job(audio_path, language, min_speakers, max_speakers, delete_audio=delete_audio)
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFullError(f"Job queue is full ({self._queue.maxsize} jobs waiting).")
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history_limit:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.done.is_set():
+                    break
+                del self._jobs[oldest_id]
+        logger.info(f"Job {job.id} queued: {audio_path}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float | None = None) -> Job | None:
+        """Blocks until the job has finished (or `timeout` elapses) and returns it."""
+        job = self.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {"workers": self.workers, "queue_size": self._queue.maxsize, "queued": self._queue.qsize(),
+                "jobs": counts}
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.stage = "transcribe"
+            job.transcript = self.transcribe(job)
+            job.stage = "summarize"
+            job.summary = self.summarize(job.transcript, job.language)
+            if self.on_success is not None:
+                job.stage = "save"
+                self.on_success(job)
+            job.stage = None
+            job.status = SUCCEEDED
+            logger.info(f"Job {job.id} succeeded")
+        except Exception as e:
+            logger.error(f"Job {job.id} failed at {job.stage}: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            if job.delete_audio:
+                try:
+                    os.remove(job.audio_path)
+                except OSError as e:
+                    logger.warning(f"Failed to delete the audio of job {job.id}: {e}")
+            job.finished_at = time.time()
+            job.done.set()
@@ -0,0 +1,3 @@
+from .atomic_io import atomic_open, evict_least_recently_used, write_atomic
+
+__all__ = ["atomic_open", "evict_least_recently_used", "write_atomic"]
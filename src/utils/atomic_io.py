@@ -0,0 +1,57 @@
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def atomic_open(path, mode: str = "w"):
+    """
+    Opens a temp file next to `path` for writing and renames it over `path` when the block exits
+    normally, so a crash or a concurrent reader never sees a partial file. On error the temp file
+    is removed and `path` is left as it was.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path, data: str | bytes) -> None:
+    """Writes text or bytes to `path` with a temp file + rename (see `atomic_open`)."""
+    with atomic_open(path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+
+
+def evict_least_recently_used(cache_dir: Path, max_size_bytes: int, label: str) -> None:
+    """
+    Deletes the least recently used `<cache_dir>/*/*.json` entries (by modification time) until the
+    entries fit in `max_size_bytes`, and removes the directories they leave empty.
+    """
+    entries = []
+    for path in Path(cache_dir).glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_size_bytes:
+            break
+        logger.info(f"Evicting {label} entry: {path}")
+        path.unlink(missing_ok=True)
+        total -= size
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
@@ -1,3 +1,47 @@
-from .voice_module import parse_speakers_and_transcript, format_transcript, format_timestamp
+import importlib
 
-__all__ = ["parse_speakers_and_transcript", "format_transcript", "format_timestamp"]
+# Public name -> submodule. Submodules are imported on first access, so importing the package (or
+# the light helpers) does not load whisperx, torch or pyannote.
+_EXPORTS = {
+    "parse_speakers_and_transcript": ".voice_module",
+    "parse_speakers_and_transcript_batch": ".voice_module",
+    "transcribe_files": ".voice_module",
+    "iter_streaming_segments": ".voice_module",
+    "transcribe_window": ".voice_module",
+    "iter_transcript_blocks": ".voice_module",
+    "FileStages": ".voice_module",
+    "stage_cache_params": ".voice_module",
+    "streaming_cache_params": ".voice_module",
+    "format_transcript": ".formatting",
+    "iter_speaker_blocks": ".formatting",
+    "format_timestamp": ".formatting",
+    "ModelPool": ".model_pool",
+    "get_model_pool": ".model_pool",
+    "StageCache": ".stage_cache",
+    "file_digest": ".stage_cache",
+    "stage_cache_from_env": ".stage_cache",
+    "JobCheckpoints": ".stage_cache",
+    "LayeredStageCache": ".stage_cache",
+    "JobInProgressError": ".stage_cache",
+    "jobs_dir_from_env": ".stage_cache",
+    "SpeakerStitcher": ".streaming",
+    "audio_duration": ".streaming",
+    "stitch_window": ".streaming",
+    "window_offsets": ".streaming",
+    "TranscriptArtifact": ".transcript_artifact",
+    "TranscriptArtifactBuilder": ".transcript_artifact",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,148 @@
+import logging
+import os
+import sys
+
+AUTO = "auto"
+DEFAULT_BATCH_SIZE = 16
+MAX_AUTO_BATCH_SIZE = 32
+# Share of the free memory the batch may use, leaving room for fragmentation and the other stages
+MEMORY_SAFETY_FRACTION = 0.8
+
+# Approximate activation memory of one batch item (a 30 s chunk) of `model.transcribe` in float16/int8
+WHISPER_BATCH_ITEM_MB = {
+    "tiny": 16, "base": 24, "small": 64, "medium": 128,
+    "large-v1": 192, "large-v2": 192, "large-v3": 192, "large-v3-turbo": 160, "turbo": 160,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _torch():
+    # The probes run inside the transcription stages, where torch is already loaded
+    import torch
+    return torch
+
+
+def available_memory_bytes(device: str) -> int | None:
+    """
+    Returns the memory that is free right now on `device` ("cpu", "cuda" or "cuda:<index>"), or None if
+    it cannot be determined. On CUDA this is the free device memory as reported by the driver, so
+    memory held by other processes and already loaded models is accounted for.
+    """
+    device_type, _, index = device.partition(":")
+    if device_type == "cuda":
+        torch = _torch()
+        if not torch.cuda.is_available():
+            return None
+        free, _total = torch.cuda.mem_get_info(int(index) if index else torch.cuda.current_device())
+        return free
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_compute_type(device: str, model_bytes_float16: int) -> str:
+    """
+    Picks the CTranslate2 compute type for `device`: int8 on CPU, float16 on GPUs with fast half
+    precision (compute capability 7.0 or newer) that have room for the float16 weights, int8 otherwise.
+    """
+    device_type, _, index = device.partition(":")
+    if device_type != "cuda":
+        return "int8"
+    torch = _torch()
+    if torch.cuda.get_device_capability(int(index) if index else None) < (7, 0):
+        return "int8"
+    free = available_memory_bytes(device)
+    if free is not None and free * MEMORY_SAFETY_FRACTION < model_bytes_float16:
+        return "int8"
+    return "float16"
+
+
+def auto_batch_size(free_bytes: int | None, model_name: str, compute_type: str,
+                    max_batch_size: int = MAX_AUTO_BATCH_SIZE) -> int:
+    """
+    Returns the largest power-of-two batch size whose estimated activations fit in `free_bytes`,
+    between 1 and `max_batch_size`. Falls back to the default batch size when the free memory is unknown.
+    """
+    if free_bytes is None:
+        return min(DEFAULT_BATCH_SIZE, max_batch_size)
+    item_mb = WHISPER_BATCH_ITEM_MB.get(model_name, WHISPER_BATCH_ITEM_MB["large-v2"])
+    if compute_type == "float32":
+        item_mb *= 2
+    fitting = int(free_bytes * MEMORY_SAFETY_FRACTION) // (item_mb * 1024 * 1024)
+    batch_size = 1
+    while batch_size * 2 <= min(fitting, max_batch_size):
+        batch_size *= 2
+    return batch_size
+
+
+def is_out_of_memory(error: BaseException) -> bool:
+    """Whether `error` reports an exhausted host or device memory (torch, CTranslate2 or CUDA)."""
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and ("out of memory" in message or "out_of_memory" in message)
+
+
+def _release_cuda_cache() -> None:
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class BatchSizer:
+    """
+    Chooses the batch size of each `model.transcribe` call and halves it on out-of-memory errors.
+
+    With a fixed `batch_size` that size is used until a call runs out of memory. With `batch_size=None`
+    (BATCH_SIZE=auto) the size is estimated from the memory that is free on the device just before each
+    call, so it follows the other workloads on the machine. A size that ran out of memory becomes the
+    upper bound of every later call.
+    """
+
+    def __init__(self, batch_size: int | None, device: str, model_name: str, compute_type: str):
+        self.batch_size = batch_size
+        self.device = device
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self._ceiling = batch_size or MAX_AUTO_BATCH_SIZE
+
+    def next_batch_size(self) -> int:
+        if self.batch_size is not None:
+            return min(self.batch_size, self._ceiling)
+        return auto_batch_size(available_memory_bytes(self.device), self.model_name, self.compute_type,
+                               max_batch_size=self._ceiling)
+
+    def transcribe(self, model, audio, metrics=None) -> dict:
+        """
+        Runs `model.transcribe(audio, batch_size=...)`, retrying with half the batch size on out-of-memory.
+
+        Raises:
+            RuntimeError | MemoryError: If even a batch size of 1 runs out of memory.
+        """
+        batch_size = self.next_batch_size()
+        while True:
+            try:
+                result = model.transcribe(audio, batch_size=batch_size)
+                break
+            except (RuntimeError, MemoryError) as e:
+                if batch_size == 1 or not is_out_of_memory(e):
+                    raise
+                batch_size //= 2
+                self._ceiling = min(self._ceiling, batch_size)
+                logger.warning(f"Out of memory during transcription, retrying with batch size {batch_size}: {e}")
+                _release_cuda_cache()
+                if metrics is not None:
+                    metrics.increment("transcribe_oom_backoff")
+        if metrics is not None:
+            metrics.record("transcribe_batch_size", batch_size)
+            metrics.increment(f"transcribe_batch_size:{batch_size}")
+        return result
@@ -0,0 +1,62 @@
+TRANSCRIPT_BLOCK_SEPARATOR = "\n\n"
+
+
+def format_timestamp(seconds):
+    """Converts seconds (float) to HH:MM:SS format."""
+    if seconds is None:
+        return "00:00:00"
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def _format_block(speaker, texts: list[str], start, end) -> str:
+    return f"[{format_timestamp(start)} -> {format_timestamp(end)}] {speaker}: {' '.join(texts)}"
+
+
+def iter_speaker_blocks(segments):
+    """
+    Merges consecutive utterances of the same speaker and yields each speaker block as soon as it is
+    final, i.e. when the next speaker starts or the segments end.
+
+    `segments` may be a generator (e.g. `iter_streaming_segments`), so blocks of a long recording can
+    be written and summarized while later windows are still being processed. Segments without text
+    (missing or blank) are skipped, so they neither produce an empty block nor split a speaker's block.
+
+    Yields:
+        str: "[HH:MM:SS -> HH:MM:SS] {speaker}: {text}" for each speaker block.
+    """
+    current_speaker = None
+    current_text = []
+    current_start = current_end = None
+    for seg in segments:
+        text = (seg.get('text') or '').strip()
+        if not text:
+            continue
+        speaker = seg.get('speaker', 'UNKNOWN')
+        if current_text and speaker == current_speaker:
+            current_text.append(text)
+            current_end = seg.get('end', current_end)
+            continue
+        if current_text:
+            yield _format_block(current_speaker, current_text, current_start, current_end)
+        current_speaker = speaker
+        current_text = [text]
+        current_start = seg.get('start')
+        current_end = seg.get('end')
+    if current_text:
+        yield _format_block(current_speaker, current_text, current_start, current_end)
+
+
+def format_transcript(segments):
+    """
+    Formats WhisperX segments by:
+    1. Merging consecutive utterances from the same speaker
+    2. Adding timestamps (start -> end) for each speaker block
+    3. Converting to a clean transcript format (String)
+
+    Same output as joining `iter_speaker_blocks`: segments without text are skipped, and "" is returned
+    when no segment has text.
+    """
+    return TRANSCRIPT_BLOCK_SEPARATOR.join(iter_speaker_blocks(segments))
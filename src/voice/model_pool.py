@@ -0,0 +1,195 @@
+import gc
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+KEEP_POLICY = "keep"
+LOW_MEMORY_POLICY = "low_memory"
+VALID_POLICIES = {KEEP_POLICY, LOW_MEMORY_POLICY}
+
+
+def model_key(kind: str, model_name: str | None, device: str, compute_type: str | None = None,
+              language: str | None = None) -> tuple:
+    """Builds the registry key for a model: (kind, model name, device, compute_type, language)."""
+    return (kind, model_name, device, compute_type, language)
+
+
+def estimate_model_bytes(model: Any, _depth: int = 0) -> int:
+    """
+    Estimates the memory held by a loaded model by summing the size of its torch parameters.
+
+    Tuples (e.g. the alignment model and its metadata) are summed element-wise, and wrapper objects
+    such as the diarization pipeline are searched two attribute levels deep for torch modules.
+    Models without discoverable torch parameters (e.g. CTranslate2 based WhisperX models) return 0,
+    in which case callers should pass an explicit size hint to `ModelPool.get`.
+    """
+    if _depth > 2 or model is None:
+        return 0
+    if isinstance(model, (tuple, list)):
+        return sum(estimate_model_bytes(item, _depth + 1) for item in model)
+    parameters = getattr(model, "parameters", None)
+    if callable(parameters):
+        try:
+            return sum(p.numel() * p.element_size() for p in parameters())
+        except Exception:
+            return 0
+    if hasattr(model, "__dict__"):
+        return sum(estimate_model_bytes(value, _depth + 1) for value in vars(model).values()
+                   if not isinstance(value, (str, bytes, int, float, dict)))
+    return 0
+
+
+def _free_device_memory() -> None:
+    gc.collect()
+    # Only touch torch if it has already been imported by the model loaders
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelPool:
+    """
+    Long-lived, thread-safe registry of loaded models with LRU eviction.
+
+    Models are loaded once per key and reused across calls. A load holds only the lock of its key, so
+    cache hits and loads of other models are not blocked behind it. When `max_memory_mb` is set, the least
+    recently used models are evicted until the estimated resident size fits the budget. With the
+    `low_memory` policy, callers release each model right after its stage (the legacy behaviour).
+    """
+
+    def __init__(self, max_memory_mb: float | None = None, policy: str = KEEP_POLICY):
+        if policy not in VALID_POLICIES:
+            raise ValueError(
+                f"Model pool policy must be one of {VALID_POLICIES}. Current value: {policy}")
+        if max_memory_mb is not None and max_memory_mb < 0:
+            raise ValueError(
+                f"Model pool memory budget must not be negative. Current value: {max_memory_mb}")
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
+        self.policy = policy
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.RLock()
+        # Per-key locks of the models being loaded, so concurrent callers load a model only once
+        self._loading: dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_hint_bytes: int | None = None) -> Any:
+        """
+        Returns the model registered under `key`, loading it with `loader` on a miss.
+
+        Args:
+            key (Hashable): Registry key, usually built with `model_key`.
+            loader (Callable[[], Any]): Zero-argument callable that loads the model.
+            size_hint_bytes (int | None): Estimated memory footprint, used when the model size cannot be measured.
+
+        Returns:
+            Any: The loaded (or cached) model.
+        """
+        with self._lock:
+            if key in self._entries:
+                return self._hit(key)
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        # Loading takes seconds to minutes, so only callers of the same key wait for it; hits on other
+        # keys and loads of other models go ahead
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    # Loaded by the caller this one waited for
+                    return self._hit(key)
+                self.misses += 1
+            logger.info(f"Loading model into pool: {key}")
+            model = loader()
+            size = size_hint_bytes if size_hint_bytes is not None else estimate_model_bytes(model)
+            with self._lock:
+                self._entries[key] = (model, size)
+                self._loading.pop(key, None)
+                evicted = self._evict_to_budget(keep=key)
+        if evicted:
+            _free_device_memory()
+        return model
+
+    def _hit(self, key: Hashable) -> Any:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.info(f"Reusing pooled model: {key}")
+        return self._entries[key][0]
+
+    def release(self, key: Hashable) -> None:
+        """Drops the model registered under `key` and frees cached device memory."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        logger.info(f"Releasing pooled model: {key}")
+        del entry
+        _free_device_memory()
+
+    def release_after_stage(self, key: Hashable) -> None:
+        """Releases the model after its pipeline stage when the low-memory policy is active."""
+        if self.policy == LOW_MEMORY_POLICY:
+            self.release(key)
+
+    def clear(self) -> None:
+        """Drops every pooled model."""
+        with self._lock:
+            self._entries.clear()
+        _free_device_memory()
+
+    def _evict_to_budget(self, keep: Hashable) -> bool:
+        """Evicts least recently used models until the budget holds. Returns whether any was evicted."""
+        if self.max_memory_bytes is None:
+            return False
+        evicted = False
+        while self.resident_bytes > self.max_memory_bytes:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                logger.warning(
+                    f"Model {keep} alone exceeds the model pool budget of {self.max_memory_bytes} bytes.")
+                break
+            logger.info(f"Evicting least recently used model: {victim}")
+            del self._entries[victim]
+            evicted = True
+        return evicted
+
+
+_shared_pool: ModelPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> ModelPool:
+    """
+    Returns the process-wide model pool, creating it from the environment on first use.
+
+    Environment:
+        MODEL_POOL_MAX_MB: Memory budget in megabytes (unset or 0 means unlimited).
+        MODEL_POOL_POLICY: "keep" (default) keeps models resident, "low_memory" frees them after each stage.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            try:
+                max_memory_mb = float(os.getenv("MODEL_POOL_MAX_MB", 0))
+            except ValueError:
+                raise ValueError(
+                    f"MODEL_POOL_MAX_MB must be a number. Current value: {os.getenv('MODEL_POOL_MAX_MB')}")
+            _shared_pool = ModelPool(max_memory_mb=max_memory_mb or None,
+                                     policy=os.getenv("MODEL_POOL_POLICY", KEEP_POLICY))
+        return _shared_pool
@@ -0,0 +1,213 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from utils.atomic_io import atomic_open
+
+logger = logging.getLogger(__name__)
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class SpeakerIndex:
+    """
+    Local index of speaker embeddings that gives the speakers of every recording stable labels.
+
+    Each known speaker is one row of an L2-normalized float32 matrix (the running mean of the cluster
+    embeddings it was matched with), so a lookup is a single matrix-vector product: a few milliseconds
+    for tens of thousands of speakers. `assign` matches the clusters of one recording one-to-one
+    against the known speakers, above the cosine similarity `threshold`; unmatched clusters become
+    new speakers. Every speaker also keeps the (recording, per-recording label) pairs it was heard as,
+    so search hits can be traced back to the recordings they come from.
+
+    The index is saved as one .npz file with a temp file + rename. Updates take an exclusive lock on
+    a sibling .lock file and reload the index if another process changed it, so concurrent jobs and
+    worker processes can share one index. `search` reloads the file when it changed, so a long-running
+    process also sees speakers added by others.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.5, label_format: str = "SPEAKER_{:02d}"):
+        if not -1.0 <= threshold <= 1.0:
+            raise ValueError(
+                f"Speaker match threshold must be between -1 and 1. Current value: {threshold}")
+        self.path = Path(path)
+        self.threshold = threshold
+        self.label_format = label_format
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.labels: list[str] = []
+        # Per known speaker, the (recording, per-recording label) pairs it was assigned from
+        self.sources: list[list[tuple[str, str]]] = []
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._reload_if_changed()
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _file_stamp(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload_if_changed(self) -> None:
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return
+        with np.load(self.path) as data:
+            self.embeddings = data["embeddings"].astype(np.float32, copy=False)
+            self.counts = data["counts"]
+            self.labels = data["labels"].tolist()
+            self.sources = [[] for _ in self.labels]
+            # Indexes saved before sources were recorded have none
+            if "source_rows" in data:
+                for row, recording, label in zip(data["source_rows"].tolist(), data["source_recordings"].tolist(),
+                                                 data["source_labels"].tolist()):
+                    self.sources[row].append((recording, label))
+        self._stamp = stamp
+
+    def _save(self) -> None:
+        flat = [(row, recording, label) for row, sources in enumerate(self.sources) for recording, label in sources]
+        with atomic_open(self.path, "wb") as f:
+            np.savez(f, embeddings=self.embeddings, counts=self.counts, labels=np.array(self.labels, dtype=str),
+                     source_rows=np.array([row for row, _, _ in flat], dtype=np.int64),
+                     source_recordings=np.array([recording for _, recording, _ in flat], dtype=str),
+                     source_labels=np.array([label for _, _, label in flat], dtype=str))
+        self._stamp = self._file_stamp()
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock, open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._reload_if_changed()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def search(self, embedding, k: int = 1) -> list[tuple[str, float, list[tuple[str, str]]]]:
+        """
+        Returns the `k` known speakers most similar to `embedding`.
+
+        Returns:
+            list[tuple[str, float, list[tuple[str, str]]]]: (stable label, cosine similarity, the
+                (recording, per-recording label) pairs the speaker was heard as), most similar first.
+        """
+        with self._lock:
+            # A cheap stat, so speakers added by other processes show up without a restart
+            self._reload_if_changed()
+            if not self.labels:
+                return []
+            similarities = self.embeddings @ _normalized(np.asarray(embedding, dtype=np.float32))
+            k = min(k, len(similarities))
+            best = np.argpartition(-similarities, k - 1)[:k]
+            best = best[np.argsort(-similarities[best])]
+            return [(self.labels[i], float(similarities[i]), list(self.sources[i])) for i in best]
+
+    def assign(self, embeddings: dict, recording: str | None = None) -> dict:
+        """
+        Maps the clusters of one recording to stable speaker labels and adds them to the index.
+
+        Args:
+            embeddings (dict): Cluster label (e.g. "SPEAKER_00") -> embedding, as returned by
+                `DiarizationPipeline(..., return_embeddings=True)`.
+            recording (str | None): Name of the recording (e.g. its path), stored with each cluster label.
+
+        Returns:
+            dict: Maps every cluster label to its stable label.
+
+        Raises:
+            ValueError: If the embedding size differs from the embeddings in the index.
+        """
+        if not embeddings:
+            return {}
+        local_labels = sorted(embeddings)
+        queries = _normalized(np.asarray([embeddings[label] for label in local_labels], dtype=np.float32))
+        with self._exclusive():
+            if self.labels and queries.shape[1] != self.embeddings.shape[1]:
+                raise ValueError(
+                    f"Speaker embedding size must match the index ({self.embeddings.shape[1]}). "
+                    f"Current value: {queries.shape[1]}")
+            mapping = self._match(local_labels, queries)
+            self._update(local_labels, queries, mapping)
+            if recording is not None:
+                for label in local_labels:
+                    self.sources[mapping[label]].append((str(recording), label))
+            self._save()
+        return {label: self.labels[mapping[label]] for label in local_labels}
+
+    def _match(self, local_labels: list[str], queries: np.ndarray) -> dict:
+        """Greedy one-to-one matching of clusters to known speakers; returns cluster label -> row."""
+        if not self.labels:
+            return {}
+        similarities = queries @ self.embeddings.T
+        # Only the best few candidates of each cluster can win a one-to-one match
+        k = min(len(local_labels), len(self.labels))
+        candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        pairs = sorted(((float(similarities[q, row]), q, int(row))
+                        for q in range(len(local_labels)) for row in candidates[q]
+                        if similarities[q, row] >= self.threshold), reverse=True)
+        mapping, used_rows = {}, set()
+        for _, q, row in pairs:
+            if local_labels[q] not in mapping and row not in used_rows:
+                mapping[local_labels[q]] = row
+                used_rows.add(row)
+        return mapping
+
+    def _update(self, local_labels: list[str], queries: np.ndarray, mapping: dict) -> None:
+        for q, label in enumerate(local_labels):
+            row = mapping.get(label)
+            if row is not None:
+                count = self.counts[row]
+                self.embeddings[row] = _normalized(self.embeddings[row] * count + queries[q])
+                self.counts[row] = count + 1
+        new = [q for q, label in enumerate(local_labels) if label not in mapping]
+        if not new:
+            return
+        start = len(self.labels)
+        if self.labels:
+            self.embeddings = np.concatenate([self.embeddings, queries[new]])
+        else:
+            self.embeddings = queries[new].copy()
+        self.counts = np.concatenate([self.counts, np.ones(len(new), dtype=np.int64)])
+        for offset, q in enumerate(new):
+            mapping[local_labels[q]] = start + offset
+            self.labels.append(self.label_format.format(start + offset))
+            self.sources.append([])
+        logger.info(f"Added {len(new)} new speakers to the speaker index ({len(self.labels)} known)")
+
+
+def speaker_index_from_env() -> SpeakerIndex | None:
+    """
+    Creates the speaker index configured by the environment, or None when it is disabled.
+
+    Environment:
+        SPEAKER_INDEX_PATH: Index file, e.g. .cache/speakers.npz (default: unset, which disables the index).
+        SPEAKER_MATCH_THRESHOLD: Minimum cosine similarity to reuse a known speaker (default: 0.5).
+    """
+    path = os.getenv("SPEAKER_INDEX_PATH")
+    if not path:
+        return None
+    try:
+        threshold = float(os.getenv("SPEAKER_MATCH_THRESHOLD", 0.5))
+    except ValueError:
+        raise ValueError(
+            f"SPEAKER_MATCH_THRESHOLD must be a number. Current value: {os.getenv('SPEAKER_MATCH_THRESHOLD')}")
+    return SpeakerIndex(path, threshold=threshold)
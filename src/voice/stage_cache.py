@@ -0,0 +1,337 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from utils.atomic_io import evict_least_recently_used, write_atomic
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIBE_STAGE = "transcribe"
+ALIGN_STAGE = "align"
+DIARIZE_STAGE = "diarize"
+SUMMARY_STAGE = "summary"
+JOB_MANIFEST = "job.json"
+
+
+JOB_LOCK = "job.lock"
+
+
+class JobInProgressError(RuntimeError):
+    """Raised when a job is started while another run is still processing the same recording."""
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+
+    Digests are memoized by resolved path, size and modification time, so a multi-GB recording that is
+    identified by several steps of one run (cache invalidation, job checkpoints, decoding, sharding)
+    is read only once.
+    """
+    stat = os.stat(path)
+    return _file_digest(os.path.realpath(path), stat.st_size, stat.st_mtime_ns, chunk_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(path: str, size: int, mtime_ns: int, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    # WhisperX results may contain numpy scalars/arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StageCache:
+    """
+    On-disk cache of intermediate pipeline outputs, keyed by audio content hash and stage parameters.
+
+    Entries are stored as `<cache_dir>/<audio digest>/<stage>-<params hash>.json` and written with a
+    temp file + rename, so a concurrent reader never sees a partial entry. When `max_size_mb` is set,
+    the least recently read or written entries are evicted until the cache fits.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float | None = None):
+        if max_size_mb is not None and max_size_mb < 0:
+            raise ValueError(
+                f"Stage cache size must not be negative. Current value: {max_size_mb}")
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, audio_digest: str, stage: str, params: dict) -> Path:
+        params_hash = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / audio_digest / f"{stage}-{params_hash}.json"
+
+    def get(self, audio_digest: str, stage: str, params: dict) -> Any | None:
+        """Returns the cached output of `stage` for the audio and parameters, or None on a miss."""
+        path = self._entry_path(audio_digest, stage, params)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable stage cache entry {path}: {e}")
+            return None
+        try:
+            # Refresh the modification time so eviction is least-recently-used
+            os.utime(path)
+        except OSError:
+            pass
+        logger.info(f"Stage cache hit: {stage} ({audio_digest[:12]})")
+        return value
+
+    def put(self, audio_digest: str, stage: str, params: dict, value: Any) -> None:
+        """Stores the output of `stage` for the audio and parameters, then enforces the size budget."""
+        path = self._entry_path(audio_digest, stage, params)
+        write_atomic(path, json.dumps(value, ensure_ascii=False, default=_json_default))
+        self._evict_to_budget()
+
+    def invalidate(self, audio_digest: str | None = None) -> None:
+        """Removes the entries of one audio file, or the whole cache when `audio_digest` is None."""
+        target = self.cache_dir / audio_digest if audio_digest else self.cache_dir
+        logger.info(f"Invalidating stage cache: {target}")
+        shutil.rmtree(target, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.cache_dir.glob("*/*.json"))
+
+    def _evict_to_budget(self) -> None:
+        if self.max_size_bytes is not None:
+            evict_least_recently_used(self.cache_dir, self.max_size_bytes, "stage cache")
+
+
+class JobCheckpoints(StageCache):
+    """
+    Checkpoints of resumable jobs: one directory per recording under `jobs_dir` (e.g. RESULTS_DIR/jobs).
+
+    A job directory `<jobs_dir>/<audio digest>/` holds the output of every completed stage in the
+    stage cache layout (transcribe, align, diarize and one summary per language) and a `job.json`
+    manifest with the job status, the completed stages and the result files written so far. A job is
+    reset with `invalidate` when it is started from scratch, and its directory is removed once it
+    completes, so only unfinished jobs are kept. Every file is written with a temp file + rename, so
+    a crash never leaves a torn checkpoint, and manifest updates take an exclusive lock on
+    `job.json.lock`, so concurrent threads and worker processes do not lose each other's updates.
+
+    A run holds a non-blocking exclusive lock on `job.lock` from `start` until the job is finished or
+    failed (the operating system releases it if the process dies), so a second run on the same
+    recording is refused instead of wiping or interleaving with the checkpoints of the first.
+    """
+
+    def __init__(self, jobs_dir: str):
+        super().__init__(jobs_dir, max_size_mb=None)
+        # Audio path -> digest of the jobs started by this run
+        self.jobs: dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Audio digest -> open `job.lock` of the jobs this run holds
+        self._run_locks = {}
+
+    def __getstate__(self):
+        # Sent to the worker processes of sharded runs, which take the manifest lock only; the run
+        # locks stay with the parent that started the jobs
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_run_locks"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def job_dir(self, audio_digest: str) -> Path:
+        return self.cache_dir / audio_digest
+
+    @contextmanager
+    def _exclusive(self, audio_digest: str):
+        job_dir = self.job_dir(audio_digest)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(job_dir / f"{JOB_MANIFEST}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def manifest(self, audio_digest: str) -> dict:
+        """Returns the manifest of a job, or an empty dict if the job has none."""
+        try:
+            with open(self.job_dir(audio_digest) / JOB_MANIFEST, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable job manifest of {audio_digest[:12]}: {e}")
+            return {}
+
+    def _write_manifest(self, audio_digest: str, **fields) -> dict:
+        manifest = {**self.manifest(audio_digest), **fields, "updated_at": time.time()}
+        write_atomic(self.job_dir(audio_digest) / JOB_MANIFEST,
+                     json.dumps(manifest, ensure_ascii=False, indent=2, default=str))
+        return manifest
+
+    def update_manifest(self, audio_digest: str, **fields) -> dict:
+        with self._exclusive(audio_digest):
+            return self._write_manifest(audio_digest, **fields)
+
+    def _claim(self, audio_digest: str, audio_path: str) -> None:
+        if fcntl is None or audio_digest in self._run_locks:
+            return
+        job_dir = self.job_dir(audio_digest)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        lock_file = open(job_dir / JOB_LOCK, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise JobInProgressError(
+                f"The job of {audio_path} ({audio_digest[:12]}) is being processed by another run. "
+                "Wait for it to finish, or rerun with --resume once it has stopped.")
+        self._run_locks[audio_digest] = lock_file
+
+    def _release(self, audio_digest: str) -> None:
+        lock_file = self._run_locks.pop(audio_digest, None)
+        if lock_file is not None:
+            lock_file.close()
+
+    def start(self, audio_path: str, resume: bool = False) -> list[str]:
+        """
+        Starts (or, with `resume`, continues) the job of one recording. Without `resume`, the
+        checkpoints of an earlier run of the same recording are discarded.
+
+        Returns:
+            list[str]: The stages already completed, which the run will not compute again.
+
+        Raises:
+            JobInProgressError: If another run is still processing the same recording.
+        """
+        audio_digest = file_digest(audio_path)
+        self._claim(audio_digest, audio_path)
+        self.jobs[audio_path] = audio_digest
+        with self._exclusive(audio_digest):
+            if not resume:
+                for path in self.job_dir(audio_digest).iterdir():
+                    if path.name not in (JOB_LOCK, f"{JOB_MANIFEST}.lock"):
+                        path.unlink()
+            completed = self.manifest(audio_digest).get("completed_stages", [])
+            self._write_manifest(audio_digest, audio_path=audio_path, status="running", error=None,
+                                 completed_stages=completed)
+        if resume:
+            logger.info(f"Resuming job {audio_digest[:12]} of {audio_path}, completed stages: "
+                        f"{', '.join(completed) or 'none'}")
+        return completed
+
+    def record_outputs(self, audio_path: str, params: dict, **outputs) -> None:
+        """
+        Records result files of a started job (e.g. the transcript), which a resumed run with the same
+        `params` reuses instead of writing new ones (see `saved_outputs`).
+        """
+        self.update_manifest(self.jobs[audio_path], outputs=outputs, outputs_params=params)
+
+    def saved_outputs(self, audio_path: str, params: dict) -> dict | None:
+        """
+        Returns the outputs recorded by an earlier run of a resumed job with the same `params`, or None
+        if there are none or one of their files no longer exists.
+        """
+        audio_digest = self.jobs.get(audio_path)
+        manifest = self.manifest(audio_digest) if audio_digest else {}
+        outputs = manifest.get("outputs")
+        if not outputs or manifest.get("outputs_params") != params:
+            return None
+        if not all(Path(value).is_file() for key, value in outputs.items() if key.endswith("_file")):
+            return None
+        return outputs
+
+    def finish(self, audio_path: str) -> None:
+        """Marks the job of a started recording as completed by removing its checkpoints."""
+        audio_digest = self.jobs.pop(audio_path)
+        with self._exclusive(audio_digest):
+            shutil.rmtree(self.job_dir(audio_digest), ignore_errors=True)
+        self._release(audio_digest)
+        logger.info(f"Job {audio_digest[:12]} of {audio_path} completed, checkpoints removed")
+
+    def fail(self, audio_path: str, error: Exception | str) -> None:
+        """Marks the job of a started recording as failed; `--resume` continues it from its last checkpoint."""
+        self.update_manifest(self.jobs[audio_path], status="failed", error=str(error))
+        self._release(self.jobs[audio_path])
+
+    def put(self, audio_digest: str, stage: str, params: dict, value: Any) -> None:
+        """Stores the checkpoint of `stage` and records the stage as completed in the manifest."""
+        super().put(audio_digest, stage, params, value)
+        label = f"{stage}:{params['language']}" if stage == SUMMARY_STAGE and "language" in params else stage
+        with self._exclusive(audio_digest):
+            completed = self.manifest(audio_digest).get("completed_stages", [])
+            if label not in completed:
+                self._write_manifest(audio_digest, completed_stages=[*completed, label], last_stage=label)
+
+
+class LayeredStageCache:
+    """
+    Combines several stage caches, e.g. the checkpoints of a job and the shared stage cache.
+
+    `get` returns the entry of the first layer that has it and copies it into the layers before it,
+    so a job directory holds every stage even when it came from the shared cache. `put` writes to
+    every layer.
+    """
+
+    def __init__(self, *layers):
+        self.layers = [layer for layer in layers if layer is not None]
+
+    def get(self, audio_digest: str, stage: str, params: dict) -> Any | None:
+        for index, layer in enumerate(self.layers):
+            value = layer.get(audio_digest, stage, params)
+            if value is not None:
+                for earlier in self.layers[:index]:
+                    earlier.put(audio_digest, stage, params, value)
+                return value
+        return None
+
+    def put(self, audio_digest: str, stage: str, params: dict, value: Any) -> None:
+        for layer in self.layers:
+            layer.put(audio_digest, stage, params, value)
+
+
+def jobs_dir_from_env() -> str:
+    """Returns the directory of resumable job checkpoints, RESULTS_DIR/jobs."""
+    return os.path.join(os.getenv("RESULTS_DIR", "results"), "jobs")
+
+
+def stage_cache_from_env() -> StageCache:
+    """
+    Creates the stage cache configured by the environment.
+
+    Environment:
+        STAGE_CACHE_DIR: Cache directory (default: .cache/stages).
+        STAGE_CACHE_MAX_MB: Size budget in megabytes (default: 2048, 0 means unlimited).
+    """
+    try:
+        max_size_mb = float(os.getenv("STAGE_CACHE_MAX_MB", 2048))
+    except ValueError:
+        raise ValueError(
+            f"STAGE_CACHE_MAX_MB must be a number. Current value: {os.getenv('STAGE_CACHE_MAX_MB')}")
+    return StageCache(os.getenv("STAGE_CACHE_DIR", ".cache/stages"), max_size_mb=max_size_mb or None)
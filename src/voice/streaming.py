@@ -0,0 +1,202 @@
+import logging
+import os
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def load_audio_window(audio_path: str, start: float, duration: float, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes one window of an audio file into a mono float32 array.
+
+    Uses the same ffmpeg invocation as `whisperx.load_audio`, with an input seek so only
+    `duration` seconds starting at `start` are decoded and held in memory.
+
+    Returns:
+        np.ndarray: The decoded samples. Shorter than requested for the last window, empty past the end.
+
+    Raises:
+        FileNotFoundError: If the audio file does not exist.
+        RuntimeError: If ffmpeg fails to decode the file.
+    """
+    if not Path(audio_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-ss", f"{start:.3f}", "-t", f"{duration:.3f}",
+        "-i", audio_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def audio_duration(audio_path: str) -> float:
+    """
+    Returns the duration of an audio file in seconds, read from its container with ffprobe.
+
+    Raises:
+        FileNotFoundError: If the audio file does not exist.
+        RuntimeError: If ffprobe cannot read the duration.
+    """
+    if not Path(audio_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout.decode().strip()
+        return float(out)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to read audio duration: {e.stderr.decode()}") from e
+    except ValueError:
+        raise RuntimeError(f"Failed to read audio duration of {audio_path}: {out!r}")
+
+
+def window_offsets(duration: float, window_seconds: float, overlap_seconds: float) -> list[float]:
+    """Returns the start times of the windows that cover a recording of `duration` seconds."""
+    step = window_seconds - overlap_seconds
+    offsets = [0.0]
+    while offsets[-1] + window_seconds < duration:
+        offsets.append(offsets[-1] + step)
+    return offsets
+
+
+def streaming_window_from_env() -> tuple[float, float]:
+    """
+    Returns the (window, overlap) lengths in seconds for streaming mode.
+
+    Environment:
+        STREAM_WINDOW_SECONDS: Length of each decoded window (default: 600).
+        STREAM_OVERLAP_SECONDS: Overlap between consecutive windows (default: 15).
+    """
+    try:
+        window_seconds = float(os.getenv("STREAM_WINDOW_SECONDS", 600))
+        overlap_seconds = float(os.getenv("STREAM_OVERLAP_SECONDS", 15))
+    except ValueError:
+        raise ValueError(
+            "STREAM_WINDOW_SECONDS and STREAM_OVERLAP_SECONDS must be numbers. Current values: "
+            f"{os.getenv('STREAM_WINDOW_SECONDS')}, {os.getenv('STREAM_OVERLAP_SECONDS')}")
+    validate_window(window_seconds, overlap_seconds)
+    return window_seconds, overlap_seconds
+
+
+def validate_window(window_seconds: float, overlap_seconds: float) -> None:
+    if window_seconds <= 0:
+        raise ValueError(
+            f"Streaming window must be positive. Current value: {window_seconds}")
+    if overlap_seconds < 0 or overlap_seconds * 2 >= window_seconds:
+        raise ValueError(
+            f"Streaming overlap must be non-negative and less than half the window. "
+            f"window: {window_seconds}, overlap: {overlap_seconds}")
+
+
+def shift_segments(segments: list[dict], offset: float) -> list[dict]:
+    """Moves window-local segment and word timestamps to recording time, in place."""
+    for seg in segments:
+        for item in [seg, *seg.get("words", [])]:
+            for field in ("start", "end"):
+                if item.get(field) is not None:
+                    item[field] += offset
+    return segments
+
+
+def relabel_segments(segments: list[dict], speaker_map: dict) -> list[dict]:
+    """Replaces window-local speaker labels of segments and words with global labels, in place."""
+    for seg in segments:
+        for item in [seg, *seg.get("words", [])]:
+            if item.get("speaker") in speaker_map:
+                item["speaker"] = speaker_map[item["speaker"]]
+    return segments
+
+
+def owned_segments(segments: list[dict], own_start: float, own_end: float) -> list[dict]:
+    """
+    Keeps the segments whose midpoint falls in [own_start, own_end).
+
+    Consecutive windows split their shared overlap at its midpoint, so every utterance in an
+    overlap is emitted by exactly one window.
+    """
+    kept = []
+    for seg in segments:
+        start = seg.get("start")
+        end = seg.get("end", start)
+        if start is None:
+            kept.append(seg)
+            continue
+        midpoint = (start + (end if end is not None else start)) / 2
+        if own_start <= midpoint < own_end:
+            kept.append(seg)
+    return kept
+
+
+class SpeakerStitcher:
+    """
+    Maps the per-window speaker labels of the diarization pipeline onto stable recording-wide labels.
+
+    Diarization labels are only meaningful inside one window. Consecutive windows share an overlap
+    region, so a local speaker is matched to the global speaker it overlaps with the most in that
+    region (greedy one-to-one matching); unmatched local speakers get a new global label.
+    """
+
+    def __init__(self, label_format: str = "SPEAKER_{:02d}"):
+        self.label_format = label_format
+        self.speaker_count = 0
+        self._previous_turns: list[tuple[float, float, str]] = []
+
+    def map_window(self, turns: list[tuple[float, float, str]], overlap_start: float, overlap_end: float) -> dict:
+        """
+        Computes the local -> global label mapping of one window and remembers its turns.
+
+        Args:
+            turns (list[tuple[float, float, str]]): Diarization turns (start, end, local label) in recording time.
+            overlap_start (float): Start of the region shared with the previous window.
+            overlap_end (float): End of the region shared with the previous window.
+
+        Returns:
+            dict: Maps each local speaker label to its global label.
+        """
+        overlaps = {}
+        for p_start, p_end, p_speaker in self._previous_turns:
+            for c_start, c_end, c_speaker in turns:
+                start = max(p_start, c_start, overlap_start)
+                end = min(p_end, c_end, overlap_end)
+                if end > start:
+                    pair = (c_speaker, p_speaker)
+                    overlaps[pair] = overlaps.get(pair, 0.0) + end - start
+
+        mapping = {}
+        used_globals = set()
+        for (local, global_label), _ in sorted(overlaps.items(), key=lambda item: item[1], reverse=True):
+            if local not in mapping and global_label not in used_globals:
+                mapping[local] = global_label
+                used_globals.add(global_label)
+        for _, _, local in sorted(turns):
+            if local not in mapping:
+                mapping[local] = self.label_format.format(self.speaker_count)
+                self.speaker_count += 1
+
+        self._previous_turns = [(start, end, mapping[local]) for start, end, local in turns]
+        return mapping
+
+
+def stitch_window(stitcher: SpeakerStitcher, window: dict, window_seconds: float, overlap_seconds: float) -> list[dict]:
+    """
+    Maps one processed window onto recording-wide speakers and keeps the segments it owns.
+
+    Windows must be passed in recording order. `window` holds "offset", "is_last", and "segments" and
+    diarization "turns" in recording time with window-local speaker labels.
+    """
+    offset = window["offset"]
+    speaker_map = stitcher.map_window(window["turns"], offset, offset + overlap_seconds)
+    segments = relabel_segments(window["segments"], speaker_map)
+    own_start = offset + overlap_seconds / 2 if offset > 0 else float("-inf")
+    own_end = float("inf") if window["is_last"] else offset + window_seconds - overlap_seconds / 2
+    return owned_segments(segments, own_start, own_end)
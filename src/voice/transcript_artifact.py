@@ -0,0 +1,240 @@
+import json
+import mmap
+from array import array
+
+import numpy as np
+
+from utils.atomic_io import atomic_open
+
+from .formatting import TRANSCRIPT_BLOCK_SEPARATOR, format_timestamp, iter_speaker_blocks
+
+MAGIC = b"VSTR1\n"
+ARTIFACT_EXT = "vst"
+_ALIGNMENT = 8
+_NO_SPEAKER = -1
+
+# Column name -> dtype. Times are NaN when WhisperX could not align them.
+SEGMENT_COLUMNS = {
+    "segment_start": "<f8", "segment_end": "<f8", "segment_speaker": "<i4",
+    "segment_text_offset": "<i8", "segment_word_offset": "<i8",
+}
+WORD_COLUMNS = {
+    "word_start": "<f8", "word_end": "<f8", "word_speaker": "<i4", "word_text_offset": "<i8",
+}
+
+
+def _time(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _optional_time(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+class TranscriptArtifactBuilder:
+    """
+    Accumulates speaker-labelled WhisperX segments into compact columns, one segment at a time.
+
+    Segments can be added while they are produced (e.g. from `iter_streaming_segments`); only numeric
+    columns and the UTF-8 text are kept, not the segment dicts.
+    """
+
+    def __init__(self):
+        self._speakers = {}
+        self._columns = {name: array("d" if dtype == "<f8" else "i" if dtype == "<i4" else "q")
+                         for name, dtype in {**SEGMENT_COLUMNS, **WORD_COLUMNS}.items()}
+        self._segment_text = bytearray()
+        self._word_text = bytearray()
+
+    def _speaker_id(self, speaker: str | None) -> int:
+        if speaker is None:
+            return _NO_SPEAKER
+        return self._speakers.setdefault(speaker, len(self._speakers))
+
+    def add(self, segment: dict) -> None:
+        columns = self._columns
+        columns["segment_start"].append(_time(segment.get("start")))
+        columns["segment_end"].append(_time(segment.get("end")))
+        columns["segment_speaker"].append(self._speaker_id(segment.get("speaker")))
+        columns["segment_text_offset"].append(len(self._segment_text))
+        self._segment_text += (segment.get("text") or "").encode("utf-8")
+        columns["segment_word_offset"].append(len(columns["word_start"]))
+        for word in segment.get("words") or []:
+            columns["word_start"].append(_time(word.get("start")))
+            columns["word_end"].append(_time(word.get("end")))
+            columns["word_speaker"].append(self._speaker_id(word.get("speaker")))
+            columns["word_text_offset"].append(len(self._word_text))
+            self._word_text += (word.get("word") or "").encode("utf-8")
+
+    def build(self, language: str | None = None) -> "TranscriptArtifact":
+        arrays = {name: np.frombuffer(column, dtype=SEGMENT_COLUMNS.get(name) or WORD_COLUMNS[name]).copy()
+                  for name, column in self._columns.items()}
+        arrays["segment_text"] = np.frombuffer(bytes(self._segment_text), dtype=np.uint8)
+        arrays["word_text"] = np.frombuffer(bytes(self._word_text), dtype=np.uint8)
+        return TranscriptArtifact(arrays, list(self._speakers), language=language)
+
+
+class TranscriptArtifact:
+    """
+    Columnar transcript with segment- and word-level timings, for re-rendering without the GPU stages.
+
+    Segments and words are stored as parallel arrays (start, end, speaker id, offset into the UTF-8
+    text buffer of segments or of words), speaker names are interned once, and `segment_word_offset`
+    marks where the words of each segment begin. `save` writes a JSON header followed by the raw,
+    aligned arrays, so `load` maps the file and every column is a zero-copy view of it.
+    """
+
+    def __init__(self, arrays: dict, speakers: list[str], language: str | None = None):
+        self.arrays = arrays
+        self.speakers = speakers
+        self.language = language
+        # Keeps the file mapping of a loaded artifact open for as long as its column views are used
+        self._mmap = None
+
+    @classmethod
+    def from_segments(cls, segments, language: str | None = None) -> "TranscriptArtifact":
+        builder = TranscriptArtifactBuilder()
+        for segment in segments:
+            builder.add(segment)
+        return builder.build(language)
+
+    def __len__(self) -> int:
+        return len(self.arrays["segment_start"])
+
+    @property
+    def word_count(self) -> int:
+        return len(self.arrays["word_start"])
+
+    def save(self, path: str) -> str:
+        """Writes the artifact to `path` atomically and returns the path."""
+        header_arrays = {}
+        position = 0
+        for name, values in self.arrays.items():
+            header_arrays[name] = {"dtype": values.dtype.str, "offset": position, "count": len(values)}
+            position += -(-values.nbytes // _ALIGNMENT) * _ALIGNMENT
+        header = json.dumps({"version": 1, "language": self.language, "speakers": self.speakers,
+                             "arrays": header_arrays}, ensure_ascii=False).encode("utf-8")
+        data_start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+        with atomic_open(path, "wb") as f:
+            f.write(MAGIC + len(header).to_bytes(8, "little") + header)
+            for name, values in self.arrays.items():
+                f.seek(data_start + header_arrays[name]["offset"])
+                f.write(values.tobytes())
+            f.truncate(data_start + position)
+        return str(path)
+
+    @classmethod
+    def load(cls, path: str) -> "TranscriptArtifact":
+        """
+        Maps an artifact written by `save`. The columns are read-only views of the mapped file.
+
+        Raises:
+            ValueError: If the file is not a transcript artifact.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise ValueError(f"Not a transcript artifact: {path}")
+        header_size = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+        header_start = len(MAGIC) + 8
+        header = json.loads(buffer[header_start:header_start + header_size].decode("utf-8"))
+        data_start = -(-(header_start + header_size) // _ALIGNMENT) * _ALIGNMENT
+        arrays = {name: np.frombuffer(buffer, dtype=spec["dtype"], count=spec["count"],
+                                      offset=data_start + spec["offset"])
+                  for name, spec in header["arrays"].items()}
+        artifact = cls(arrays, header["speakers"], language=header.get("language"))
+        artifact._mmap = buffer
+        return artifact
+
+    def relabel(self, names: dict) -> "TranscriptArtifact":
+        """Returns the artifact with speakers renamed by `names` (e.g. {"SPEAKER_00": "Alice"})."""
+        relabeled = TranscriptArtifact(self.arrays, [names.get(speaker, speaker) for speaker in self.speakers],
+                                       language=self.language)
+        relabeled._mmap = self._mmap
+        return relabeled
+
+    def _text_at(self, kind: str, index: int) -> str:
+        offsets = self.arrays[f"{kind}_text_offset"]
+        text = self.arrays[f"{kind}_text"]
+        end = offsets[index + 1] if index + 1 < len(offsets) else len(text)
+        return text[offsets[index]:end].tobytes().decode("utf-8")
+
+    def _speaker_name(self, speaker_id: int) -> str | None:
+        return None if speaker_id == _NO_SPEAKER else self.speakers[speaker_id]
+
+    def iter_segments(self, words: bool = False):
+        """
+        Yields the segments as WhisperX-style dicts ("start", "end", "text", "speaker" when known, and
+        "words" when `words` is set), so any segment-based formatter can be applied again.
+        """
+        arrays = self.arrays
+        word_offsets = arrays["segment_word_offset"]
+        for index in range(len(self)):
+            segment = {
+                "start": _optional_time(arrays["segment_start"][index]),
+                "end": _optional_time(arrays["segment_end"][index]),
+                "text": self._text_at("segment", index),
+            }
+            speaker = self._speaker_name(int(arrays["segment_speaker"][index]))
+            if speaker is not None:
+                segment["speaker"] = speaker
+            if words:
+                end = word_offsets[index + 1] if index + 1 < len(self) else self.word_count
+                segment["words"] = [self._word(w) for w in range(int(word_offsets[index]), int(end))]
+            yield segment
+
+    def _word(self, index: int) -> dict:
+        arrays = self.arrays
+        word = {"word": self._text_at("word", index),
+                "start": _optional_time(arrays["word_start"][index]),
+                "end": _optional_time(arrays["word_end"][index])}
+        speaker = self._speaker_name(int(arrays["word_speaker"][index]))
+        if speaker is not None:
+            word["speaker"] = speaker
+        return word
+
+    def render_text(self) -> str:
+        """Renders the speaker-block transcript, identical to `format_transcript` of the original segments."""
+        return TRANSCRIPT_BLOCK_SEPARATOR.join(iter_speaker_blocks(self.iter_segments()))
+
+    def _cues(self):
+        for segment in self.iter_segments():
+            text = segment["text"].strip()
+            if segment["start"] is None or segment["end"] is None or not text:
+                continue
+            yield segment["start"], segment["end"], segment.get("speaker"), text
+
+    def render_srt(self) -> str:
+        """Renders one SubRip cue per segment, prefixed with the speaker."""
+        cues = [f"{index}\n{_cue_time(start, ',')} --> {_cue_time(end, ',')}\n"
+                f"{f'{speaker}: ' if speaker else ''}{text}\n"
+                for index, (start, end, speaker, text) in enumerate(self._cues(), start=1)]
+        return "\n".join(cues)
+
+    def render_vtt(self) -> str:
+        """Renders one WebVTT cue per segment, with the speaker as a voice span."""
+        cues = ["WEBVTT\n"]
+        for start, end, speaker, text in self._cues():
+            cues.append(f"{_cue_time(start, '.')} --> {_cue_time(end, '.')}\n"
+                        f"{f'<v {speaker}>' if speaker else ''}{text}\n")
+        return "\n".join(cues)
+
+    def render_speakers(self) -> dict:
+        """Returns each speaker's utterances as "[HH:MM:SS -> HH:MM:SS] text" lines, in order of appearance."""
+        views = {}
+        for segment in self.iter_segments():
+            text = segment["text"].strip()
+            if not text:
+                continue
+            views.setdefault(segment.get("speaker", "UNKNOWN"), []).append(
+                f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {text}")
+        return {speaker: "\n".join(lines) for speaker, lines in views.items()}
+
+
+def _cue_time(seconds: float, decimal_separator: str) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_separator}{milliseconds:03d}"
@@ -0,0 +1,182 @@
+import bisect
+import os
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from .streaming import SAMPLE_RATE
+
+
+VAD_METHODS = ("pyannote", "silero")
+# Longest speech turn the WhisperX VAD models report; longer turns are split, then merged again here
+CHUNK_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class VadOptions:
+    """
+    Parameters of the speech detector.
+
+    Attributes:
+        method (str): VAD model shipped with WhisperX, "pyannote" or "silero". Both are trained to tell
+            speech from music and noise, which an energy threshold cannot.
+        onset (float): Speech probability above which a region starts.
+        offset (float): Speech probability below which a region ends (pyannote only).
+        min_silence_seconds (float): Shorter pauses are kept, so only long non-speech stretches are removed.
+        pad_seconds (float): Audio kept on both sides of each speech region, so word edges are not clipped.
+        min_speech_seconds (float): Shorter bursts (clicks, bumps) are not treated as speech.
+    """
+    method: str = "pyannote"
+    onset: float = 0.5
+    offset: float = 0.363
+    min_silence_seconds: float = 1.0
+    pad_seconds: float = 0.25
+    min_speech_seconds: float = 0.1
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def vad_options_from_env() -> VadOptions:
+    """
+    Returns the speech detector options configured by the environment.
+
+    Environment:
+        VAD_METHOD: "pyannote" or "silero" (default: pyannote).
+        VAD_ONSET: Speech probability above which a region starts (default: 0.5).
+        VAD_MIN_SILENCE_SECONDS: Minimum non-speech length that is removed (default: 1.0).
+        VAD_PAD_SECONDS: Audio kept around each speech region (default: 0.25).
+    """
+    method = os.getenv("VAD_METHOD", "pyannote").strip().lower()
+    if method not in VAD_METHODS:
+        raise ValueError(f"VAD_METHOD must be one of {VAD_METHODS}. Current value: {os.getenv('VAD_METHOD')}")
+    try:
+        options = VadOptions(
+            method=method,
+            onset=float(os.getenv("VAD_ONSET", 0.5)),
+            min_silence_seconds=float(os.getenv("VAD_MIN_SILENCE_SECONDS", 1.0)),
+            pad_seconds=float(os.getenv("VAD_PAD_SECONDS", 0.25)),
+        )
+    except ValueError:
+        raise ValueError(
+            "VAD_ONSET, VAD_MIN_SILENCE_SECONDS and VAD_PAD_SECONDS must be numbers. Current values: "
+            f"{os.getenv('VAD_ONSET')}, {os.getenv('VAD_MIN_SILENCE_SECONDS')}, {os.getenv('VAD_PAD_SECONDS')}")
+    if not 0 < options.onset < 1:
+        raise ValueError(f"VAD_ONSET must be between 0 and 1. Current value: {options.onset}")
+    if options.min_silence_seconds < 0 or options.pad_seconds < 0:
+        raise ValueError(
+            f"VAD_MIN_SILENCE_SECONDS and VAD_PAD_SECONDS must not be negative. "
+            f"Current values: {options.min_silence_seconds}, {options.pad_seconds}")
+    return options
+
+
+def load_vad_model(options: VadOptions, device: str):
+    """Loads the WhisperX VAD model selected by `options` (the pyannote weights ship with WhisperX)."""
+    from whisperx.vads import Pyannote, Silero
+    if options.method == "silero":
+        return Silero(vad_onset=options.onset, chunk_size=CHUNK_SECONDS)
+    import torch
+    return Pyannote(torch.device(device), token=None, vad_onset=options.onset, vad_offset=options.offset)
+
+
+def speech_turns(audio, vad_model, options: VadOptions | None = None, sr: int = SAMPLE_RATE) -> list[tuple]:
+    """Runs a WhisperX VAD model over `audio` and returns its speech turns as (start, end) seconds."""
+    options = options or VadOptions()
+    waveform = vad_model.preprocess_audio(np.asarray(audio, dtype=np.float32))
+    scores = vad_model({"waveform": waveform, "sample_rate": sr})
+    chunks = vad_model.merge_chunks(scores, CHUNK_SECONDS, onset=options.onset, offset=options.offset)
+    return [turn for chunk in chunks for turn in chunk["segments"]]
+
+
+def detect_speech(audio, vad_model, options: VadOptions | None = None,
+                  sr: int = SAMPLE_RATE) -> list[tuple[int, int]]:
+    """
+    Finds the speech regions of a mono recording with a WhisperX VAD model (see `load_vad_model`).
+
+    Pauses shorter than `min_silence_seconds` are bridged, bursts shorter than `min_speech_seconds`
+    dropped, and each region is padded by `pad_seconds`.
+
+    Returns:
+        list[tuple[int, int]]: Sorted, non-overlapping (start, end) sample ranges of speech. Empty if the
+        recording holds no speech.
+    """
+    options = options or VadOptions()
+    if len(audio) == 0:
+        return []
+    merged = []
+    for start, end in sorted(speech_turns(audio, vad_model, options, sr)):
+        if merged and start - merged[-1][1] < options.min_silence_seconds:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    pad = int(options.pad_seconds * sr)
+    regions = []
+    for start, end in merged:
+        if end - start < options.min_speech_seconds:
+            continue
+        start = max(int(start * sr) - pad, 0)
+        end = min(int(end * sr) + pad, len(audio))
+        if start >= end:
+            continue
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechMap:
+    """
+    Maps times in trimmed (speech-only) audio back to the original recording.
+
+    The trimmed audio is the concatenation of the speech regions, so a trimmed time falls in exactly
+    one region and is shifted by the silence removed before that region.
+    """
+
+    def __init__(self, regions: list[tuple[int, int]], total_samples: int, sr: int = SAMPLE_RATE):
+        self.regions = regions
+        self.total_samples = total_samples
+        self.sr = sr
+        self._trimmed_starts = []
+        position = 0
+        for start, end in regions:
+            self._trimmed_starts.append(position)
+            position += end - start
+        self.speech_samples = position
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.speech_samples / self.sr
+
+    @property
+    def removed_seconds(self) -> float:
+        return (self.total_samples - self.speech_samples) / self.sr
+
+    def trim(self, audio) -> np.ndarray:
+        """Returns the speech regions of `audio` concatenated."""
+        audio = np.asarray(audio, dtype=np.float32)
+        return np.concatenate([audio[start:end] for start, end in self.regions])
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Converts a trimmed time to recording time. An end time on a region boundary stays in the
+        earlier region, so a segment never stretches over the silence that follows it.
+        """
+        sample = seconds * self.sr
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        index = min(max(search(self._trimmed_starts, sample) - 1, 0), len(self.regions) - 1)
+        return (self.regions[index][0] + sample - self._trimmed_starts[index]) / self.sr
+
+    def remap_segments(self, segments: list[dict]) -> list[dict]:
+        """Moves segment and word timestamps from trimmed time to recording time, in place."""
+        for seg in segments:
+            for item in [seg, *seg.get("words", [])]:
+                for field in ("start", "end"):
+                    if item.get(field) is not None:
+                        item[field] = self.to_original(item[field], is_end=field == "end")
+        return segments
+
+
+def speech_map(audio, vad_model, options: VadOptions | None = None, sr: int = SAMPLE_RATE) -> SpeechMap:
+    """Detects the speech of `audio` and returns its map (with no regions if there is no speech)."""
+    return SpeechMap(detect_speech(audio, vad_model, options, sr), len(audio), sr)
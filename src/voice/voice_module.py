@@ -1,62 +1,698 @@
 import whisperx
 from whisperx.diarize import DiarizationPipeline
-import gc
 import torch
 import logging
 import os
+from contextlib import nullcontext
+from pathlib import Path
+from .autotune import AUTO, BatchSizer, auto_compute_type
+from .formatting import format_timestamp, format_transcript, iter_speaker_blocks
+from .model_pool import ModelPool, get_model_pool, model_key
+from .speaker_index import speaker_index_from_env
+from .stage_cache import ALIGN_STAGE, DIARIZE_STAGE, TRANSCRIBE_STAGE, StageCache, file_digest
+from .streaming import (SAMPLE_RATE, SpeakerStitcher, load_audio_window, relabel_segments, shift_segments,
+                        stitch_window, streaming_window_from_env, validate_window)
+from .vad import load_vad_model, speech_map, vad_options_from_env
 
+# Approximate resident size of the CTranslate2 Whisper weights in float16, used as the pool size hint
+# because those models do not expose torch parameters.
+WHISPER_MODEL_SIZES_MB = {
+    "tiny": 80, "base": 150, "small": 500, "medium": 1500,
+    "large-v1": 3100, "large-v2": 3100, "large-v3": 3100, "large-v3-turbo": 1700, "turbo": 1700,
+}
 
-def format_timestamp(seconds):
-    """Converts seconds (float) to HH:MM:SS format."""
-    if seconds is None:
-        return "00:00:00"
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
+def _whisper_size_hint(model_name: str, compute_type: str) -> int:
+    size_mb = WHISPER_MODEL_SIZES_MB.get(model_name, WHISPER_MODEL_SIZES_MB["large-v2"])
+    if compute_type == "float32":
+        size_mb *= 2
+    elif compute_type == "int8":
+        size_mb //= 2
+    return size_mb * 1024 * 1024
 
-def format_transcript(segments):
+
+def _validate_parameters(language: str, min_speakers: int, max_speakers: int, hf_token: str) -> None:
+    if not language:
+        raise ValueError("language is not provided.")
+    if min_speakers < 1:
+        raise ValueError(
+            f"min_speakers must be at least 1. Current value: {min_speakers}")
+    if max_speakers < min_speakers:
+        raise ValueError(
+            f"max_speakers must be at least min_speakers. min: {min_speakers}, max: {max_speakers}")
+    if not hf_token:
+        raise ValueError("hf_token is not provided.")
+
+
+def _validate_device(device: str) -> str:
+    device_type, _, index = device.partition(":")
+    if device_type not in {"cpu", "cuda"} or (index and not index.isdigit()) or (index and device_type == "cpu"):
+        raise ValueError(
+            f"device must be 'cpu', 'cuda' or 'cuda:<index>'. Current value: {device}")
+    return device
+
+
+def _configured_runtime_options() -> tuple[int | None, str]:
+    """
+    Returns the (batch_size, compute_type) configured by the environment, without resolving "auto".
+
+    BATCH_SIZE=auto yields a batch size of None; COMPUTE_TYPE=auto is returned as "auto".
+    """
+    batch_size = os.getenv("BATCH_SIZE", "16")
+    if batch_size.strip().lower() == AUTO:
+        batch_size = None
+    else:
+        try:
+            batch_size = int(batch_size)
+        except ValueError:
+            raise ValueError(
+                f"BATCH_SIZE must be a number or 'auto'. Current value: {os.getenv('BATCH_SIZE')}")
+        if batch_size < 1:
+            raise ValueError(
+                f"BATCH_SIZE must be a positive integer. Current value: {batch_size}")
+    compute_type = os.getenv("COMPUTE_TYPE", "float16")
+    valid_compute_types = {"float16", "float32", "int8", AUTO}
+    if compute_type not in valid_compute_types:
+        raise ValueError(
+            f"COMPUTE_TYPE must be one of {valid_compute_types}. Current value: {compute_type}")
+    return batch_size, compute_type
+
+
+def _resolve_runtime_options(device: str | None = None) -> tuple[str, int | None, str]:
+    """
+    Resolves (device, batch_size, compute_type) from the arguments and the environment.
+
+    BATCH_SIZE=auto yields a batch size of None, chosen per call by `autotune.BatchSizer`.
+    COMPUTE_TYPE=auto is resolved here from the device and its free memory.
+    """
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = _validate_device(device)
+    batch_size, compute_type = _configured_runtime_options()
+    if compute_type == AUTO:
+        model_name = os.getenv("WHISPERX_MODEL", "large-v2")
+        compute_type = auto_compute_type(device, _whisper_size_hint(model_name, "float16"))
+    return device, batch_size, compute_type
+
+
+def stage_cache_params(language: str, min_speakers: int, max_speakers: int, vad: bool = False) -> tuple[dict, dict]:
+    """
+    Returns the stage cache parameters (transcription/alignment, diarization) of a run.
+
+    Runtime options are keyed as configured, with "auto" left unresolved, so the parameters do not depend
+    on the device: a sharding parent computes the same keys as its workers without touching a device.
+    """
+    batch_size, compute_type = _configured_runtime_options()
+    transcribe_params = {"model": os.getenv("WHISPERX_MODEL", "large-v2"), "compute_type": compute_type,
+                         "batch_size": batch_size or AUTO, "language": language}
+    if vad:
+        # Trimmed audio changes every timestamp, so it must not share cache entries with untrimmed runs
+        transcribe_params["vad"] = vad_options_from_env().to_dict()
+    diarize_params = {**transcribe_params, "min_speakers": min_speakers, "max_speakers": max_speakers}
+    speaker_index_path = os.getenv("SPEAKER_INDEX_PATH")
+    if speaker_index_path:
+        # Labels from the index differ from the per-recording labels, so they are cached separately
+        diarize_params["speaker_index"] = str(Path(speaker_index_path))
+    return transcribe_params, diarize_params
+
+
+def streaming_cache_params(diarize_params: dict, window_seconds: float, overlap_seconds: float) -> dict:
+    """
+    Stage cache parameters of a recording diarized in streaming windows.
+
+    Streaming mode labels speakers per recording and does not use the speaker index, so the index
+    is not part of the parameters.
+    """
+    params = {key: value for key, value in diarize_params.items() if key != "speaker_index"}
+    return {**params, "window_seconds": window_seconds, "overlap_seconds": overlap_seconds}
+
+
+def _processing_error(e: Exception) -> Exception:
+    """Logs an audio processing failure and maps it to the exception reported to the caller."""
+    logger = logging.getLogger(__name__)
+    if isinstance(e, FileNotFoundError):
+        logger.error(f"File not found: {e}")
+        return e
+    if isinstance(e, ValueError):
+        logger.error(f"Invalid input value: {e}")
+        return e
+    if isinstance(e, RuntimeError):
+        logger.error(f"Runtime error occurred: {e}")
+        if "authentication" in str(e).lower() or "token" in str(e).lower():
+            error = RuntimeError(f"Hugging Face authentication failed: {e}")
+            error.__cause__ = e
+            return error
+        return e
+    logger.error(
+        f"Unexpected error occurred during audio processing: {e}", exc_info=e)
+    error = RuntimeError(f"An error occurred while processing the audio file: {e}")
+    error.__cause__ = e
+    return error
+
+
+def _apply_stage(items: dict, failures: dict, stage_fn) -> dict:
+    """Runs `stage_fn(path, value)` for every item, moving failed items into `failures`."""
+    outputs = {}
+    for path, value in items.items():
+        try:
+            outputs[path] = stage_fn(path, value)
+        except Exception as e:
+            failures[path] = _processing_error(e)
+    return outputs
+
+
+def _timed(metrics, stage: str, **fields):
+    """Times `stage` with the run metrics collector if one is given. Yields a record dict either way."""
+    if metrics is None:
+        return nullcontext({})
+    return metrics.stage(stage, **fields)
+
+
+def _pooled_model(model_pool: ModelPool, key: tuple, loader, metrics=None, size_hint_bytes: int | None = None):
+    # Model loads are timed as their own stage, so a slow first file shows up as loading, not inference
+    if metrics is None or key in model_pool:
+        return model_pool.get(key, loader, size_hint_bytes=size_hint_bytes)
+    with metrics.stage(f"load_{key[0]}_model"):
+        return model_pool.get(key, loader, size_hint_bytes=size_hint_bytes)
+
+
+def _whisper_load_options(device: str) -> tuple[str, dict]:
+    # CTranslate2 takes the device type and index separately, and its own CPU thread count
+    device_type, _, index = device.partition(":")
+    options = {}
+    if index:
+        options["device_index"] = int(index)
+    if os.getenv("CPU_THREADS"):
+        try:
+            options["threads"] = int(os.getenv("CPU_THREADS"))
+        except ValueError:
+            raise ValueError(
+                f"CPU_THREADS must be a number. Current value: {os.getenv('CPU_THREADS')}")
+    return device_type, options
+
+
+def _get_whisper_model(model_pool: ModelPool, model_name: str, device: str, compute_type: str, language: str,
+                       metrics=None):
+    key = model_key("whisper", model_name, device, compute_type, language)
+    device_type, options = _whisper_load_options(device)
+    model = _pooled_model(
+        model_pool, key,
+        lambda: whisperx.load_model(model_name, device_type, compute_type=compute_type, language=language,
+                                    **options),
+        metrics, size_hint_bytes=_whisper_size_hint(model_name, compute_type))
+    return key, model
+
+
+def _get_align_model(model_pool: ModelPool, language: str, device: str, metrics=None):
+    key = model_key("align", None, device, language=language)
+    return key, _pooled_model(
+        model_pool, key, lambda: whisperx.load_align_model(language_code=language, device=device), metrics)
+
+
+def _get_diarization_model(model_pool: ModelPool, hf_token: str, device: str, metrics=None):
+    key = model_key("diarization", None, device)
+    return key, _pooled_model(model_pool, key, lambda: DiarizationPipeline(token=hf_token, device=device), metrics)
+
+
+def _get_vad_model(model_pool: ModelPool, options, device: str, metrics=None):
+    key = model_key("vad", options.method, device)
+    return key, _pooled_model(model_pool, key, lambda: load_vad_model(options, device), metrics)
+
+
+def load_audio(audio_path: str):
+    """Decodes an audio file into a 16 kHz mono float32 array, rejecting empty files."""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Loading audio file: {audio_path}")
+    audio = whisperx.load_audio(audio_path)
+    if audio is None or len(audio) == 0:
+        raise ValueError(
+            f"Failed to load audio file or file is empty: {audio_path}")
+    return audio
+
+
+class FileStages:
+    """
+    Per-file transcription stages: decode -> transcribe -> align -> diarize.
+
+    Each stage takes and returns a state dict for one file, so the same stages drive both the
+    stage-wise batch runner (`transcribe_files`) and the pipelined executor. Models come from the
+    model pool and are loaded lazily on first use; intermediate outputs are read from and written
+    to the optional stage cache. After `diarize`, the state holds the speaker-labelled "segments"
+    and the decoded audio and intermediate results are dropped.
+
+    When a `metrics` collector is given (see `pipeline.metrics.RunMetrics`), every computed stage and
+    every model load is timed with the audio duration it processed, and stage cache hits are counted.
+
+    With `vad`, `decode` also detects the speech regions and keeps only those, so transcription,
+    alignment and diarization skip long silences, music and noise; `diarize` maps the timestamps back to
+    recording time.
+
+    When a speaker index is configured (SPEAKER_INDEX_PATH, see `voice.speaker_index`), `diarize` also
+    asks for the speaker embeddings and replaces the per-recording labels with the stable labels of
+    the index, so the same person keeps the same label across recordings.
+    """
+
+    STAGES = ("decode", "transcribe", "align", "diarize")
+
+    def __init__(self, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                 model_pool: ModelPool | None = None, stage_cache: StageCache | None = None, metrics=None,
+                 vad: bool = False, device: str | None = None):
+        _validate_parameters(language, min_speakers, max_speakers, hf_token)
+        self.language = language
+        self.min_speakers = min_speakers
+        self.max_speakers = max_speakers
+        self.hf_token = hf_token
+        self.device, self.batch_size, self.compute_type = _resolve_runtime_options(device)
+        self.model_pool = model_pool if model_pool is not None else get_model_pool()
+        self.stage_cache = stage_cache
+        self.whisper_model_name = os.getenv("WHISPERX_MODEL", "large-v2")
+        self.batch_sizer = BatchSizer(self.batch_size, self.device, self.whisper_model_name, self.compute_type)
+        self.vad_options = vad_options_from_env() if vad else None
+        self.transcribe_params, self.diarize_params = stage_cache_params(language, min_speakers, max_speakers,
+                                                                         vad=vad)
+        self.speaker_index = speaker_index_from_env()
+        self._used_keys = {stage: set() for stage in self.STAGES}
+        self._logger = logging.getLogger(__name__)
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.record("device", self.device)
+            metrics.record("batch_size", self.batch_size or AUTO)
+            metrics.record("compute_type", self.compute_type)
+            metrics.record("whisper_model", self.whisper_model_name)
+
+    def streaming_params(self, window_seconds: float, overlap_seconds: float) -> dict:
+        """Stage cache parameters of a recording diarized in streaming windows (see `streaming_cache_params`)."""
+        return streaming_cache_params(self.diarize_params, window_seconds, overlap_seconds)
+
+    def _computed(self, state: dict, stage: str, compute):
+        with _timed(self.metrics, stage, audio_path=state["audio_path"],
+                    audio_seconds=state.get("audio_seconds")):
+            return compute()
+
+    def _count_cache_hit(self, stage: str) -> None:
+        if self.metrics is not None:
+            self.metrics.increment(f"stage_cache_hit:{stage}")
+
+    def _cached(self, state: dict, stage: str, params: dict, compute):
+        digest = state.get("digest")
+        if digest is None:
+            return self._computed(state, stage, compute)
+        cached = self.stage_cache.get(digest, stage, params)
+        if cached is not None:
+            self._count_cache_hit(stage)
+            return cached
+        value = self._computed(state, stage, compute)
+        self.stage_cache.put(digest, stage, params, value)
+        return value
+
+    def decode(self, audio_path: str) -> dict:
+        """Creates the state of one file. A cached diarization completes it without decoding the audio."""
+        if not audio_path:
+            raise ValueError("audio_path is not provided.")
+        state = {"audio_path": audio_path}
+        if self.stage_cache is not None:
+            state["digest"] = file_digest(audio_path)
+            # A cached diarization means the file needs no GPU work (or decoding) at all
+            cached = self.stage_cache.get(state["digest"], DIARIZE_STAGE, self.diarize_params)
+            if cached is not None:
+                self._count_cache_hit(DIARIZE_STAGE)
+                state["segments"] = cached
+                return state
+        with _timed(self.metrics, "decode", audio_path=audio_path) as record:
+            state["audio"] = load_audio(audio_path)
+            state["audio_seconds"] = record["audio_seconds"] = len(state["audio"]) / SAMPLE_RATE
+        if self.vad_options is not None:
+            self._trim_silence(state)
+        return state
+
+    def _trim_silence(self, state: dict) -> None:
+        with _timed(self.metrics, "vad", audio_path=state["audio_path"],
+                    audio_seconds=state["audio_seconds"]) as record:
+            key, vad_model = _get_vad_model(self.model_pool, self.vad_options, self.device, self.metrics)
+            self._used_keys["decode"].add(key)
+            speech = speech_map(state["audio"], vad_model, self.vad_options)
+            record["speech_seconds"] = speech.speech_seconds
+        if not speech.regions:
+            self._logger.info(f"No speech detected in {state['audio_path']}")
+            del state["audio"]
+            state["segments"] = []
+        elif speech.removed_seconds > 0:
+            self._logger.info(f"Removed {speech.removed_seconds:.1f}s of non-speech from {state['audio_path']} "
+                              f"({speech.speech_seconds:.1f}s of speech left)")
+            state["audio"] = speech.trim(state["audio"])
+            state["speech_map"] = speech
+
+    def transcribe(self, state: dict) -> dict:
+        """1. Transcribe with original whisper (batched)"""
+        if "segments" in state:
+            return state
+
+        def compute():
+            self._logger.info(f"Loading WhisperX model for language: {self.language}")
+            key, model = _get_whisper_model(self.model_pool, self.whisper_model_name, self.device,
+                                            self.compute_type, self.language, self.metrics)
+            self._used_keys["transcribe"].add(key)
+            self._logger.info(f"Starting transcription: {state['audio_path']}")
+            result = self.batch_sizer.transcribe(model, state["audio"], self.metrics)
+            self._logger.info("Transcription completed!")
+            self._logger.debug(result["segments"])  # before alignment
+            return result
+
+        state["transcription"] = self._cached(state, TRANSCRIBE_STAGE, self.transcribe_params, compute)
+        return state
+
+    def align(self, state: dict) -> dict:
+        """2. Align whisper output"""
+        if "segments" in state:
+            return state
+        transcription = state.pop("transcription")
+
+        def compute():
+            self._logger.info("Loading alignment model...")
+            key, (model_a, metadata) = _get_align_model(self.model_pool, transcription["language"], self.device,
+                                                         self.metrics)
+            self._used_keys["align"].add(key)
+            result = whisperx.align(transcription["segments"], model_a,
+                                    metadata, state["audio"], self.device, return_char_alignments=False)
+            self._logger.info(f"Alignment completed: {state['audio_path']}")
+            self._logger.debug(result["segments"])  # after alignment
+            return result
+
+        state["alignment"] = self._cached(state, ALIGN_STAGE, self.transcribe_params, compute)
+        return state
+
+    def diarize(self, state: dict) -> dict:
+        """3. Assign speaker labels"""
+        if "segments" in state:
+            return state
+        aligned = state.pop("alignment")
+
+        def compute():
+            self._logger.info("Initializing diarization pipeline...")
+            key, diarize_model = _get_diarization_model(self.model_pool, self.hf_token, self.device, self.metrics)
+            self._used_keys["diarize"].add(key)
+            self._logger.info(
+                f"Starting diarization of {state['audio_path']} "
+                f"(min_speakers: {self.min_speakers}, max_speakers: {self.max_speakers})...")
+            # add min/max number of speakers if known
+            diarize_segments = diarize_model(
+                state["audio"], min_speakers=self.min_speakers, max_speakers=self.max_speakers,
+                **({"return_embeddings": True} if self.speaker_index is not None else {}))
+            if self.speaker_index is not None:
+                diarize_segments, speaker_embeddings = diarize_segments
+            self._logger.info("Diarization completed!")
+            result = whisperx.assign_word_speakers(diarize_segments, aligned)
+            self._logger.debug(diarize_segments)
+            if self.speaker_index is not None:
+                self._apply_speaker_index(state["audio_path"], result["segments"], speaker_embeddings)
+            if "speech_map" in state:
+                # Back from speech-only time to original-recording time
+                state["speech_map"].remap_segments(result["segments"])
+            # segments are now assigned speaker IDs
+            self._logger.debug(result["segments"])
+            return result["segments"]
+
+        state["segments"] = self._cached(state, DIARIZE_STAGE, self.diarize_params, compute)
+        del state["audio"]
+        state.pop("speech_map", None)
+        return state
+
+    def _apply_speaker_index(self, audio_path: str, segments: list[dict], speaker_embeddings: dict | None) -> None:
+        if not speaker_embeddings:
+            self._logger.warning(f"No speaker embeddings for {audio_path}, keeping per-recording labels")
+            return
+        speaker_map = self.speaker_index.assign(speaker_embeddings, recording=audio_path)
+        self._logger.info(f"Speaker labels of {audio_path}: {speaker_map}")
+        relabel_segments(segments, speaker_map)
+
+    def release(self, stage: str) -> None:
+        """Releases the models used by `stage` when the model pool runs the low-memory policy."""
+        # Swapped out first, since pipelined stage workers may add keys while the models are released
+        keys, self._used_keys[stage] = self._used_keys[stage], set()
+        for key in keys:
+            self.model_pool.release_after_stage(key)
+
+
+def transcribe_files(audio_paths: list[str], language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                     model_pool: ModelPool | None = None, chunk_size: int | None = None,
+                     stage_cache: StageCache | None = None, streaming: bool = False, metrics=None,
+                     vad: bool = False, device: str | None = None) -> dict:
+    """
+    Transcribes and diarizes several audio files stage by stage.
+
+    Within each chunk of files, every file is transcribed, then every file is aligned, then every file
+    is diarized, so each model is loaded (and, under the low-memory policy, released) once per chunk
+    instead of once per file. Decoded audio is kept only for the files of the current chunk. Models
+    are loaded lazily, so stages fully served by `stage_cache` load nothing.
+
+    Args:
+        audio_paths (list[str]): Paths of the audio files to process.
+        language (str): Language code for transcription (e.g., 'en', 'fr').
+        min_speakers (int): Minimum number of speakers to expect in each file.
+        max_speakers (int): Maximum number of speakers to expect in each file.
+        hf_token (str): Hugging Face authentication token for diarization model access.
+        model_pool (ModelPool | None): Registry used to load and reuse models. Defaults to the shared process-wide pool.
+        chunk_size (int | None): Number of files whose decoded audio is held at once. Defaults to all files.
+        stage_cache (StageCache | None): Cache of transcription, alignment and diarization outputs keyed by
+            audio content and stage parameters. A file with a cached diarization is not decoded at all.
+        streaming (bool): Process each file in bounded, overlapping windows (see `iter_streaming_segments`)
+            instead of decoding it whole. Files are then processed one after another.
+        metrics (RunMetrics | None): Optional collector of per-stage timings and memory (see `pipeline.metrics`).
+        vad (bool): Remove long non-speech stretches (silence, music, noise) before transcription and
+            diarization (see `voice.vad`). Timestamps stay in original-recording time.
+        device (str | None): Device to run the models on, e.g. "cpu" or "cuda:1". Defaults to CUDA if available.
+
+    Returns:
+        dict: Maps each audio path to its list of speaker-labelled WhisperX segments, or to the exception
+        that made that file fail. A failing file never aborts the other files.
+
+    Raises:
+        ValueError: If the shared parameters or runtime options are invalid.
     """
-    Formats WhisperX segments by:
-    1. Merging consecutive utterances from the same speaker
-    2. Adding timestamps (start -> end) for each speaker block
-    3. Converting to a clean transcript format (String)
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(
+            f"chunk_size must be a positive integer. Current value: {chunk_size}")
+    stages = FileStages(language, min_speakers, max_speakers, hf_token,
+                        model_pool=model_pool, stage_cache=stage_cache, metrics=metrics, vad=vad, device=device)
+    audio_paths = list(dict.fromkeys(audio_paths))
+    chunk_size = chunk_size or max(len(audio_paths), 1)
+
+    if streaming:
+        results = {}
+        for path in audio_paths:
+            try:
+                results[path] = list(_iter_cached_streaming_segments(stages, path))
+            except Exception as e:
+                results[path] = _processing_error(e)
+        return results
+
+    results = {}
+    for chunk_start in range(0, len(audio_paths), chunk_size):
+        chunk = audio_paths[chunk_start:chunk_start + chunk_size]
+        failures = {}
+        states = _apply_stage(dict.fromkeys(chunk), failures, lambda path, _: stages.decode(path))
+        for stage in ("transcribe", "align", "diarize"):
+            stage_fn = getattr(stages, stage)
+            states = _apply_stage(states, failures, lambda _, state: stage_fn(state))
+            stages.release(stage)
+        results.update({path: state["segments"] for path, state in states.items()})
+        results.update(failures)
+        del states
+    return {path: results[path] for path in audio_paths}
+
+
+def _iter_cached_streaming_segments(stages: FileStages, audio_path: str):
+    """Yields the streaming segments of one file from the stage cache, or as its windows are processed."""
+    if not audio_path:
+        raise ValueError("audio_path is not provided.")
+    window_seconds, overlap_seconds = streaming_window_from_env()
+    stream_params = stages.streaming_params(window_seconds, overlap_seconds)
+    digest = file_digest(audio_path) if stages.stage_cache is not None else None
+    segments = stages.stage_cache.get(digest, DIARIZE_STAGE, stream_params) if digest else None
+    if segments is not None:
+        stages._count_cache_hit(DIARIZE_STAGE)
+        yield from segments
+        return
+    segments = iter_streaming_segments(
+        audio_path, stages.language, stages.min_speakers, stages.max_speakers, stages.hf_token,
+        model_pool=stages.model_pool, window_seconds=window_seconds, overlap_seconds=overlap_seconds,
+        metrics=stages.metrics, vad=stages.vad_options is not None, device=stages.device)
+    if not digest:
+        yield from segments
+        return
+    # The cache entry needs every segment, so they are kept until the recording is done
+    processed = []
+    for segment in segments:
+        processed.append(segment)
+        yield segment
+    stages.stage_cache.put(digest, DIARIZE_STAGE, stream_params, processed)
+
+
+class _WindowTranscriber:
+    """Transcribes, aligns and diarizes windows of one recording with shared, lazily loaded models."""
+
+    def __init__(self, audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                 window_seconds: float, model_pool: ModelPool | None = None, device: str | None = None,
+                 metrics=None, vad: bool = False):
+        if not audio_path:
+            raise ValueError("audio_path is not provided.")
+        _validate_parameters(language, min_speakers, max_speakers, hf_token)
+        self.audio_path = audio_path
+        self.language = language
+        self.min_speakers = min_speakers
+        self.max_speakers = max_speakers
+        self.hf_token = hf_token
+        self.window_seconds = window_seconds
+        self.device, self.batch_size, self.compute_type = _resolve_runtime_options(device)
+        self.model_pool = model_pool if model_pool is not None else get_model_pool()
+        self.metrics = metrics
+        self.vad_options = vad_options_from_env() if vad else None
+        self.whisper_model_name = os.getenv("WHISPERX_MODEL", "large-v2")
+        self.batch_sizer = BatchSizer(self.batch_size, self.device, self.whisper_model_name, self.compute_type)
+        self.used_keys = set()
+        self._logger = logging.getLogger(__name__)
+
+    def __call__(self, offset: float) -> dict | None:
+        """
+        Processes the window starting at `offset`.
+
+        Returns:
+            dict | None: None past the end of the recording, otherwise {"offset", "is_last", "segments", "turns"}
+            with segment and diarization-turn times in recording time and window-local speaker labels.
+        """
+        with _timed(self.metrics, "decode", audio_path=self.audio_path, window_offset=offset) as record:
+            audio = load_audio_window(self.audio_path, offset, self.window_seconds)
+            audio_seconds = record["audio_seconds"] = len(audio) / SAMPLE_RATE
+        if len(audio) == 0:
+            if offset == 0.0:
+                raise ValueError(
+                    f"Failed to load audio file or file is empty: {self.audio_path}")
+            return None
+        window = {"offset": offset, "is_last": len(audio) < int(self.window_seconds * SAMPLE_RATE),
+                  "segments": [], "turns": []}
+        self._logger.info(f"Processing window {format_timestamp(offset)} -> "
+                          f"{format_timestamp(offset + audio_seconds)} of {self.audio_path}")
+
+        fields = {"audio_path": self.audio_path, "window_offset": offset, "audio_seconds": audio_seconds}
+        speech = None
+        if self.vad_options is not None:
+            vad_key, vad_model = _get_vad_model(self.model_pool, self.vad_options, self.device, self.metrics)
+            self.used_keys.add(vad_key)
+            with _timed(self.metrics, "vad", **fields):
+                speech = speech_map(audio, vad_model, self.vad_options)
+            if not speech.regions:
+                self._logger.info("No speech detected in window, skipping it")
+                return window
+            audio = speech.trim(audio)
+        whisper_key, model = _get_whisper_model(self.model_pool, self.whisper_model_name, self.device,
+                                                self.compute_type, self.language, self.metrics)
+        with _timed(self.metrics, TRANSCRIBE_STAGE, **fields):
+            result = self.batch_sizer.transcribe(model, audio, self.metrics)
+        del model
+        align_key, (model_a, metadata) = _get_align_model(self.model_pool, result["language"], self.device,
+                                                          self.metrics)
+        with _timed(self.metrics, ALIGN_STAGE, **fields):
+            result = whisperx.align(result["segments"], model_a,
+                                    metadata, audio, self.device, return_char_alignments=False)
+        del model_a
+        diarize_key, diarize_model = _get_diarization_model(self.model_pool, self.hf_token, self.device,
+                                                            self.metrics)
+        with _timed(self.metrics, DIARIZE_STAGE, **fields):
+            diarize_segments = diarize_model(
+                audio, min_speakers=self.min_speakers, max_speakers=self.max_speakers)
+            result = whisperx.assign_word_speakers(diarize_segments, result)
+        del diarize_model
+        self.used_keys.update((whisper_key, align_key, diarize_key))
+        del audio
+
+        turns = [(row["start"], row["end"], row["speaker"]) for _, row in diarize_segments.iterrows()]
+        if speech is not None:
+            speech.remap_segments(result["segments"])
+            turns = [(speech.to_original(start), speech.to_original(end, is_end=True), speaker)
+                     for start, end, speaker in turns]
+        window["turns"] = [(start + offset, end + offset, speaker) for start, end, speaker in turns]
+        window["segments"] = shift_segments(result["segments"], offset)
+        return window
+
+    def release(self) -> None:
+        # Models are shared by every window, so the low-memory policy frees them once at the end
+        for key in self.used_keys:
+            self.model_pool.release_after_stage(key)
+        self.used_keys.clear()
+
+
+def transcribe_window(audio_path: str, offset: float, window_seconds: float, language: str, min_speakers: int,
+                      max_speakers: int, hf_token: str, model_pool: ModelPool | None = None,
+                      device: str | None = None, vad: bool = False) -> dict | None:
     """
-    if not segments or not all('text' in seg for seg in segments):
-        return ""
+    Transcribes and diarizes one window of a recording, for processing the windows of a long file in
+    parallel. Combine the windows, in order, with `streaming.stitch_window`.
 
-    formatted_lines = []
+    Returns:
+        dict | None: See `_WindowTranscriber.__call__`.
+    """
+    transcriber = _WindowTranscriber(audio_path, language, min_speakers, max_speakers, hf_token, window_seconds,
+                                     model_pool=model_pool, device=device, vad=vad)
+    try:
+        return transcriber(offset)
+    finally:
+        transcriber.release()
 
-    current_speaker = segments[0].get('speaker', 'UNKNOWN')
-    current_text = [segments[0]['text'].strip()]
-    current_start = segments[0].get('start')
-    current_end = segments[0].get('end')
 
-    for seg in segments[1:]:
-        speaker = seg.get('speaker', 'UNKNOWN')
-        text = seg['text'].strip()
+def iter_streaming_segments(audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                            model_pool: ModelPool | None = None, window_seconds: float | None = None,
+                            overlap_seconds: float | None = None, metrics=None, vad: bool = False,
+                            device: str | None = None):
+    """
+    Transcribes and diarizes a long recording window by window, yielding segments as windows complete.
 
-        if speaker == current_speaker:
-            current_text.append(text)
-            current_end = seg.get('end', current_end)
-        else:
-            timestamp = f"[{format_timestamp(current_start)} -> {format_timestamp(current_end)}]"
-            formatted_lines.append(
-                f"{timestamp} {current_speaker}: {' '.join(current_text)}")
-            current_speaker = speaker
-            current_text = [text]
-            current_start = seg.get('start')
-            current_end = seg.get('end')
+    Only one window of decoded audio (`window_seconds` long) is held at a time, so peak memory is
+    roughly constant in the recording length. Consecutive windows overlap by `overlap_seconds`:
+    each utterance in an overlap is emitted by exactly one window (split at the overlap midpoint),
+    and per-window diarization labels are mapped onto recording-wide labels by matching speaker turns
+    inside the overlap (see `SpeakerStitcher`). Timestamps are in recording time.
 
-    timestamp = f"[{format_timestamp(current_start)} -> {format_timestamp(current_end)}]"
-    formatted_lines.append(
-        f"{timestamp} {current_speaker}: {' '.join(current_text)}")
+    Args:
+        audio_path (str): Path to the audio file to be processed.
+        language (str): Language code for transcription (e.g., 'en', 'fr').
+        min_speakers (int): Minimum number of speakers to expect in each window.
+        max_speakers (int): Maximum number of speakers to expect in each window.
+        hf_token (str): Hugging Face authentication token for diarization model access.
+        model_pool (ModelPool | None): Registry used to load and reuse models. Defaults to the shared process-wide pool.
+        window_seconds (float | None): Window length. Defaults to STREAM_WINDOW_SECONDS.
+        overlap_seconds (float | None): Overlap between windows. Defaults to STREAM_OVERLAP_SECONDS.
+        metrics (RunMetrics | None): Optional collector; each stage of each window is timed separately.
+        vad (bool): Remove long non-speech stretches of each window before transcription and diarization.
+        device (str | None): Device to run the models on, e.g. "cuda:1". Defaults to CUDA if available.
 
-    return "\n\n".join(formatted_lines)
+    Yields:
+        dict: Speaker-labelled WhisperX segments in recording order.
+    """
+    if window_seconds is None or overlap_seconds is None:
+        default_window, default_overlap = streaming_window_from_env()
+        window_seconds = default_window if window_seconds is None else window_seconds
+        overlap_seconds = default_overlap if overlap_seconds is None else overlap_seconds
+    validate_window(window_seconds, overlap_seconds)
+    transcriber = _WindowTranscriber(audio_path, language, min_speakers, max_speakers, hf_token, window_seconds,
+                                     model_pool=model_pool, device=device, metrics=metrics, vad=vad)
+    stitcher = SpeakerStitcher()
+    offset = 0.0
+    try:
+        while True:
+            window = transcriber(offset)
+            if window is None:
+                break
+            yield from stitch_window(stitcher, window, window_seconds, overlap_seconds)
+            if window["is_last"]:
+                break
+            offset += window_seconds - overlap_seconds
+    finally:
+        transcriber.release()
 
 
-def parse_speakers_and_transcript(audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str) -> str:
+def parse_speakers_and_transcript(audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                                  model_pool: ModelPool | None = None, stage_cache: StageCache | None = None,
+                                  streaming: bool = False, metrics=None, vad: bool = False) -> str:
     """
     Parses the speakers and transcript from the given audio file using WhisperX and diarization.
 
@@ -66,6 +702,11 @@ def parse_speakers_and_transcript(audio_path: str, language: str, min_speakers:
         min_speakers (int): Minimum number of speakers to expect in the audio.
         max_speakers (int): Maximum number of speakers to expect in the audio.
         hf_token (str): Hugging Face authentication token for diarization model access.
+        model_pool (ModelPool | None): Registry used to load and reuse models. Defaults to the shared process-wide pool.
+        stage_cache (StageCache | None): Optional cache of intermediate stage outputs (see `transcribe_files`).
+        streaming (bool): Decode and process the audio in bounded overlapping windows (for multi-hour recordings).
+        metrics (RunMetrics | None): Optional collector of per-stage timings and memory (see `pipeline.metrics`).
+        vad (bool): Transcribe and diarize only the detected speech; timestamps stay in recording time.
 
     Returns:
         str: A formatted string containing the transcript with speaker labels, where each line is in the form "[HH:MM:SS -> HH:MM:SS] {speaker}: {text}". Multiple segments from the same speaker are merged, and segments are separated by double newlines.
@@ -76,107 +717,72 @@ def parse_speakers_and_transcript(audio_path: str, language: str, min_speakers:
         RuntimeError: If authentication with Hugging Face using `hf_token` fails.
         Exception: For other errors raised by WhisperX or diarization pipeline.
     """
-    logger = logging.getLogger(__name__)
-
     # Validate input parameters
     if not audio_path:
         raise ValueError("audio_path is not provided.")
-    if not language:
-        raise ValueError("language is not provided.")
-    if min_speakers < 1:
-        raise ValueError(
-            f"min_speakers must be at least 1. Current value: {min_speakers}")
-    if max_speakers < min_speakers:
-        raise ValueError(
-            f"max_speakers must be at least min_speakers. min: {min_speakers}, max: {max_speakers}")
-    if not hf_token:
-        raise ValueError("hf_token is not provided.")
+    outcome = transcribe_files([audio_path], language, min_speakers, max_speakers, hf_token,
+                               model_pool=model_pool, stage_cache=stage_cache, streaming=streaming,
+                               metrics=metrics, vad=vad)[audio_path]
+    if isinstance(outcome, Exception):
+        raise outcome
+    return format_transcript(outcome)
 
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    try:
-        # reduce if low on GPU mem
-        batch_size = int(os.getenv("BATCH_SIZE", 16))
-    except ValueError:
-        raise ValueError(
-            f"BATCH_SIZE must be a number. Current value: {os.getenv('BATCH_SIZE')}")
-    if batch_size < 1:
-        raise ValueError(
-            f"BATCH_SIZE must be a positive integer. Current value: {batch_size}")
-    # change to "int8" if low on GPU mem (may reduce accuracy)
-    compute_type = os.getenv("COMPUTE_TYPE", "float16")
-    valid_compute_types = {"float16", "float32", "int8"}
-    if compute_type not in valid_compute_types:
-        raise ValueError(
-            f"COMPUTE_TYPE must be one of {valid_compute_types}. Current value: {compute_type}")
-    try:
-        # 1. Transcribe with original whisper (batched)
-        logger.info(f"Loading WhisperX model for language: {language}")
-        model = whisperx.load_model(
-            os.getenv("WHISPERX_MODEL", "large-v2"), device, compute_type=compute_type, language=language)
-
-        logger.info(f"Loading audio file: {audio_path}")
-        audio = whisperx.load_audio(audio_path)
-        if audio is None or len(audio) == 0:
-            raise ValueError(
-                f"Failed to load audio file or file is empty: {audio_path}")
 
-        logger.info("Starting transcription...")
-        result = model.transcribe(audio, batch_size=batch_size)
-        logger.info("Transcription completed!")
-        logger.debug(result["segments"])  # before alignment
+def iter_transcript_blocks(audio_path: str, language: str, min_speakers: int, max_speakers: int, hf_token: str,
+                           model_pool: ModelPool | None = None, stage_cache: StageCache | None = None,
+                           streaming: bool = False, metrics=None, vad: bool = False, on_segment=None):
+    """
+    Incremental counterpart of `parse_speakers_and_transcript` that yields the formatted speaker blocks.
 
-        del model
-        gc.collect()
-        if device == "cuda":
-            torch.cuda.empty_cache()
-
-        # 2. Align whisper output
-        logger.info("Loading alignment model...")
-        model_a, metadata = whisperx.load_align_model(
-            language_code=result["language"], device=device)
-        result = whisperx.align(result["segments"], model_a,
-                                metadata, audio, device, return_char_alignments=False)
-        logger.info("Alignment completed!")
-        logger.debug(result["segments"])  # after alignment
+    With `streaming`, blocks are yielded as each window of the recording is finished, so the first
+    blocks are available long before a multi-hour recording is done and the full transcript is never
+    held in memory. Otherwise the blocks follow once the whole file is diarized. `on_segment`, if given,
+    is called with every segment before it is formatted (e.g. `TranscriptArtifactBuilder.add`).
 
-        del model_a
-        gc.collect()
-        if device == "cuda":
-            torch.cuda.empty_cache()
-
-        # 3. Assign speaker labels
-        logger.info("Initializing diarization pipeline...")
-        diarize_model = DiarizationPipeline(
-            token=hf_token, device=device)
-
-        logger.info(
-            f"Starting diarization (min_speakers: {min_speakers}, max_speakers: {max_speakers})...")
-        # add min/max number of speakers if known
-        diarize_segments = diarize_model(
-            audio, min_speakers=min_speakers, max_speakers=max_speakers)
-
-        logger.info("Diarization completed!")
-        result = whisperx.assign_word_speakers(diarize_segments, result)
-        logger.debug(diarize_segments)
-        # segments are now assigned speaker IDs
-        logger.debug(result["segments"])
-        full_diarization = format_transcript(result["segments"])
-        return full_diarization
-
-    except FileNotFoundError as e:
-        logger.error(f"File not found: {e}")
-        raise
-    except ValueError as e:
-        logger.error(f"Invalid input value: {e}")
-        raise
-    except RuntimeError as e:
-        logger.error(f"Runtime error occurred: {e}")
-        if "authentication" in str(e).lower() or "token" in str(e).lower():
-            raise RuntimeError(
-                f"Hugging Face authentication failed: {e}") from e
-        raise
+    Yields:
+        str: Speaker blocks in transcript order; joined with blank lines they equal the output of
+        `parse_speakers_and_transcript`.
+
+    Raises:
+        Same as `parse_speakers_and_transcript`, when the failing stage is reached.
+    """
+    if not streaming:
+        if not audio_path:
+            raise ValueError("audio_path is not provided.")
+        outcome = transcribe_files([audio_path], language, min_speakers, max_speakers, hf_token,
+                                   model_pool=model_pool, stage_cache=stage_cache, metrics=metrics,
+                                   vad=vad)[audio_path]
+        if isinstance(outcome, Exception):
+            raise outcome
+        yield from iter_speaker_blocks(_observed(outcome, on_segment))
+        return
+    stages = FileStages(language, min_speakers, max_speakers, hf_token,
+                        model_pool=model_pool, stage_cache=stage_cache, metrics=metrics, vad=vad)
+    try:
+        yield from iter_speaker_blocks(_observed(_iter_cached_streaming_segments(stages, audio_path), on_segment))
     except Exception as e:
-        logger.error(
-            f"Unexpected error occurred during audio processing: {e}", exc_info=True)
-        raise RuntimeError(
-            f"An error occurred while processing the audio file: {e}") from e
+        raise _processing_error(e)
+
+
+def _observed(segments, on_segment):
+    for segment in segments:
+        if on_segment is not None:
+            on_segment(segment)
+        yield segment
+
+
+def parse_speakers_and_transcript_batch(audio_paths: list[str], language: str, min_speakers: int, max_speakers: int,
+                                        hf_token: str, model_pool: ModelPool | None = None,
+                                        chunk_size: int | None = None, stage_cache: StageCache | None = None,
+                                        streaming: bool = False, metrics=None, vad: bool = False) -> dict:
+    """
+    Batch counterpart of `parse_speakers_and_transcript` built on `transcribe_files`.
+
+    Returns:
+        dict: Maps each audio path to its formatted transcript, or to the exception that made it fail.
+    """
+    outcomes = transcribe_files(audio_paths, language, min_speakers, max_speakers, hf_token,
+                                model_pool=model_pool, chunk_size=chunk_size, stage_cache=stage_cache,
+                                streaming=streaming, metrics=metrics, vad=vad)
+    return {path: outcome if isinstance(outcome, Exception) else format_transcript(outcome)
+            for path, outcome in outcomes.items()}
@@ -0,0 +1,30 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils.atomic_io import atomic_open, write_atomic
+
+
+class AtomicIoTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "nested" / "result.txt"
+
+    def test_write_replaces_the_file_and_leaves_no_temp_file(self):
+        write_atomic(self.path, "first")
+        write_atomic(self.path, b"second")
+        self.assertEqual(self.path.read_bytes(), b"second")
+        self.assertEqual([p.name for p in self.path.parent.iterdir()], ["result.txt"])
+
+    def test_failed_write_keeps_the_previous_file(self):
+        write_atomic(self.path, "complete")
+        with self.assertRaises(RuntimeError), atomic_open(self.path) as f:
+            f.write("partial")
+            raise RuntimeError("interrupted")
+        self.assertEqual(self.path.read_text(encoding="utf-8"), "complete")
+        self.assertEqual([p.name for p in self.path.parent.iterdir()], ["result.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
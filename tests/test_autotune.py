@@ -0,0 +1,104 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.pipeline.metrics import RunMetrics
+from src.voice import autotune, voice_module
+from src.voice.autotune import BatchSizer, auto_batch_size, is_out_of_memory
+
+MB = 1024 * 1024
+
+
+def _model_with_memory_limit(max_batch_size: int, calls: list):
+    model = MagicMock()
+
+    def transcribe(audio, batch_size):
+        calls.append(batch_size)
+        if batch_size > max_batch_size:
+            raise RuntimeError("CUDA failed with error out of memory")
+        return {"language": "en", "segments": []}
+
+    model.transcribe.side_effect = transcribe
+    return model
+
+
+class AutoBatchSizeTests(unittest.TestCase):
+    def test_largest_power_of_two_that_fits(self):
+        # large-v2 needs ~192 MB per item; 80% of 1000 MB fits 4 items
+        self.assertEqual(auto_batch_size(1000 * MB, "large-v2", "float16"), 4)
+        self.assertEqual(auto_batch_size(1000 * MB, "tiny", "float16"), 32)
+        self.assertEqual(auto_batch_size(1000 * MB, "tiny", "float16", max_batch_size=8), 8)
+
+    def test_float32_needs_twice_the_memory(self):
+        self.assertEqual(auto_batch_size(1000 * MB, "large-v2", "float32"), 2)
+
+    def test_never_below_one(self):
+        self.assertEqual(auto_batch_size(0, "large-v2", "float16"), 1)
+
+    def test_unknown_memory_falls_back_to_default(self):
+        self.assertEqual(auto_batch_size(None, "large-v2", "float16"), autotune.DEFAULT_BATCH_SIZE)
+
+
+class IsOutOfMemoryTests(unittest.TestCase):
+    def test_recognizes_memory_errors(self):
+        self.assertTrue(is_out_of_memory(MemoryError()))
+        self.assertTrue(is_out_of_memory(RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")))
+        self.assertTrue(is_out_of_memory(RuntimeError("CUDA failed with error out of memory")))
+        self.assertFalse(is_out_of_memory(RuntimeError("device-side assert triggered")))
+        self.assertFalse(is_out_of_memory(ValueError("out of memory")))
+
+
+class BatchSizerTests(unittest.TestCase):
+    def test_backs_off_on_out_of_memory_and_keeps_the_lower_size(self):
+        calls = []
+        model = _model_with_memory_limit(4, calls)
+        metrics = RunMetrics()
+        sizer = BatchSizer(16, "cpu", "large-v2", "float16")
+
+        sizer.transcribe(model, [0.0], metrics)
+        sizer.transcribe(model, [0.0], metrics)
+
+        self.assertEqual(calls, [16, 8, 4, 4])
+        self.assertEqual(metrics.counters["transcribe_oom_backoff"], 2)
+        self.assertEqual(metrics.counters["transcribe_batch_size:4"], 2)
+        self.assertEqual(metrics.values["transcribe_batch_size"], 4)
+
+    def test_fails_when_a_single_item_does_not_fit(self):
+        sizer = BatchSizer(2, "cpu", "large-v2", "float16")
+        with self.assertRaises(RuntimeError):
+            sizer.transcribe(_model_with_memory_limit(0, []), [0.0])
+
+    def test_other_errors_are_not_retried(self):
+        model = MagicMock()
+        model.transcribe.side_effect = RuntimeError("device-side assert triggered")
+        with self.assertRaises(RuntimeError):
+            BatchSizer(16, "cpu", "large-v2", "float16").transcribe(model, [0.0])
+        model.transcribe.assert_called_once()
+
+    def test_auto_mode_follows_free_memory(self):
+        calls = []
+        model = _model_with_memory_limit(32, calls)
+        sizer = BatchSizer(None, "cpu", "large-v2", "float16")
+
+        with patch.object(autotune, "available_memory_bytes", side_effect=[4000 * MB, 1000 * MB]):
+            sizer.transcribe(model, [0.0])
+            sizer.transcribe(model, [0.0])
+
+        self.assertEqual(calls, [16, 4])
+
+
+class RuntimeOptionsTests(unittest.TestCase):
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    def test_auto_settings(self, _cuda_available):
+        with patch.dict(os.environ, {"BATCH_SIZE": "auto", "COMPUTE_TYPE": "auto"}):
+            self.assertEqual(voice_module._resolve_runtime_options(), ("cpu", None, "int8"))
+
+    def test_invalid_batch_size(self):
+        for value in ("0", "many"):
+            with self.subTest(value=value), patch.dict(os.environ, {"BATCH_SIZE": value}), \
+                    self.assertRaises(ValueError):
+                voice_module._resolve_runtime_options("cpu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from benchmarks.run import compare, synthetic_segments
+
+
+class BenchmarkHarnessTests(unittest.TestCase):
+    def test_synthetic_segments_are_deterministic_and_ordered(self):
+        segments = synthetic_segments(500)
+        self.assertEqual(segments, synthetic_segments(500))
+        self.assertTrue(all(a["end"] <= b["start"] for a, b in zip(segments, segments[1:])))
+        self.assertGreater(len({seg["speaker"] for seg in segments}), 1)
+
+    def test_compare_flags_only_regressions_beyond_tolerance(self):
+        baseline = {"results": {"fast": {"median_seconds": 1.0}, "slow": {"median_seconds": 1.0}}}
+        results = {"fast": {"median_seconds": 1.2}, "slow": {"median_seconds": 1.5}, "new": {"median_seconds": 9.0}}
+
+        regressions = compare(results, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("slow:"))
+
+    def test_compare_enforces_absolute_budget(self):
+        results = {"startup": {"median_seconds": 2.0, "budget_seconds": 1.0}}
+
+        regressions = compare(results, {"results": {}}, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("budget", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from src.llm.chunking import estimate_tokens, iter_chunks, split_transcript
+
+
+class EstimateTokensTests(unittest.TestCase):
+    def test_latin_text_is_about_four_characters_per_token(self):
+        self.assertEqual(estimate_tokens("a" * 40), 10)
+
+    def test_cjk_characters_count_as_one_token(self):
+        self.assertEqual(estimate_tokens("안녕하세요"), 5)
+        self.assertEqual(estimate_tokens("会議"), 2)
+
+
+class SplitTranscriptTests(unittest.TestCase):
+    def test_short_transcript_is_one_chunk(self):
+        transcript = "[00:00:00 -> 00:00:01] SPEAKER_00: Hello\n\n[00:00:02 -> 00:00:03] SPEAKER_01: Hi"
+        self.assertEqual(split_transcript(transcript, 1000), [transcript])
+
+    def test_chunks_respect_speaker_blocks_and_budget(self):
+        blocks = [f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_0{i % 2}: " + "word " * 20 for i in range(6)]
+        chunks = split_transcript("\n\n".join(blocks), 70)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("\n\n".join(chunks), "\n\n".join(blocks))
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 70 + 1)
+            for block in chunk.split("\n\n"):
+                self.assertIn(block, blocks)
+
+    def test_oversized_block_is_split_on_words(self):
+        block = "SPEAKER_00: " + " ".join(f"w{i}" for i in range(200))
+        chunks = split_transcript(block, 50)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks).split(), block.split())
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 50 + 1)
+
+    def test_invalid_budget_raises(self):
+        with self.assertRaises(ValueError):
+            split_transcript("text", 0)
+
+
+class IterChunksTests(unittest.TestCase):
+    def test_chunk_is_yielded_before_later_blocks_are_read(self):
+        read = []
+
+        def blocks():
+            for i in range(4):
+                read.append(i)
+                yield f"SPEAKER_0{i}: " + "word " * 20
+
+        chunks = iter_chunks(blocks(), 40)
+
+        next(chunks)
+        self.assertEqual(read, [0, 1])
+        self.assertEqual(len(list(chunks)), 3)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,309 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.llm.llm_module import LLMModule
+from src.pipeline.metrics import RunMetrics
+
+
+def _echo_model(prompts):
+    """Fake chat model answering with a short tag derived from the prompt, recording every prompt."""
+    def respond(prompt_value):
+        prompt = prompt_value.to_string()
+        prompts.append(prompt)
+        if "### 📝 Notes" in prompt:
+            return AIMessage(content="FINAL SUMMARY")
+        part = prompt.split("(part ")[1].split(")")[0]
+        return AIMessage(content=f"notes for part {part}")
+    return RunnableLambda(respond)
+
+
+class LLMModuleTests(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"MODEL_TYPE": "ollama", "PROMPTS_DIR": "src/prompts",
+                                      "LLM_RETRY_BACKOFF": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.prompts = []
+
+    def test_short_transcript_uses_single_call(self):
+        llm = LLMModule("test-model", chunk_tokens=1000)
+        llm.model = RunnableLambda(lambda prompt: self.prompts.append(prompt.to_string()) or AIMessage(content="ok"))
+
+        self.assertEqual(llm.summarize_transcript("[00:00:00 -> 00:00:01] SPEAKER_00: Hello", "en"), "ok")
+        self.assertEqual(len(self.prompts), 1)
+        self.assertIn("SPEAKER_00: Hello", self.prompts[0])
+
+    def test_long_transcript_is_map_reduced(self):
+        llm = LLMModule("test-model", chunk_tokens=60, max_concurrency=2)
+        llm.model = _echo_model(self.prompts)
+        blocks = [f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_0{i % 2}: " + "word " * 30 for i in range(4)]
+
+        summary = llm.summarize_transcript("\n\n".join(blocks), "ko")
+
+        self.assertEqual(summary, "FINAL SUMMARY")
+        chunk_prompts = [p for p in self.prompts if "### 📝 Notes" not in p]
+        self.assertEqual(len(chunk_prompts), 4)
+        merge_prompt = self.prompts[-1]
+        self.assertIn("### 📝 Notes", merge_prompt)
+        for part in range(1, 5):
+            self.assertIn(f"notes for part {part} of 4", merge_prompt)
+        self.assertIn("# 📑 제목", merge_prompt)
+
+    def test_blocks_are_summarized_while_they_arrive(self):
+        llm = LLMModule("test-model", chunk_tokens=60, max_concurrency=2)
+        llm.model = _echo_model(self.prompts)
+        produced = []
+        notes = []
+
+        def blocks():
+            for i in range(4):
+                produced.append(i)
+                yield f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_0{i % 2}: " + "word " * 30
+
+        summary = llm.summarize_blocks(blocks(), "en", on_note=lambda part, note: notes.append((part, note)))
+
+        self.assertEqual(summary, "FINAL SUMMARY")
+        self.assertEqual([part for part, _ in notes], [1, 2, 3, 4])
+        self.assertEqual(notes[0][1], "notes for part 1 of ?")
+        self.assertEqual(notes[-1][1], "notes for part 4 of 4")
+        self.assertIn("### 📝 Notes", self.prompts[-1])
+
+    def test_short_blocks_use_single_call(self):
+        llm = LLMModule("test-model", chunk_tokens=1000)
+        llm.model = RunnableLambda(lambda prompt: self.prompts.append(prompt.to_string()) or AIMessage(content="ok"))
+
+        summary = llm.summarize_blocks(iter(["[00:00:00 -> 00:00:01] SPEAKER_00: Hello",
+                                             "[00:00:01 -> 00:00:02] SPEAKER_01: Hi"]), "en")
+
+        self.assertEqual(summary, "ok")
+        self.assertEqual(len(self.prompts), 1)
+        self.assertIn("SPEAKER_00: Hello\n\n[00:00:01 -> 00:00:02] SPEAKER_01: Hi", self.prompts[0])
+
+    def test_chunking_can_be_disabled(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+        llm.model = RunnableLambda(lambda prompt: self.prompts.append(prompt) or AIMessage(content="ok"))
+        llm.summarize_transcript("word " * 10000, "en")
+        self.assertEqual(len(self.prompts), 1)
+
+    def test_chunking_is_off_by_default(self):
+        llm = LLMModule("test-model")
+        llm.model = RunnableLambda(lambda prompt: self.prompts.append(prompt.to_string()) or AIMessage(content="ok"))
+
+        self.assertEqual(llm.chunk_tokens, 0)
+        self.assertEqual(llm.summarize_transcript("SPEAKER_00: " + "word " * 20000, "en"), "ok")
+        self.assertEqual(len(self.prompts), 1)
+
+    def test_llm_failure_is_wrapped(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+
+        def fail(_):
+            raise ConnectionError("backend down")
+
+        llm.model = RunnableLambda(fail)
+        with self.assertRaises(RuntimeError):
+            llm.summarize_transcript("text", "en")
+
+    def test_metrics_record_llm_usage_and_latency(self):
+        metrics = RunMetrics()
+        llm = LLMModule("test-model", chunk_tokens=0, metrics=metrics)
+        usage = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+        llm.model = GenericFakeChatModel(messages=iter([AIMessage(content="ok", usage_metadata=usage)] * 2))
+
+        llm.summarize_transcript("text", "en")
+        asyncio.run(llm.asummarize_transcript("text", "en"))
+
+        summary = metrics.llm_summary()
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual((summary["prompt_tokens"], summary["completion_tokens"]), (240, 60))
+        self.assertEqual(metrics.stage_summary()["summarize"]["count"], 2)
+
+    def test_summarize_languages_runs_concurrently_with_a_shared_prompt_prefix(self):
+        llm = LLMModule("test-model", chunk_tokens=0, max_concurrency=3)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def respond(prompt_value):
+            # Every language must be in flight at once to pass the barrier
+            barrier.wait()
+            prompt = prompt_value.to_string()
+            self.prompts.append(prompt)
+            return AIMessage(content=prompt.split("### 🌐 Summary Language\n")[1].split("\n")[0])
+
+        llm.model = RunnableLambda(respond)
+        transcript = "[00:00:00 -> 00:00:01] SPEAKER_00: Hello"
+
+        summaries = llm.summarize_languages(transcript, ["en", "ko", "ja", "ko"])
+
+        self.assertEqual(summaries, {"en": "en", "ko": "ko", "ja": "ja"})
+        prefix = os.path.commonprefix(self.prompts)
+        self.assertIn(transcript, prefix)
+
+    def test_summarize_languages_reports_failures_per_language(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+
+        def respond(prompt_value):
+            if "### 🌐 Summary Language\nja" in prompt_value.to_string():
+                raise ConnectionError("unavailable")
+            return AIMessage(content="ok")
+
+        llm.model = RunnableLambda(respond)
+        summaries = llm.summarize_languages("text", ["en", "ja"])
+
+        self.assertEqual(summaries["en"], "ok")
+        self.assertIsInstance(summaries["ja"], RuntimeError)
+
+    def test_sync_request_is_retried_after_rate_limiting(self):
+        class RateLimited(Exception):
+            status_code = 429
+
+        llm = LLMModule("test-model", chunk_tokens=0)
+        attempts = []
+
+        def flaky(_):
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise RateLimited("too many requests")
+            return AIMessage(content="ok")
+
+        llm.model = RunnableLambda(flaky)
+        self.assertEqual(llm.summarize_transcript("text", "en"), "ok")
+        self.assertEqual(len(attempts), 2)
+
+    def test_sync_request_times_out(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+        llm.timeout = 0.05
+        llm.max_retries = 0
+        released = threading.Event()
+        llm.model = RunnableLambda(lambda _: released.wait(5) and AIMessage(content="late"))
+        self.addCleanup(released.set)
+
+        with self.assertRaises(RuntimeError) as ctx:
+            llm.summarize_transcript("text", "en")
+        self.assertIsInstance(ctx.exception.__cause__, TimeoutError)
+
+    def test_summarize_languages_shares_the_concurrency_limit(self):
+        llm = LLMModule("test-model", chunk_tokens=60, max_concurrency=2)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def respond(prompt_value):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return _echo_model([]).invoke(prompt_value)
+
+        llm.model = RunnableLambda(respond)
+        blocks = [f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_0{i % 2}: " + "word " * 30 for i in range(4)]
+
+        summaries = llm.summarize_languages("\n\n".join(blocks), ["en", "ko"])
+
+        self.assertEqual(summaries, {"en": "FINAL SUMMARY", "ko": "FINAL SUMMARY"})
+        self.assertEqual(peak, 2)
+
+
+class AsyncLLMModuleTests(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"MODEL_TYPE": "ollama", "PROMPTS_DIR": "src/prompts",
+                                      "LLM_RETRY_BACKOFF": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_summarize_many_bounds_in_flight_requests(self):
+        llm = LLMModule("test-model", chunk_tokens=0, max_concurrency=2)
+        in_flight = 0
+        peak = 0
+
+        async def respond(prompt_value):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return AIMessage(content=prompt_value.to_string().split("SPEAKER_00: ")[1].split("\n")[0])
+
+        llm.model = RunnableLambda(lambda _: None, afunc=respond)
+        requests = [(f"[00:00:00 -> 00:00:01] SPEAKER_00: t{i}", "en") for i in range(6)]
+
+        summaries = asyncio.run(llm.summarize_many(requests))
+
+        self.assertEqual(summaries, [f"t{i}" for i in range(6)])
+        self.assertEqual(peak, 2)
+
+    def test_failed_request_is_retried(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+        llm.max_retries = 2
+        attempts = []
+
+        async def flaky(_):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("temporarily unavailable")
+            return AIMessage(content="ok")
+
+        llm.model = RunnableLambda(lambda _: None, afunc=flaky)
+        self.assertEqual(asyncio.run(llm.asummarize_transcript("text", "en")), "ok")
+        self.assertEqual(len(attempts), 3)
+
+    def test_only_transient_errors_are_retried(self):
+        class StatusError(Exception):
+            def __init__(self, status_code):
+                super().__init__(f"HTTP {status_code}")
+                self.status_code = status_code
+
+        for error, expected_attempts in ((StatusError(429), 3), (StatusError(503), 3), (TimeoutError(), 3),
+                                         (StatusError(401), 1), (StatusError(400), 1), (ValueError("bad"), 1)):
+            with self.subTest(error=repr(error)):
+                llm = LLMModule("test-model", chunk_tokens=0)
+                llm.max_retries = 2
+                llm.retry_backoff = 0
+                attempts = []
+
+                async def failing(_, error=error):
+                    attempts.append(1)
+                    raise error
+
+                llm.model = RunnableLambda(lambda _: None, afunc=failing)
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(llm.asummarize_transcript("text", "en"))
+                self.assertEqual(len(attempts), expected_attempts)
+
+    def test_failures_and_timeouts_are_reported_per_request(self):
+        llm = LLMModule("test-model", chunk_tokens=0)
+        llm.max_retries = 0
+        llm.timeout = 0.05
+
+        async def respond(prompt_value):
+            if "slow" in prompt_value.to_string():
+                await asyncio.sleep(1)
+            return AIMessage(content="ok")
+
+        llm.model = RunnableLambda(lambda _: None, afunc=respond)
+        results = asyncio.run(llm.summarize_many([("fast", "en"), ("slow", "en")]))
+
+        self.assertEqual(results[0], "ok")
+        self.assertIsInstance(results[1], RuntimeError)
+
+    def test_async_long_transcript_is_map_reduced(self):
+        prompts = []
+        llm = LLMModule("test-model", chunk_tokens=60)
+        llm.model = _echo_model(prompts)
+        blocks = [f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_00: " + "word " * 30 for i in range(3)]
+
+        self.assertEqual(asyncio.run(llm.asummarize_transcript("\n\n".join(blocks), "en")), "FINAL SUMMARY")
+        self.assertEqual(len(prompts), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,434 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import patch
+
+# main.py is an entry point that imports the packages as top-level modules (`voice`, `llm`, `pipeline`)
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import llm.llm_module as llm_module  # noqa: E402
+import main  # noqa: E402
+import server  # noqa: E402
+import voice  # noqa: E402
+from voice.formatting import format_transcript, iter_speaker_blocks  # noqa: E402
+from voice.stage_cache import SUMMARY_STAGE, JobCheckpoints, StageCache, file_digest  # noqa: E402
+
+SEGMENTS = [{"start": 0.0, "end": 1.5, "speaker": "SPEAKER_00", "text": " Hello there.",
+             "words": [{"word": "Hello", "start": 0.0, "end": 0.5, "speaker": "SPEAKER_00"}]},
+            {"start": 1.5, "end": 3.0, "speaker": "SPEAKER_01", "text": " Hi."}]
+
+
+def _fake_transcribe_files(failures=()):
+    def transcribe_files(audio_paths, *args, **kwargs):
+        return {path: RuntimeError("decoder failed") if Path(path).name in failures else list(SEGMENTS)
+                for path in audio_paths}
+    return transcribe_files
+
+
+_stub_response = llm_module._stub_response
+
+
+def _fake_iter_transcript_blocks(audio_path, *args, on_segment=None, **kwargs):
+    for segment in SEGMENTS:
+        on_segment(segment)
+    yield from iter_speaker_blocks(SEGMENTS)
+
+
+def _stub_failing_in(language: str, requested: list | None = None):
+    """Stub LLM backend whose requests for summaries in `language` fail; records the requested languages."""
+    def respond(prompt_value):
+        requested_language = prompt_value.to_string().split("### 🌐 Summary Language\n")[1].split("\n")[0]
+        if requested is not None:
+            requested.append(requested_language)
+        if requested_language == language:
+            raise ValueError("invalid request")
+        return _stub_response(prompt_value)
+    return respond
+
+
+class FakeFileStages:
+    """Stands in for `voice.FileStages` in pipelined runs; files named broken.wav fail to transcribe."""
+    released = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def decode(self, audio_path):
+        return {"audio_path": audio_path}
+
+    def transcribe(self, state):
+        if Path(state["audio_path"]).name == "broken.wav":
+            raise RuntimeError("decoder failed")
+        return state
+
+    def align(self, state):
+        return state
+
+    def diarize(self, state):
+        state["segments"] = list(SEGMENTS)
+        return state
+
+    diarize_params = {"model": "fake"}
+
+    def release(self, stage):
+        self.released.append(stage)
+
+
+class InlinePool:
+    """Stands in for `pipeline.DevicePool`, running every task in the calling thread."""
+    submitted = []
+
+    def __init__(self, devices, threads_per_worker=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args[0])
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class MainTestCase(unittest.TestCase):
+    """Runs main.py in a temporary results directory with the stub LLM backend."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp = Path(self._tmp.name)
+        self.results_dir = self.tmp / "results"
+        self.results_dir.mkdir()
+        env = patch.dict(os.environ, {"RESULTS_DIR": str(self.results_dir), "MODEL_TYPE": "stub",
+                                      "PROMPTS_DIR": str(SRC_DIR / "prompts"), "LLM_MODEL": "stub"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def audio(self, name: str, content: bytes = b"audio") -> str:
+        path = self.tmp / name
+        path.write_bytes(content)
+        return str(path)
+
+    def patch_voice(self, **functions):
+        patcher = patch.dict(voice.__dict__, functions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def results(self, pattern: str) -> list[Path]:
+        return sorted(self.results_dir.glob(pattern))
+
+    def checkpoints(self, *audio_paths: str, resume: bool = False) -> JobCheckpoints:
+        return main.prepare_checkpoints(list(audio_paths), resume, no_cache=False)
+
+    def patch_llm_backend(self, respond):
+        patcher = patch.object(llm_module, "_stub_response", respond)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CollectAudioPathsTests(MainTestCase):
+    def test_directory_keeps_audio_files_only(self):
+        recordings = self.tmp / "recordings"
+        recordings.mkdir()
+        for name in ("b.mp3", "a.WAV", "notes.txt"):
+            (recordings / name).write_bytes(b"")
+        (recordings / "nested.wav").mkdir()
+
+        self.assertEqual(main.collect_audio_paths(audio_dir=str(recordings)),
+                         [str(recordings / "a.WAV"), str(recordings / "b.mp3")])
+
+    def test_recursive_glob(self):
+        (self.tmp / "day1").mkdir()
+        self.audio("day1/a.mp3")
+        self.audio("b.mp3")
+        self.assertEqual(main.collect_audio_paths(audio_glob=str(self.tmp / "**" / "*.mp3")),
+                         [str(self.tmp / "b.mp3"), str(self.tmp / "day1" / "a.mp3")])
+
+    def test_manifest_resolves_relative_paths_and_skips_comments(self):
+        manifest = self.tmp / "list.txt"
+        manifest.write_text("# meetings\nb.mp3\n\n/abs/a.mp3\nb.mp3\n", encoding="utf-8")
+        self.assertEqual(main.collect_audio_paths(manifest=str(manifest)), [str(self.tmp / "b.mp3"), "/abs/a.mp3"])
+
+    def test_missing_directory_or_manifest(self):
+        with self.assertRaises(FileNotFoundError):
+            main.collect_audio_paths(audio_dir=str(self.tmp / "missing"))
+        with self.assertRaises(FileNotFoundError):
+            main.collect_audio_paths(manifest=str(self.tmp / "missing.txt"))
+
+
+class RunBatchTests(MainTestCase):
+    def test_success_and_per_file_failures_are_reported(self):
+        self.patch_voice(transcribe_files=_fake_transcribe_files(failures={"broken.wav"}))
+        good, broken = self.audio("good.wav"), self.audio("broken.wav")
+        missing = str(self.tmp / "missing.wav")
+
+        report = main.run_batch([good, broken, missing], "en", 1, 2, "token")
+
+        self.assertEqual((report["total"], report["succeeded"], report["failed"]), (3, 1, 2))
+        entries = {entry["audio_path"]: entry for entry in report["files"]}
+        self.assertEqual(entries[good]["status"], "success")
+        for key in ("transcript_file", "artifact_file", "summary_file"):
+            self.assertTrue(Path(entries[good][key]).is_file(), key)
+        self.assertIn("SPEAKER_00: Hello there.", Path(entries[good]["transcript_file"]).read_text(encoding="utf-8"))
+        self.assertEqual((entries[broken]["stage"], entries[broken]["error"]), ("transcribe", "decoder failed"))
+        self.assertEqual(entries[missing]["stage"], "validate")
+
+        [report_file] = self.results("batch_report_en_batch_*.json")
+        self.assertEqual(json.loads(report_file.read_text(encoding="utf-8"))["succeeded"], 1)
+        self.assertTrue(Path(report["metrics_file"]).is_file())
+
+
+class ServerTests(MainTestCase):
+    def test_jobs_save_the_same_outputs_as_the_cli(self):
+        self.patch_voice(transcribe_files=_fake_transcribe_files())
+        job_server = server.create_server("127.0.0.1", 0, 1, 4, "token", no_cache=True, no_summary_cache=True)
+        self.addCleanup(job_server.manager.stop)
+        self.addCleanup(job_server.server_close)
+
+        job = job_server.manager.submit(self.audio("meeting.wav"), "en", 1, 2)
+        job_server.manager.wait(job.id, timeout=10)
+
+        self.assertEqual(job.status, "succeeded", job.error)
+        for key, ext in (("transcript_file", "txt"), ("artifact_file", "vst"), ("summary_file", "md")):
+            self.assertTrue(job.outputs[key].endswith(f"_{job.outputs['time_stamp']}.{ext}"), key)
+            self.assertTrue(Path(job.outputs[key]).is_file(), key)
+        self.assertEqual(Path(job.outputs["transcript_file"]).read_text(encoding="utf-8"), job.transcript)
+        self.assertEqual(job_server.metrics.stages, [])
+
+
+class ParseSummaryLanguagesTests(unittest.TestCase):
+    def test_parses_languages_in_order_without_duplicates(self):
+        self.assertEqual(main.parse_summary_languages(" ko, en,ko,", "en"), ["ko", "en"])
+        self.assertEqual(main.parse_summary_languages(None, "ja"), ["ja"])
+        self.assertEqual(main.parse_summary_languages(" , ", "ja"), ["ja"])
+
+    def test_unsupported_language(self):
+        with self.assertRaises(ValueError):
+            main.parse_summary_languages("en,xx", "en")
+
+
+class SaveSummariesTests(MainTestCase):
+    def test_saves_every_summary_by_language(self):
+        files = main.save_summaries({"en": "# Summary", "ko": "# 요약"}, "meeting.wav", "20260101_000000")
+
+        self.assertEqual(list(files), ["en", "ko"])
+        self.assertEqual(Path(files["ko"]).read_text(encoding="utf-8"), "# 요약")
+        self.assertEqual(Path(files["en"]).name, "summary_en_meeting.wav_20260101_000000.md")
+
+    def test_failure_is_raised_after_the_successful_summaries_are_saved(self):
+        with self.assertRaisesRegex(RuntimeError, "backend down"):
+            main.save_summaries({"en": RuntimeError("backend down"), "ko": "# 요약"}, "meeting.wav", "20260101_000000")
+        self.assertEqual([path.name for path in self.results("summary_*.md")],
+                         ["summary_ko_meeting.wav_20260101_000000.md"])
+
+    def test_batch_reports_the_summary_file_of_each_language(self):
+        self.patch_voice(transcribe_files=_fake_transcribe_files())
+
+        report = main.run_batch([self.audio("good.wav")], "en", 1, 2, "token", summary_languages=["en", "ko"])
+
+        [entry] = report["files"]
+        self.assertEqual(entry["status"], "success")
+        self.assertEqual(set(entry["summary_files"]), {"en", "ko"})
+        self.assertEqual(entry["summary_file"], entry["summary_files"]["en"])
+        self.assertEqual(len(self.results("summary_*_good.wav_*.md")), 2)
+
+
+class AppendBlocksTests(MainTestCase):
+    def test_blocks_can_be_followed_at_the_partial_path_until_the_transcript_is_complete(self):
+        path = self.tmp / "transcript.txt"
+        partial = Path(f"{path}{main.PARTIAL_SUFFIX}")
+        blocks = main.append_blocks(iter(["first", "second"]), str(path))
+
+        self.assertEqual(next(blocks), "first")
+        self.assertEqual(partial.read_text(encoding="utf-8"), "first")
+        self.assertFalse(path.exists())
+
+        self.assertEqual(list(blocks), ["second"])
+        self.assertEqual(path.read_text(encoding="utf-8"), "first\n\nsecond")
+        self.assertFalse(partial.exists())
+
+
+class SummarizeWithCheckpointsTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.audio_path = self.audio("meeting.wav")
+        self.jobs = self.checkpoints(self.audio_path)
+        self.digest = self.jobs.jobs[self.audio_path]
+
+    def test_checkpointed_summaries_are_reused_and_new_ones_checkpointed(self):
+        llm = llm_module.LLMModule("stub")
+        self.jobs.put(self.digest, SUMMARY_STAGE, main.summary_checkpoint_params(llm, "transcript", "en"), "cached")
+
+        summaries = main.summarize_with_checkpoints(llm, "transcript", ["en", "ko"], self.jobs, self.audio_path)
+
+        self.assertEqual(summaries["en"], "cached")
+        self.assertTrue(summaries["ko"].startswith("# Stub summary"))
+        params = main.summary_checkpoint_params(llm, "transcript", "ko")
+        self.assertEqual(self.jobs.get(self.digest, SUMMARY_STAGE, params), summaries["ko"])
+
+    def test_failed_language_is_returned_and_not_checkpointed(self):
+        self.patch_llm_backend(_stub_failing_in("ko"))
+        llm = llm_module.LLMModule("stub")
+
+        summaries = main.summarize_with_checkpoints(llm, "transcript", ["en", "ko"], self.jobs, self.audio_path)
+
+        self.assertIsInstance(summaries["ko"], Exception)
+        self.assertEqual(self.jobs.manifest(self.digest)["completed_stages"], ["summary:en"])
+
+
+class RunIncrementalTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.audio_path = self.audio("meeting.wav")
+        self.patch_voice(iter_transcript_blocks=_fake_iter_transcript_blocks)
+
+    def test_results_are_saved_and_the_completed_job_is_removed(self):
+        jobs = self.checkpoints(self.audio_path)
+        digest = jobs.jobs[self.audio_path]
+
+        summary = main.run_incremental(self.audio_path, "en", 1, 2, "token", checkpoints=jobs)
+
+        [transcript_file] = self.results("transcript_en_meeting.wav_*.txt")
+        self.assertEqual(transcript_file.read_text(encoding="utf-8"), format_transcript(SEGMENTS))
+        self.assertEqual(len(self.results("transcript_en_meeting.wav_*.vst")), 1)
+        [summary_file] = self.results("summary_en_meeting.wav_*.md")
+        self.assertEqual(summary_file.read_text(encoding="utf-8"), summary)
+        self.assertFalse(jobs.job_dir(digest).exists())
+
+    def test_failed_summary_is_resumed_from_the_saved_transcript(self):
+        jobs = self.checkpoints(self.audio_path)
+        digest = jobs.jobs[self.audio_path]
+        def summarize_blocks(llm, blocks, language, on_note=None):
+            # The transcript is written completely before the merge request fails
+            list(blocks)
+            raise RuntimeError("backend down")
+
+        with patch.object(llm_module.LLMModule, "summarize_blocks", summarize_blocks):
+            with self.assertRaisesRegex(RuntimeError, "backend down"):
+                main.run_incremental(self.audio_path, "en", 1, 2, "token", checkpoints=jobs)
+        self.assertEqual(jobs.manifest(digest)["status"], "failed")
+        self.assertEqual(self.results("summary_*.md"), [])
+
+        def not_transcribed_again(*args, **kwargs):
+            raise AssertionError("the saved transcript must be reused")
+
+        self.patch_voice(iter_transcript_blocks=not_transcribed_again)
+        summary = main.run_incremental(self.audio_path, "en", 1, 2, "token",
+                                       checkpoints=self.checkpoints(self.audio_path, resume=True))
+
+        [transcript_file] = self.results("transcript_en_meeting.wav_*.txt")
+        self.assertEqual(len(self.results("transcript_en_meeting.wav_*.vst")), 1)
+        [summary_file] = self.results("summary_en_meeting.wav_*.md")
+        self.assertEqual(summary_file.name.removeprefix("summary"), transcript_file.name.removeprefix("transcript")
+                         .replace(".txt", ".md"))
+        self.assertEqual(summary_file.read_text(encoding="utf-8"), summary)
+        self.assertFalse(jobs.job_dir(digest).exists())
+
+
+class ResumeTests(MainTestCase):
+    def test_resumed_batch_reuses_transcripts_and_completed_summaries(self):
+        self.patch_voice(transcribe_files=_fake_transcribe_files())
+        audio_path = self.audio("good.wav")
+        requested = []
+        self.patch_llm_backend(_stub_failing_in("ko", requested))
+
+        report = main.run_batch([audio_path], "en", 1, 2, "token", summary_languages=["en", "ko"],
+                                checkpoints=self.checkpoints(audio_path))
+
+        self.assertEqual((report["files"][0]["status"], report["files"][0]["stage"]), ("failed", "summarize"))
+        self.assertEqual(sorted(requested), ["en", "ko"])
+
+        requested.clear()
+        self.patch_llm_backend(_stub_failing_in(None, requested))
+        jobs = self.checkpoints(audio_path, resume=True)
+        digest = jobs.jobs[audio_path]
+        report = main.run_batch([audio_path], "en", 1, 2, "token", summary_languages=["en", "ko"], checkpoints=jobs)
+
+        [entry] = report["files"]
+        self.assertEqual(entry["status"], "success")
+        self.assertEqual(requested, ["ko"])
+        self.assertEqual([str(path) for path in self.results("transcript_*.txt")], [entry["transcript_file"]])
+        self.assertEqual([str(path) for path in self.results("transcript_*.vst")], [entry["artifact_file"]])
+        self.assertEqual(len(self.results("summary_*.md")), 2)
+        self.assertFalse(jobs.job_dir(digest).exists())
+
+    def test_no_checkpoints_without_the_stage_cache(self):
+        self.assertIsNone(main.prepare_checkpoints([self.audio("good.wav")], resume=False, no_cache=True))
+
+
+class TranscribeShardedTests(MainTestCase):
+    def test_cached_recordings_are_not_sent_to_workers(self):
+        InlinePool.submitted = []
+        self.patch_voice(transcribe_files=_fake_transcribe_files())
+        cached, fresh = self.audio("cached.wav", b"cached"), self.audio("fresh.wav", b"fresh")
+        stage_cache = StageCache(str(self.tmp / "stages"))
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "auto", "BATCH_SIZE": "auto"}):
+            _, diarize_params = voice.stage_cache_params("en", 1, 2)
+        self.assertEqual((diarize_params["compute_type"], diarize_params["batch_size"]), ("auto", "auto"))
+        stage_cache.put(file_digest(cached), "diarize", diarize_params, [{"text": "cached"}])
+
+        # The parent keys the cache like its workers, without resolving "auto" for a device of its own
+        with patch.object(main, "DevicePool", InlinePool), \
+                patch.dict(os.environ, {"COMPUTE_TYPE": "auto", "BATCH_SIZE": "auto"}), \
+                patch("voice.voice_module.auto_compute_type", side_effect=AssertionError("device queried")):
+            outcomes = main.transcribe_sharded([cached, fresh], "en", 1, 2, "token", ["cpu"],
+                                               stage_cache=stage_cache)
+            self.assertEqual(InlinePool.submitted, [[fresh]])
+            self.assertEqual(outcomes, {cached: [{"text": "cached"}], fresh: SEGMENTS})
+
+            InlinePool.submitted = []
+            main.transcribe_sharded([cached], "en", 1, 2, "token", ["cpu"], stage_cache=stage_cache)
+            self.assertEqual(InlinePool.submitted, [])
+
+
+class ParseStageWorkersTests(unittest.TestCase):
+    def test_parses_worker_counts(self):
+        self.assertEqual(main.parse_stage_workers(" decode=2, summarize=4,"), {"decode": 2, "summarize": 4})
+        self.assertEqual(main.parse_stage_workers(None), {})
+
+    def test_invalid_specs(self):
+        for spec in ("gpu=2", "decode=two", "decode=0"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                main.parse_stage_workers(spec)
+
+
+class RunPipelinedTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        FakeFileStages.released = []
+        self.patch_voice(FileStages=FakeFileStages)
+
+    def test_report_matches_batch_mode_and_failures_are_reported_per_file(self):
+        good, broken = self.audio("good.wav"), self.audio("broken.wav")
+        missing = str(self.tmp / "missing.wav")
+
+        report = main.run_pipelined([good, broken, missing], "en", 1, 2, "token")
+
+        self.assertEqual((report["total"], report["succeeded"], report["failed"]), (3, 1, 2))
+        entries = {entry["audio_path"]: entry for entry in report["files"]}
+        self.assertEqual(entries[good]["status"], "success")
+        for key in ("time_stamp", "transcript_file", "artifact_file", "summary_file"):
+            self.assertIn(key, entries[good])
+        self.assertTrue(Path(entries[good]["artifact_file"]).is_file())
+        self.assertEqual((entries[broken]["stage"], entries[broken]["error"]), ("transcribe", "decoder failed"))
+        self.assertEqual(entries[missing]["stage"], "validate")
+        self.assertIn("summarize", report["stages"])
+
+    def test_models_are_released_after_every_stage_run(self):
+        main.run_pipelined([self.audio("good.wav"), self.audio("broken.wav")], "en", 1, 2, "token")
+        self.assertEqual(sorted(FakeFileStages.released),
+                         sorted(["transcribe", "transcribe", "align", "diarize"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
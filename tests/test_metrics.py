@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.pipeline import metrics as metrics_module
+from src.pipeline.metrics import RunMetrics
+
+
+class RunMetricsTests(unittest.TestCase):
+    def test_stage_records_wall_time_and_real_time_factor(self):
+        metrics = RunMetrics()
+        with metrics.stage("transcribe", audio_path="a.wav") as record:
+            record["audio_seconds"] = 120.0
+
+        record = metrics.stages[0]
+        self.assertEqual(record["stage"], "transcribe")
+        self.assertEqual(record["audio_path"], "a.wav")
+        self.assertGreaterEqual(record["wall_seconds"], 0.0)
+        self.assertAlmostEqual(record["real_time_factor"], record["wall_seconds"] / 120.0)
+        self.assertGreater(record["rss_bytes"], 0)
+        self.assertIn("rss_delta_bytes", record)
+        self.assertNotIn("peak_rss_bytes", record)
+        self.assertGreater(metrics.report()["peak_rss_bytes"], 0)
+
+    def test_cuda_peaks_cover_every_device_in_use(self):
+        cuda = MagicMock()
+        cuda.device_count.return_value = 3
+        cuda.memory_reserved.side_effect = lambda device: 1 if device in (0, 2) else 0
+        cuda.max_memory_allocated.side_effect = lambda device: {0: 100, 2: 50}[device]
+        metrics = RunMetrics()
+        with patch.object(metrics_module, "_cuda", return_value=cuda):
+            with metrics.stage("diarize"):
+                pass
+            text = metrics.to_prometheus()
+
+        self.assertEqual([c.args for c in cuda.reset_peak_memory_stats.call_args_list], [(0,), (2,)])
+        self.assertEqual(metrics.stages[0]["peak_cuda_bytes"], 150)
+        self.assertIn('voicesummary_cuda_max_allocated_bytes{device="2"} 50', text)
+
+    def test_failed_stage_is_recorded_and_reraised(self):
+        metrics = RunMetrics()
+        with self.assertRaises(ValueError):
+            with metrics.stage("decode"):
+                raise ValueError("broken file")
+
+        self.assertTrue(metrics.stages[0]["failed"])
+        self.assertEqual(metrics.stage_summary()["decode"]["failed"], 1)
+
+    def test_summary_aggregates_stages_and_llm_calls(self):
+        metrics = RunMetrics()
+        for audio_seconds in (60.0, 30.0):
+            with metrics.stage("align", audio_seconds=audio_seconds):
+                pass
+        metrics.record_llm_call("m", 100, 20, 0.5)
+        metrics.record_llm_call("m", None, None, 1.5)
+
+        align = metrics.stage_summary()["align"]
+        self.assertEqual(align["count"], 2)
+        self.assertEqual(align["audio_seconds"], 90.0)
+        llm = metrics.llm_summary()
+        self.assertEqual((llm["requests"], llm["prompt_tokens"], llm["completion_tokens"]), (2, 100, 20))
+        self.assertEqual(llm["max_latency_seconds"], 1.5)
+        report = json.loads(metrics.to_json())
+        self.assertEqual(len(report["stages"]), 2)
+
+    def test_totals_without_records_stay_bounded(self):
+        metrics = RunMetrics(keep_records=False)
+        for _ in range(3):
+            with metrics.stage("transcribe", audio_seconds=10.0):
+                pass
+            metrics.record_llm_call("m", 5, 1, 0.1)
+
+        self.assertEqual(metrics.stage_summary()["transcribe"]["count"], 3)
+        self.assertEqual(metrics.llm_summary()["prompt_tokens"], 15)
+        self.assertEqual((metrics.stages, metrics.llm_calls), ([], []))
+        self.assertIn('voicesummary_stage_runs_total{stage="transcribe"} 3', metrics.to_prometheus())
+
+    def test_prometheus_text_format(self):
+        metrics = RunMetrics()
+        with metrics.stage("diarize", audio_seconds=10.0):
+            pass
+        metrics.record_llm_call("m", 7, 3, 0.2)
+        metrics.increment("stage_cache_hit:transcribe")
+
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE voicesummary_stage_seconds_total counter", text)
+        self.assertIn('voicesummary_stage_runs_total{stage="diarize"} 1', text)
+        self.assertIn('voicesummary_stage_audio_seconds_total{stage="diarize"} 10.0', text)
+        self.assertIn("voicesummary_llm_prompt_tokens_total 7", text)
+        self.assertIn('voicesummary_events_total{event="stage_cache_hit:transcribe"} 1', text)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "voicesummary.prom")
+            metrics.write_prometheus(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), metrics.to_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
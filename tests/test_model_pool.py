@@ -0,0 +1,83 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from src.voice.model_pool import LOW_MEMORY_POLICY, ModelPool, model_key
+
+
+class ModelPoolTests(unittest.TestCase):
+    def test_loader_called_once_per_key(self):
+        pool = ModelPool()
+        loader = MagicMock(return_value="model")
+        key = model_key("whisper", "tiny", "cpu", "int8", "en")
+
+        self.assertEqual(pool.get(key, loader), "model")
+        self.assertEqual(pool.get(key, loader), "model")
+
+        loader.assert_called_once()
+        self.assertEqual((pool.hits, pool.misses), (1, 1))
+
+    def test_slow_load_does_not_block_other_keys(self):
+        pool = ModelPool()
+        pool.get("warm", lambda: "warm")
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            loading.set()
+            release.wait(5)
+            return "cold"
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            cold = executor.submit(pool.get, "cold", slow_loader)
+            self.assertTrue(loading.wait(5))
+            waiting = executor.submit(pool.get, "cold", MagicMock(side_effect=AssertionError("loaded twice")))
+            self.assertEqual(executor.submit(pool.get, "warm", lambda: "reloaded").result(timeout=1), "warm")
+            self.assertEqual(executor.submit(pool.get, "other", lambda: "other").result(timeout=1), "other")
+            self.assertFalse(cold.done())
+            release.set()
+            self.assertEqual((cold.result(timeout=5), waiting.result(timeout=5)), ("cold", "cold"))
+        self.assertEqual(pool.misses, 3)
+
+    def test_keys_differ_by_language_and_compute_type(self):
+        pool = ModelPool()
+        pool.get(model_key("whisper", "tiny", "cpu", "int8", "en"), lambda: "en")
+        pool.get(model_key("whisper", "tiny", "cpu", "int8", "ko"), lambda: "ko")
+        pool.get(model_key("whisper", "tiny", "cpu", "float32", "en"), lambda: "en32")
+        self.assertEqual(len(pool), 3)
+
+    def test_least_recently_used_model_is_evicted_over_budget(self):
+        pool = ModelPool(max_memory_mb=2)
+        mb = 1024 * 1024
+        pool.get("a", lambda: "a", size_hint_bytes=mb)
+        pool.get("b", lambda: "b", size_hint_bytes=mb)
+        pool.get("a", lambda: "a", size_hint_bytes=mb)  # "a" is now most recently used
+        pool.get("c", lambda: "c", size_hint_bytes=mb)
+
+        self.assertIn("a", pool)
+        self.assertNotIn("b", pool)
+        self.assertIn("c", pool)
+
+    def test_oversized_model_is_kept(self):
+        pool = ModelPool(max_memory_mb=1)
+        pool.get("big", lambda: "big", size_hint_bytes=4 * 1024 * 1024)
+        self.assertIn("big", pool)
+
+    def test_release_after_stage_depends_on_policy(self):
+        keep_pool = ModelPool()
+        keep_pool.get("a", lambda: "a")
+        keep_pool.release_after_stage("a")
+        self.assertIn("a", keep_pool)
+
+        low_memory_pool = ModelPool(policy=LOW_MEMORY_POLICY)
+        low_memory_pool.get("a", lambda: "a")
+        low_memory_pool.release_after_stage("a")
+        self.assertNotIn("a", low_memory_pool)
+
+    def test_invalid_policy_raises(self):
+        with self.assertRaises(ValueError):
+            ModelPool(policy="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
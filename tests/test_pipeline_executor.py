@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+from src.pipeline.executor import PipelineExecutor, Stage
+
+
+class PipelineExecutorTests(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        executor = PipelineExecutor([
+            Stage("double", lambda x: x * 2, workers=3),
+            Stage("increment", lambda x: x + 1, workers=2),
+        ])
+        results = executor.run(list(range(20)))
+
+        self.assertEqual([r.item for r in results], list(range(20)))
+        self.assertEqual([r.value for r in results], [x * 2 + 1 for x in range(20)])
+        self.assertEqual(executor.stats_report()["double"]["processed"], 20)
+
+    def test_failed_item_skips_remaining_stages(self):
+        seen = []
+
+        def check(x):
+            if x == 2:
+                raise ValueError("bad item")
+            return x
+
+        executor = PipelineExecutor([Stage("check", check), Stage("record", seen.append)])
+        results = executor.run([1, 2, 3])
+
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[1].failed_stage, "check")
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual(sorted(seen), [1, 3])
+        self.assertEqual(executor.stats_report()["check"]["failed"], 1)
+
+    def test_stages_overlap_across_items(self):
+        events = []
+        lock = threading.Lock()
+
+        def slow(name):
+            def fn(x):
+                with lock:
+                    events.append((name, "start", x))
+                time.sleep(0.05)
+                with lock:
+                    events.append((name, "end", x))
+                return x
+            return fn
+
+        PipelineExecutor([Stage("audio", slow("audio")), Stage("llm", slow("llm"))]).run([0, 1])
+
+        # Item 1 is in the audio stage while item 0 is in the llm stage
+        self.assertLess(events.index(("audio", "start", 1)), events.index(("llm", "end", 0)))
+        self.assertLess(events.index(("llm", "start", 0)), events.index(("audio", "end", 1)))
+
+    def test_bounded_queues_apply_backpressure(self):
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def produce(x):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            return x
+
+        def consume(x):
+            nonlocal in_flight
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return x
+
+        executor = PipelineExecutor([Stage("produce", produce), Stage("consume", consume)], queue_size=2)
+        executor.run(list(range(20)))
+
+        # At most: queue capacity + the item being consumed + the item blocked in the producer
+        self.assertLessEqual(peak, 4)
+        self.assertGreater(executor.stats_report()["produce"]["blocked_seconds"], 0)
+
+    def test_invalid_configuration_raises(self):
+        with self.assertRaises(ValueError):
+            PipelineExecutor([])
+        with self.assertRaises(ValueError):
+            PipelineExecutor([Stage("a", lambda x: x, workers=0)])
+        with self.assertRaises(ValueError):
+            PipelineExecutor([Stage("a", lambda x: x)], queue_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
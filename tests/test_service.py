@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+from src.llm.llm_module import LLMModule
+from src.service.http_server import JobServer
+from src.service.jobs import FAILED, SUCCEEDED, JobManager, JobQueueFullError
+
+
+class JobManagerTests(unittest.TestCase):
+    def test_jobs_run_and_failures_are_recorded(self):
+        def transcribe(job):
+            if job.audio_path == "bad.wav":
+                raise RuntimeError("decoder failed")
+            return f"transcript of {job.audio_path}"
+
+        manager = JobManager(transcribe, lambda transcript, language: f"{language}: {transcript}", workers=2)
+        manager.start()
+        self.addCleanup(manager.stop)
+        good = manager.submit("good.wav", "en", 1, 2)
+        bad = manager.submit("bad.wav", "en", 1, 2)
+
+        self.assertEqual(manager.wait(good.id, timeout=5).status, SUCCEEDED)
+        self.assertEqual(good.summary, "en: transcript of good.wav")
+        self.assertEqual(manager.wait(bad.id, timeout=5).status, FAILED)
+        self.assertEqual(bad.stage, "transcribe")
+        self.assertIn("decoder failed", bad.error)
+
+    def test_full_queue_rejects_submissions(self):
+        started, release = threading.Event(), threading.Event()
+        manager = JobManager(lambda job: started.set() or release.wait(5) and "t", lambda transcript, language: "s",
+                             workers=1, queue_size=1)
+        manager.start()
+        self.addCleanup(manager.stop)
+        self.addCleanup(release.set)
+        manager.submit("a.wav", "en", 1, 2)
+        started.wait(5)
+        manager.submit("b.wav", "en", 1, 2)
+
+        with self.assertRaises(JobQueueFullError):
+            manager.submit("c.wav", "en", 1, 2)
+
+
+class JobServerTests(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"MODEL_TYPE": "stub", "PROMPTS_DIR": "src/prompts"})
+        env.start()
+        self.addCleanup(env.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        llm = LLMModule("stub-model", chunk_tokens=0)
+        self.received = {}
+
+        def transcribe(job):
+            self.received[job.audio_path] = Path(job.audio_path).read_bytes()
+            return f"[00:00:00 -> 00:00:01] SPEAKER_00: {Path(job.audio_path).name}"
+
+        self.manager = JobManager(transcribe, llm.summarize_transcript)
+        self.manager.start()
+        self.addCleanup(self.manager.stop)
+
+        def validate(language, min_speakers, max_speakers):
+            if language not in {"en", "ko"}:
+                raise ValueError(f"Unsupported language: {language}")
+
+        self.upload_dir = self.tmp / "uploads"
+        self.base_url = self.start_server(audio_root=str(self.tmp), validate_options=validate)
+
+    def start_server(self, **kwargs) -> str:
+        server = JobServer(("127.0.0.1", 0), self.manager, str(self.upload_dir), **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def request(self, method, path, body=None, content_type="application/json", base_url=None):
+        data = json.dumps(body).encode() if isinstance(body, dict) else body
+        req = urllib.request.Request((base_url or self.base_url) + path, data=data, method=method,
+                                     headers={"Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(req, timeout=5) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+    def test_submit_poll_and_fetch_results(self):
+        audio_path = self.tmp / "meeting.wav"
+        audio_path.write_bytes(b"audio")
+
+        status, body = self.request("POST", "/jobs", {"audio_path": str(audio_path), "language": "ko"})
+        self.assertEqual(status, 202)
+        job_id = json.loads(body)["id"]
+        self.manager.wait(job_id, timeout=5)
+
+        status, body = self.request("GET", f"/jobs/{job_id}")
+        self.assertEqual((status, json.loads(body)["status"]), (200, SUCCEEDED))
+        self.assertEqual(self.request("GET", f"/jobs/{job_id}/transcript"),
+                         (200, "[00:00:00 -> 00:00:01] SPEAKER_00: meeting.wav"))
+        status, summary = self.request("GET", f"/jobs/{job_id}/summary")
+        self.assertEqual(status, 200)
+        self.assertTrue(summary.startswith("# Stub summary"))
+
+    def test_uploaded_audio_is_stored_and_processed(self):
+        status, body = self.request("POST", "/jobs?filename=call.mp3&language=en&max_speakers=3", b"bytes",
+                                    content_type="application/octet-stream")
+        self.assertEqual(status, 202)
+        job = self.manager.wait(json.loads(body)["id"], timeout=5)
+        self.assertEqual(job.status, SUCCEEDED)
+        self.assertEqual(job.max_speakers, 3)
+        self.assertTrue(job.audio_path.endswith("_call.mp3"))
+        self.assertEqual(self.received[job.audio_path], b"bytes")
+        # The upload is deleted once the job has finished
+        self.assertEqual(list(self.upload_dir.iterdir()), [])
+
+    def test_rejected_upload_leaves_no_file(self):
+        for query in ("language=xx", "min_speakers=two"):
+            with self.subTest(query=query):
+                status, _ = self.request("POST", f"/jobs?filename=call.mp3&{query}", b"bytes",
+                                         content_type="application/octet-stream")
+                self.assertEqual(status, 400)
+        self.assertEqual(list(self.upload_dir.iterdir()), [])
+
+    def test_server_side_paths_are_confined_to_the_audio_root(self):
+        (self.tmp / "meeting.wav").write_bytes(b"audio")
+        self.assertEqual(self.request("POST", "/jobs", {"audio_path": "meeting.wav"})[0], 202)
+        for audio_path in ("/etc/passwd", "../outside.wav", str(self.tmp / ".." / "outside.wav")):
+            with self.subTest(audio_path=audio_path):
+                self.assertEqual(self.request("POST", "/jobs", {"audio_path": audio_path})[0], 403)
+
+        uploads_only = self.start_server()
+        status, body = self.request("POST", "/jobs", {"audio_path": "meeting.wav"}, base_url=uploads_only)
+        self.assertEqual(status, 403)
+        self.assertIn("Upload the audio", json.loads(body)["error"])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.request("GET", "/jobs/" + "0" * 32)[0], 404)
+        self.assertEqual(self.request("POST", "/jobs", {"audio_path": str(self.tmp / "missing.wav")})[0], 400)
+        (self.tmp / "a.wav").write_bytes(b"audio")
+        self.assertEqual(self.request("POST", "/jobs", {"audio_path": str(self.tmp / "a.wav"), "language": "xx"})[0],
+                         400)
+        self.assertEqual(self.request("GET", "/health")[0], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import unittest
+
+from src.pipeline.sharding import DevicePool, _init_worker, parse_devices
+
+
+def _worker_environment(tag, device=None):
+    return tag, device, os.environ["CPU_THREADS"], os.environ["OMP_NUM_THREADS"]
+
+
+class ParseDevicesTests(unittest.TestCase):
+    def test_explicit_list(self):
+        self.assertEqual(parse_devices("cuda:0, cuda:1"), ["cuda:0", "cuda:1"])
+
+    def test_counts(self):
+        self.assertEqual(parse_devices("cuda*2"), ["cuda:0", "cuda:1"])
+        self.assertEqual(parse_devices("cuda:1*2"), ["cuda:1", "cuda:1"])
+        self.assertEqual(parse_devices("cpu*3"), ["cpu", "cpu", "cpu"])
+
+    def test_invalid_entries(self):
+        for spec in ("gpu:0", "cuda:x", "cpu*0", "cpu*two", ","):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_devices(spec)
+
+
+class DevicePoolTests(unittest.TestCase):
+    def test_tasks_run_on_worker_devices_with_thread_caps(self):
+        with DevicePool(["cpu", "cpu"], threads_per_worker=1) as pool:
+            results = [pool.submit(_worker_environment, tag).result(timeout=60) for tag in range(4)]
+
+        self.assertEqual([r[0] for r in results], list(range(4)))
+        self.assertEqual({r[1:] for r in results}, {("cpu", "1", "1")})
+
+    def test_exiting_worker_returns_its_device(self):
+        context = multiprocessing.get_context("spawn")
+        devices = context.Queue()
+        devices.put("cuda:1")
+        worker = context.Process(target=_init_worker, args=(devices, 1))
+        worker.start()
+        worker.join(60)
+
+        self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(devices.get(timeout=10), "cuda:1")
+
+    def test_rejects_invalid_thread_count(self):
+        with self.assertRaises(ValueError):
+            DevicePool(["cpu"], threads_per_worker=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
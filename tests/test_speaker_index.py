@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src.voice.speaker_index import SpeakerIndex, speaker_index_from_env
+
+
+class SpeakerIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "speakers.npz")
+
+    def test_new_speakers_get_new_labels(self):
+        index = SpeakerIndex(self.path)
+
+        mapping = index.assign({"SPEAKER_01": [0.0, 1.0], "SPEAKER_00": [1.0, 0.0]})
+
+        self.assertEqual(mapping, {"SPEAKER_00": "SPEAKER_00", "SPEAKER_01": "SPEAKER_01"})
+        self.assertEqual(len(index), 2)
+
+    def test_known_speakers_are_matched_across_recordings(self):
+        SpeakerIndex(self.path).assign({"SPEAKER_00": [1.0, 0.0, 0.0], "SPEAKER_01": [0.0, 1.0, 0.0]})
+
+        # A fresh instance reads the saved index
+        mapping = SpeakerIndex(self.path).assign({
+            "SPEAKER_00": [0.1, 0.9, 0.0], "SPEAKER_01": [0.9, 0.1, 0.0], "SPEAKER_02": [0.0, 0.0, 1.0]})
+
+        self.assertEqual(mapping, {"SPEAKER_00": "SPEAKER_01", "SPEAKER_01": "SPEAKER_00",
+                                   "SPEAKER_02": "SPEAKER_02"})
+
+    def test_matching_is_one_to_one(self):
+        index = SpeakerIndex(self.path)
+        index.assign({"SPEAKER_00": [1.0, 0.0]})
+
+        mapping = index.assign({"SPEAKER_00": [0.9, 0.1], "SPEAKER_01": [1.0, 0.0]})
+
+        self.assertEqual(mapping, {"SPEAKER_00": "SPEAKER_01", "SPEAKER_01": "SPEAKER_00"})
+
+    def test_dissimilar_speakers_below_threshold_are_new(self):
+        index = SpeakerIndex(self.path, threshold=0.9)
+        index.assign({"SPEAKER_00": [1.0, 0.0]})
+
+        self.assertEqual(index.assign({"SPEAKER_00": [0.7, 0.7]}), {"SPEAKER_00": "SPEAKER_01"})
+
+    def test_matched_speakers_move_toward_the_new_embedding(self):
+        index = SpeakerIndex(self.path)
+        index.assign({"SPEAKER_00": [1.0, 0.0]})
+        index.assign({"SPEAKER_00": [0.8, 0.6]})
+
+        self.assertEqual(index.counts.tolist(), [2])
+        self.assertAlmostEqual(float(np.linalg.norm(index.embeddings[0])), 1.0, places=5)
+        self.assertGreater(index.embeddings[0][1], 0.0)
+
+    def test_sees_updates_from_other_instances(self):
+        first, second = SpeakerIndex(self.path), SpeakerIndex(self.path)
+        first.assign({"SPEAKER_00": [1.0, 0.0]})
+
+        self.assertEqual(second.assign({"SPEAKER_00": [0.0, 1.0]}), {"SPEAKER_00": "SPEAKER_01"})
+        self.assertEqual(SpeakerIndex(self.path).labels, ["SPEAKER_00", "SPEAKER_01"])
+
+    def test_search_tells_recordings_apart(self):
+        index = SpeakerIndex(self.path)
+        index.assign({"SPEAKER_00": [1.0, 0.0], "SPEAKER_01": [0.0, 1.0]}, recording="a.wav")
+        index.assign({"SPEAKER_00": [0.0, 1.0]}, recording="b.wav")
+
+        self.assertEqual(index.search([0.0, 1.0])[0][::2], ("SPEAKER_01", [("a.wav", "SPEAKER_01"),
+                                                                           ("b.wav", "SPEAKER_00")]))
+        # The sources are saved with the index
+        self.assertEqual(SpeakerIndex(self.path).sources, index.sources)
+
+    def test_search_sees_speakers_added_by_other_instances(self):
+        reader = SpeakerIndex(self.path)
+        self.assertEqual(reader.search([1.0, 0.0]), [])
+
+        SpeakerIndex(self.path).assign({"SPEAKER_00": [1.0, 0.0]}, recording="a.wav")
+
+        self.assertEqual(reader.search([1.0, 0.0]), [("SPEAKER_00", 1.0, [("a.wav", "SPEAKER_00")])])
+
+    def test_search_scales_to_many_speakers(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(20000, 64)).astype(np.float32)
+        index = SpeakerIndex(self.path)
+        index.assign({f"SPEAKER_{i:05d}": vector for i, vector in enumerate(vectors)})
+
+        results = index.search(vectors[1234] + 0.01, k=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0], "SPEAKER_1234")
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_rejects_embeddings_of_another_size(self):
+        index = SpeakerIndex(self.path)
+        index.assign({"SPEAKER_00": [1.0, 0.0]})
+        with self.assertRaises(ValueError):
+            index.assign({"SPEAKER_00": [1.0, 0.0, 0.0]})
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {"SPEAKER_INDEX_PATH": ""}):
+            self.assertIsNone(speaker_index_from_env())
+        with patch.dict(os.environ, {"SPEAKER_INDEX_PATH": self.path, "SPEAKER_MATCH_THRESHOLD": "0.7"}):
+            self.assertEqual(speaker_index_from_env().threshold, 0.7)
+        with patch.dict(os.environ, {"SPEAKER_INDEX_PATH": self.path, "SPEAKER_MATCH_THRESHOLD": "2"}), \
+                self.assertRaises(ValueError):
+            speaker_index_from_env()
+
+
+if __name__ == "__main__":
+    unittest.main()
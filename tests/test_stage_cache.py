@@ -0,0 +1,199 @@
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from src.voice.stage_cache import (
+    DIARIZE_STAGE, SUMMARY_STAGE, TRANSCRIBE_STAGE, JobCheckpoints, JobInProgressError, LayeredStageCache, StageCache,
+    file_digest,
+)
+
+
+class StageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp.name) / "cache"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_parameter_keying(self):
+        cache = StageCache(str(self.cache_dir))
+        params = {"model": "tiny", "language": "en"}
+        cache.put("abc", TRANSCRIBE_STAGE, params, {"segments": [{"text": "Hello"}]})
+
+        self.assertEqual(cache.get("abc", TRANSCRIBE_STAGE, params), {"segments": [{"text": "Hello"}]})
+        self.assertIsNone(cache.get("abc", TRANSCRIBE_STAGE, {"model": "tiny", "language": "ko"}))
+        self.assertIsNone(cache.get("abc", DIARIZE_STAGE, params))
+        self.assertIsNone(cache.get("def", TRANSCRIBE_STAGE, params))
+
+    def test_invalidate_single_audio(self):
+        cache = StageCache(str(self.cache_dir))
+        cache.put("abc", TRANSCRIBE_STAGE, {}, [1])
+        cache.put("def", TRANSCRIBE_STAGE, {}, [2])
+        cache.invalidate("abc")
+        self.assertIsNone(cache.get("abc", TRANSCRIBE_STAGE, {}))
+        self.assertEqual(cache.get("def", TRANSCRIBE_STAGE, {}), [2])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = StageCache(str(self.cache_dir), max_size_mb=0.001)  # ~1 KB
+        payload = "x" * 400
+        cache.put("a", TRANSCRIBE_STAGE, {}, payload)
+        cache.put("b", TRANSCRIBE_STAGE, {}, payload)
+        # Make "a" the most recently used entry
+        past = time.time() - 60
+        os.utime(self.cache_dir / "b" / next(os.scandir(self.cache_dir / "b")).name, (past, past))
+        cache.get("a", TRANSCRIBE_STAGE, {})
+        cache.put("c", TRANSCRIBE_STAGE, {}, payload)
+
+        self.assertIsNone(cache.get("b", TRANSCRIBE_STAGE, {}))
+        self.assertEqual(cache.get("a", TRANSCRIBE_STAGE, {}), payload)
+        self.assertEqual(cache.get("c", TRANSCRIBE_STAGE, {}), payload)
+        self.assertLessEqual(cache.size_bytes(), 1048)
+
+    def test_file_digest_depends_on_content(self):
+        first = Path(self._tmp.name) / "first.wav"
+        second = Path(self._tmp.name) / "second.wav"
+        first.write_bytes(b"audio")
+        second.write_bytes(b"audio")
+        self.assertEqual(file_digest(str(first)), file_digest(str(second)))
+        second.write_bytes(b"other audio")
+        self.assertNotEqual(file_digest(str(first)), file_digest(str(second)))
+
+    def test_file_digest_is_computed_once_per_unchanged_file(self):
+        path = Path(self._tmp.name) / "meeting.wav"
+        path.write_bytes(b"audio")
+        with patch("builtins.open", wraps=open) as opened:
+            digest = file_digest(str(path))
+            self.assertEqual(file_digest(str(path)), digest)
+        self.assertEqual(opened.call_count, 1)
+
+
+class JobCheckpointsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.jobs_dir = Path(self._tmp.name) / "jobs"
+        self.audio_path = str(Path(self._tmp.name) / "meeting.wav")
+        Path(self.audio_path).write_bytes(b"audio")
+        self.digest = file_digest(self.audio_path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_completed_stages_are_recorded_in_the_manifest(self):
+        checkpoints = JobCheckpoints(str(self.jobs_dir))
+        self.assertEqual(checkpoints.start(self.audio_path), [])
+        checkpoints.put(self.digest, TRANSCRIBE_STAGE, {"model": "tiny"}, {"segments": []})
+        checkpoints.put(self.digest, SUMMARY_STAGE, {"language": "en", "key": "k"}, "Summary")
+
+        manifest = checkpoints.manifest(self.digest)
+        self.assertEqual(manifest["status"], "running")
+        self.assertEqual(manifest["completed_stages"], [TRANSCRIBE_STAGE, "summary:en"])
+        self.assertEqual(manifest["last_stage"], "summary:en")
+
+        checkpoints.finish(self.audio_path)
+        self.assertFalse(checkpoints.job_dir(self.digest).exists())
+        self.assertEqual(checkpoints.manifest(self.digest), {})
+
+    def test_concurrent_puts_record_every_stage(self):
+        checkpoints = JobCheckpoints(str(self.jobs_dir))
+        checkpoints.start(self.audio_path)
+        languages = [f"l{i}" for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda language: checkpoints.put(
+                self.digest, SUMMARY_STAGE, {"language": language}, language), languages))
+        self.assertEqual(sorted(checkpoints.manifest(self.digest)["completed_stages"]),
+                         sorted(f"summary:{language}" for language in languages))
+        # Worker processes of sharded runs receive a pickled copy
+        self.assertEqual(pickle.loads(pickle.dumps(checkpoints)).manifest(self.digest)["status"], "running")
+
+    def test_recorded_outputs_are_reused_by_a_resumed_run_with_the_same_params(self):
+        transcript_file = Path(self._tmp.name) / "transcript.txt"
+        transcript_file.write_text("text", encoding="utf-8")
+        checkpoints = JobCheckpoints(str(self.jobs_dir))
+        checkpoints.start(self.audio_path)
+        checkpoints.record_outputs(self.audio_path, {"language": "en"}, time_stamp="t",
+                                   transcript_file=str(transcript_file))
+        checkpoints.fail(self.audio_path, "summary failed")
+
+        resumed = JobCheckpoints(str(self.jobs_dir))
+        resumed.start(self.audio_path, resume=True)
+        self.assertEqual(resumed.saved_outputs(self.audio_path, {"language": "en"}),
+                         {"time_stamp": "t", "transcript_file": str(transcript_file)})
+        self.assertIsNone(resumed.saved_outputs(self.audio_path, {"language": "ko"}))
+        transcript_file.unlink()
+        self.assertIsNone(resumed.saved_outputs(self.audio_path, {"language": "en"}))
+
+        transcript_file.write_text("text", encoding="utf-8")
+        resumed.fail(self.audio_path, "stopped")
+        restarted = JobCheckpoints(str(self.jobs_dir))
+        restarted.start(self.audio_path)
+        self.assertIsNone(restarted.saved_outputs(self.audio_path, {"language": "en"}))
+
+    def test_resume_keeps_the_checkpoints_of_a_failed_job(self):
+        checkpoints = JobCheckpoints(str(self.jobs_dir))
+        checkpoints.start(self.audio_path)
+        checkpoints.put(self.digest, TRANSCRIBE_STAGE, {}, [1])
+        checkpoints.fail(self.audio_path, RuntimeError("process died"))
+        self.assertEqual(checkpoints.manifest(self.digest)["error"], "process died")
+
+        resumed = JobCheckpoints(str(self.jobs_dir))
+        self.assertEqual(resumed.start(self.audio_path, resume=True), [TRANSCRIBE_STAGE])
+        self.assertEqual(resumed.get(self.digest, TRANSCRIBE_STAGE, {}), [1])
+        self.assertIsNone(resumed.manifest(self.digest)["error"])
+        resumed.fail(self.audio_path, "stopped")
+
+        restarted = JobCheckpoints(str(self.jobs_dir))
+        self.assertEqual(restarted.start(self.audio_path), [])
+        self.assertIsNone(restarted.get(self.digest, TRANSCRIBE_STAGE, {}))
+
+    def test_job_held_by_another_run_is_not_wiped(self):
+        running = JobCheckpoints(str(self.jobs_dir))
+        running.start(self.audio_path)
+        running.put(self.digest, TRANSCRIBE_STAGE, {}, [1])
+
+        for resume in (False, True):
+            with self.subTest(resume=resume), self.assertRaises(JobInProgressError):
+                JobCheckpoints(str(self.jobs_dir)).start(self.audio_path, resume=resume)
+        self.assertEqual(running.get(self.digest, TRANSCRIBE_STAGE, {}), [1])
+
+        running.fail(self.audio_path, "stopped")
+        resumed = JobCheckpoints(str(self.jobs_dir))
+        self.assertEqual(resumed.start(self.audio_path, resume=True), [TRANSCRIBE_STAGE])
+
+    def test_unreadable_manifest_is_ignored(self):
+        checkpoints = JobCheckpoints(str(self.jobs_dir))
+        checkpoints.job_dir(self.digest).mkdir(parents=True)
+        (checkpoints.job_dir(self.digest) / "job.json").write_text("{", encoding="utf-8")
+        self.assertEqual(checkpoints.manifest(self.digest), {})
+
+
+class LayeredStageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.first = StageCache(str(Path(self._tmp.name) / "first"))
+        self.second = StageCache(str(Path(self._tmp.name) / "second"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_hit_in_a_later_layer_is_copied_into_earlier_layers(self):
+        self.second.put("abc", TRANSCRIBE_STAGE, {}, [1])
+        cache = LayeredStageCache(self.first, None, self.second)
+
+        self.assertEqual(cache.get("abc", TRANSCRIBE_STAGE, {}), [1])
+        self.assertEqual(self.first.get("abc", TRANSCRIBE_STAGE, {}), [1])
+        self.assertIsNone(cache.get("abc", DIARIZE_STAGE, {}))
+
+    def test_put_writes_every_layer(self):
+        LayeredStageCache(self.first, self.second).put("abc", DIARIZE_STAGE, {}, [2])
+        self.assertEqual(self.first.get("abc", DIARIZE_STAGE, {}), [2])
+        self.assertEqual(self.second.get("abc", DIARIZE_STAGE, {}), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
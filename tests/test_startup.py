@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+HEAVY_MODULES = ("torch", "whisperx", "pyannote.audio", "langchain_ollama", "langchain_openai", "langchain_core")
+
+# Runs an entry point's main() in a fresh interpreter and reports which heavy modules it imported
+_PROBE = """
+import json, sys
+sys.path.insert(0, {src!r})
+sys.argv = {argv!r}
+import {module}
+try:
+    {module}.main()
+    outcome = "returned"
+except SystemExit as e:
+    outcome = f"exit {{e.code}}"
+except ValueError as e:
+    outcome = f"ValueError: {{e}}"
+print(json.dumps({{"outcome": outcome, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(module: str, argv: list[str]) -> dict:
+    with tempfile.TemporaryDirectory() as cwd:
+        code = _PROBE.format(src=str(SRC_DIR), argv=[module, *argv], module=module, heavy=HEAVY_MODULES)
+        completed = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                                   timeout=120, env={"RESULTS_DIR": str(Path(cwd) / "results"), "PATH": ""})
+    if completed.returncode != 0:
+        raise AssertionError(completed.stderr)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class StartupTests(unittest.TestCase):
+    def test_cli_validates_arguments_without_loading_models(self):
+        report = _probe("main", ["--audio_path", "missing.wav", "--language", "xx"])
+        self.assertTrue(report["outcome"].startswith("ValueError: Unsupported language"), report["outcome"])
+        self.assertEqual(report["loaded"], [])
+
+    def test_help_does_not_load_models(self):
+        for module in ("main", "server"):
+            with self.subTest(module=module):
+                report = _probe(module, ["--help"])
+                self.assertEqual(report["outcome"], "exit 0")
+                self.assertEqual(report["loaded"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from src.voice.streaming import (SpeakerStitcher, owned_segments, shift_segments, stitch_window, validate_window,
+                                 window_offsets)
+
+
+class SpeakerStitcherTests(unittest.TestCase):
+    def test_first_window_gets_fresh_labels_in_time_order(self):
+        stitcher = SpeakerStitcher()
+        mapping = stitcher.map_window([(5.0, 6.0, "SPEAKER_00"), (0.0, 5.0, "SPEAKER_01")], 0.0, 0.0)
+        self.assertEqual(mapping, {"SPEAKER_01": "SPEAKER_00", "SPEAKER_00": "SPEAKER_01"})
+
+    def test_speakers_matched_through_overlap(self):
+        stitcher = SpeakerStitcher()
+        stitcher.map_window([(0.0, 9.0, "A"), (9.0, 10.0, "B")], 0.0, 0.0)
+        mapping = stitcher.map_window([(8.0, 9.0, "X"), (9.0, 12.0, "Y"), (12.0, 13.0, "Z")], 8.0, 10.0)
+        self.assertEqual(mapping, {"X": "SPEAKER_00", "Y": "SPEAKER_01", "Z": "SPEAKER_02"})
+
+    def test_matching_is_one_to_one(self):
+        stitcher = SpeakerStitcher()
+        stitcher.map_window([(0.0, 10.0, "A")], 0.0, 0.0)
+        mapping = stitcher.map_window([(8.0, 9.5, "X"), (9.5, 10.0, "Y")], 8.0, 10.0)
+        self.assertEqual(mapping, {"X": "SPEAKER_00", "Y": "SPEAKER_01"})
+
+
+class SegmentHelpersTests(unittest.TestCase):
+    def test_shift_segments_moves_words(self):
+        segments = [{"start": 1.0, "end": 2.0, "words": [{"start": 1.0, "end": 1.5}, {"word": "um"}]}]
+        shift_segments(segments, 10.0)
+        self.assertEqual(segments[0]["start"], 11.0)
+        self.assertEqual(segments[0]["words"][0], {"start": 11.0, "end": 11.5})
+        self.assertEqual(segments[0]["words"][1], {"word": "um"})
+
+    def test_owned_segments_uses_midpoint(self):
+        segments = [{"start": 0.0, "end": 2.0}, {"start": 8.5, "end": 9.5}, {"start": 9.5, "end": 10.0}]
+        self.assertEqual(owned_segments(segments, float("-inf"), 9.0), segments[:1])
+        self.assertEqual(owned_segments(segments, 9.0, float("inf")), segments[1:])
+
+    def test_validate_window(self):
+        validate_window(10, 4)
+        with self.assertRaises(ValueError):
+            validate_window(10, 5)
+        with self.assertRaises(ValueError):
+            validate_window(0, 0)
+
+    def test_window_offsets_cover_duration(self):
+        self.assertEqual(window_offsets(25.0, 10.0, 2.0), [0.0, 8.0, 16.0])
+        self.assertEqual(window_offsets(5.0, 10.0, 2.0), [0.0])
+
+    def test_stitch_window_splits_overlap_at_midpoint(self):
+        stitcher = SpeakerStitcher()
+        first = {"offset": 0.0, "is_last": False, "turns": [(0.0, 10.0, "A")],
+                 "segments": [{"start": 1.0, "end": 2.0, "speaker": "A"}, {"start": 8.5, "end": 9.5, "speaker": "A"}]}
+        second = {"offset": 8.0, "is_last": True, "turns": [(8.0, 12.0, "B")],
+                  "segments": [{"start": 8.5, "end": 9.5, "speaker": "B"}, {"start": 10.5, "end": 11.0, "speaker": "B"}]}
+
+        kept = stitch_window(stitcher, first, 10.0, 2.0) + stitch_window(stitcher, second, 10.0, 2.0)
+
+        self.assertEqual([(seg["start"], seg["speaker"]) for seg in kept],
+                         [(1.0, "SPEAKER_00"), (8.5, "SPEAKER_00"), (10.5, "SPEAKER_00")])
+
+
+if __name__ == "__main__":
+    unittest.main()
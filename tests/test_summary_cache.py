@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.llm.llm_module import LLMModule
+from src.llm.summary_cache import SummaryCache, summary_key
+from src.pipeline.metrics import RunMetrics
+
+
+class SummaryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp.name) / "cache"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_keying(self):
+        cache = SummaryCache(str(self.cache_dir))
+        key = summary_key("abc", model="m1", backend="ollama", language="en")
+        cache.put(key, "summary")
+
+        self.assertEqual(cache.get(key), "summary")
+        self.assertIsNone(cache.get(summary_key("abc", model="m2", backend="ollama", language="en")))
+        self.assertIsNone(cache.get(summary_key("abc", model="m1", backend="chatgpt", language="en")))
+
+    def test_expired_entries_are_misses(self):
+        cache = SummaryCache(str(self.cache_dir), ttl_seconds=60)
+        cache.put("k" * 64, "summary")
+        with patch("src.llm.summary_cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(cache.get("k" * 64))
+        self.assertEqual(cache.size_bytes(), 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = SummaryCache(str(self.cache_dir), max_size_mb=0.001)  # ~1 KB
+        cache.put("a" * 64, "x" * 400)
+        cache.put("b" * 64, "x" * 400)
+        past = time.time() - 100
+        os.utime(cache._entry_path("a" * 64), (past, past))
+        cache.put("c" * 64, "x" * 400)
+
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertIsNotNone(cache.get("b" * 64))
+        self.assertIsNotNone(cache.get("c" * 64))
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            SummaryCache(str(self.cache_dir), ttl_seconds=-1)
+
+
+class LLMModuleSummaryCacheTests(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"MODEL_TYPE": "ollama", "PROMPTS_DIR": "src/prompts"})
+        env.start()
+        self.addCleanup(env.stop)
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.calls = []
+
+    def _llm(self, model_name="test-model", **kwargs):
+        llm = LLMModule(model_name, summary_cache=SummaryCache(self._tmp.name), **kwargs)
+        llm.model = RunnableLambda(lambda prompt: self.calls.append(prompt) or AIMessage(content="summary"))
+        return llm
+
+    def test_repeat_request_skips_the_llm(self):
+        metrics = RunMetrics()
+        llm = self._llm(metrics=metrics)
+        transcript = "[00:00:00 -> 00:00:01] SPEAKER_00: Hello"
+
+        self.assertEqual(llm.summarize_transcript(transcript, "en"), "summary")
+        self.assertEqual(llm.summarize_transcript(transcript, "en"), "summary")
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(metrics.counters, {"summary_cache_miss": 1, "summary_cache_hit": 1})
+
+    def test_model_and_language_are_part_of_the_key(self):
+        transcript = "[00:00:00 -> 00:00:01] SPEAKER_00: Hello"
+        self._llm().summarize_transcript(transcript, "en")
+        self._llm().summarize_transcript(transcript, "ko")
+        self._llm("other-model").summarize_transcript(transcript, "en")
+
+        self.assertEqual(len(self.calls), 3)
+
+    def test_incremental_summary_is_shared_with_full_transcript(self):
+        blocks = [f"[00:00:0{i} -> 00:00:0{i}] SPEAKER_0{i % 2}: " + "word " * 30 for i in range(4)]
+        llm = self._llm(chunk_tokens=60)
+        llm.summarize_blocks(iter(blocks), "en")
+        calls = len(self.calls)
+
+        self.assertEqual(llm.summarize_transcript("\n\n".join(blocks), "en"), "summary")
+        self.assertEqual(len(self.calls), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.voice.formatting import format_transcript
+from src.voice.transcript_artifact import TranscriptArtifact, TranscriptArtifactBuilder
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "text": " Hello there", "speaker": "SPEAKER_00",
+     "words": [{"word": "Hello", "start": 0.1, "end": 0.6, "speaker": "SPEAKER_00"},
+               {"word": "there", "start": 0.7, "end": 1.4, "speaker": "SPEAKER_00"}]},
+    {"start": 1.5, "end": 2.0, "text": " again", "speaker": "SPEAKER_00",
+     "words": [{"word": "again", "start": 1.5, "end": 2.0, "speaker": "SPEAKER_00"}]},
+    {"start": 3661.25, "end": 3663.5, "text": " 안녕하세요", "speaker": "SPEAKER_01",
+     "words": [{"word": "안녕하세요"}]},
+    {"start": 3664.0, "end": 3665.0, "text": " unlabelled"},
+]
+
+
+class TranscriptArtifactTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "transcript.vst")
+
+    def test_round_trip_through_memory_mapped_file(self):
+        TranscriptArtifact.from_segments(SEGMENTS, "en").save(self.path)
+        artifact = TranscriptArtifact.load(self.path)
+
+        self.assertEqual(artifact.language, "en")
+        self.assertEqual(artifact.speakers, ["SPEAKER_00", "SPEAKER_01"])
+        self.assertEqual(artifact.word_count, 4)
+        self.assertFalse(artifact.arrays["segment_start"].flags.writeable)
+        segments = list(artifact.iter_segments(words=True))
+        self.assertEqual(segments[0], SEGMENTS[0])
+        self.assertEqual(segments[2]["words"], [{"word": "안녕하세요", "start": None, "end": None}])
+        self.assertNotIn("speaker", segments[3])
+        self.assertEqual(artifact.render_text(), format_transcript(SEGMENTS))
+
+    def test_empty_transcript(self):
+        TranscriptArtifact.from_segments([]).save(self.path)
+        artifact = TranscriptArtifact.load(self.path)
+        self.assertEqual(len(artifact), 0)
+        self.assertEqual(artifact.render_text(), "")
+
+    def test_builder_matches_from_segments(self):
+        builder = TranscriptArtifactBuilder()
+        for segment in SEGMENTS:
+            builder.add(segment)
+        built = builder.build()
+        for name, values in TranscriptArtifact.from_segments(SEGMENTS).arrays.items():
+            np.testing.assert_array_equal(built.arrays[name], values)
+
+    def test_segments_without_text_are_stored_empty(self):
+        artifact = TranscriptArtifact.from_segments(
+            [{"start": 0.0, "end": 0.5, "text": None, "words": None},
+             {"start": 0.5, "end": 1.0, "text": " ok", "words": [{"word": None, "start": 0.5, "end": 1.0}]}])
+
+        segments = list(artifact.iter_segments(words=True))
+        self.assertEqual([segment["text"] for segment in segments], ["", " ok"])
+        self.assertEqual(segments[1]["words"], [{"word": "", "start": 0.5, "end": 1.0}])
+
+    def test_subtitles_and_speaker_views(self):
+        artifact = TranscriptArtifact.from_segments(SEGMENTS).relabel({"SPEAKER_00": "Alice"})
+
+        srt = artifact.render_srt()
+        self.assertTrue(srt.startswith("1\n00:00:00,000 --> 00:00:01,500\nAlice: Hello there\n"))
+        self.assertIn("3\n01:01:01,250 --> 01:01:03,500\nSPEAKER_01: 안녕하세요\n", srt)
+        vtt = artifact.render_vtt()
+        self.assertTrue(vtt.startswith("WEBVTT\n"))
+        self.assertIn("00:00:01.500 --> 00:00:02.000\n<v Alice>again\n", vtt)
+        self.assertIn("01:01:04.000 --> 01:01:05.000\nunlabelled\n", vtt)
+        self.assertEqual(artifact.render_speakers()["Alice"],
+                         "[00:00:00 -> 00:00:01] Hello there\n[00:00:01 -> 00:00:02] again")
+
+    def test_rejects_other_files(self):
+        with open(self.path, "w") as f:
+            f.write("not an artifact")
+        with self.assertRaises(ValueError):
+            TranscriptArtifact.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src.voice.vad import SpeechMap, VadOptions, detect_speech, load_vad_model, speech_map, vad_options_from_env
+
+SR = 16000
+
+
+class FakeVad:
+    """Stands in for a WhisperX VAD model that reports fixed speech turns, in seconds."""
+
+    def __init__(self, *turns):
+        self.turns = list(turns)
+
+    @staticmethod
+    def preprocess_audio(audio):
+        return audio
+
+    def __call__(self, audio):
+        return self.turns
+
+    @staticmethod
+    def merge_chunks(turns, chunk_size, onset, offset):
+        return [{"start": start, "end": end, "segments": [(start, end)]} for start, end in turns]
+
+
+def _seconds(*regions):
+    return [(start / SR, end / SR) for start, end in regions]
+
+
+class DetectSpeechTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The pyannote segmentation weights ship with WhisperX, so no download or token is needed
+        cls.pyannote = load_vad_model(VadOptions(), "cpu")
+
+    def test_long_pauses_are_removed_and_short_ones_kept(self):
+        vad = FakeVad((2.0, 5.0), (5.5, 7.5), (13.5, 14.5))
+        regions = detect_speech(np.zeros(16 * SR, dtype=np.float32), vad, VadOptions(pad_seconds=0.0))
+        self.assertEqual(_seconds(*regions), [(2.0, 7.5), (13.5, 14.5)])
+
+    def test_padding_is_clipped_to_the_recording_and_bursts_dropped(self):
+        vad = FakeVad((0.0, 1.0), (3.0, 3.05))
+        regions = detect_speech(np.zeros(4 * SR, dtype=np.float32), vad, VadOptions(pad_seconds=0.5))
+        self.assertEqual(_seconds(*regions), [(0.0, 1.5)])
+
+    def test_empty_recording_has_no_speech(self):
+        self.assertEqual(detect_speech(np.zeros(0, dtype=np.float32), FakeVad((0.0, 1.0))), [])
+
+    def test_music_and_noise_are_not_speech(self):
+        t = np.arange(10 * SR) / SR
+        # Loud, sustained signals that an energy threshold would keep as speech
+        hold_music = 0.2 * sum(np.sin(2 * np.pi * frequency * t) for frequency in (262, 330, 392))
+        noise = np.random.default_rng(0).normal(0, 0.1, 10 * SR)
+        for name, audio in (("hold music", hold_music), ("noise", noise), ("silence", np.zeros(10 * SR))):
+            with self.subTest(signal=name):
+                self.assertEqual(detect_speech(audio.astype(np.float32), self.pyannote), [])
+
+    def test_options_from_env(self):
+        with patch.dict(os.environ, {"VAD_MIN_SILENCE_SECONDS": "2", "VAD_METHOD": "Silero", "VAD_ONSET": "0.6"}):
+            options = vad_options_from_env()
+        self.assertEqual((options.min_silence_seconds, options.method, options.onset), (2.0, "silero", 0.6))
+        for name, value in (("VAD_PAD_SECONDS", "-1"), ("VAD_METHOD", "energy"), ("VAD_ONSET", "1.5")):
+            with self.subTest(name=name), patch.dict(os.environ, {name: value}), self.assertRaises(ValueError):
+                vad_options_from_env()
+
+
+class SpeechMapTests(unittest.TestCase):
+    def test_trimmed_times_map_back_to_the_recording(self):
+        speech = SpeechMap([(2 * SR, 5 * SR), (10 * SR, 12 * SR)], 15 * SR)
+        self.assertEqual(speech.speech_seconds, 5.0)
+        self.assertEqual(speech.removed_seconds, 10.0)
+        self.assertEqual(speech.to_original(0.0), 2.0)
+        self.assertEqual(speech.to_original(3.0), 10.0)
+        # An end on the boundary belongs to the first region
+        self.assertEqual(speech.to_original(3.0, is_end=True), 5.0)
+        self.assertEqual(speech.to_original(4.5), 11.5)
+
+        segments = [{"start": 1.0, "end": 3.0, "words": [{"start": 3.0, "end": 4.0}]}]
+        speech.remap_segments(segments)
+        self.assertEqual((segments[0]["start"], segments[0]["end"]), (3.0, 5.0))
+        self.assertEqual(segments[0]["words"][0], {"start": 10.0, "end": 11.0})
+
+    def test_trim_keeps_only_speech(self):
+        audio = np.zeros(8 * SR, dtype=np.float32)
+        speech = speech_map(audio, FakeVad((3.0, 5.0)), VadOptions(pad_seconds=0.1))
+        trimmed = speech.trim(audio)
+        self.assertEqual(len(trimmed), speech.speech_samples)
+        self.assertAlmostEqual(len(trimmed) / SR, 2.2, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,18 @@
 import os
+import tempfile
 import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from unittest.mock import MagicMock, patch
 
+from src.pipeline.metrics import RunMetrics
 from src.voice import voice_module
-from src.voice.voice_module import format_timestamp, format_transcript
+from src.voice.model_pool import LOW_MEMORY_POLICY, ModelPool
+from src.voice.stage_cache import StageCache
+from src.voice.transcript_artifact import TranscriptArtifact
+from src.voice.voice_module import format_timestamp, format_transcript, iter_speaker_blocks
 
 
 class FormatTimestampTests(unittest.TestCase):
@@ -55,7 +64,44 @@ class FormatTranscriptTests(unittest.TestCase):
         self.assertEqual(result, "[00:00:00 -> 00:00:00] SPEAKER_00: Hello")
 
 
+class IterSpeakerBlocksTests(unittest.TestCase):
+    def test_block_is_yielded_when_next_speaker_starts(self):
+        consumed = []
+
+        def segments():
+            for seg in [{"speaker": "SPEAKER_00", "text": "Hello", "start": 0.0, "end": 1.0},
+                        {"speaker": "SPEAKER_00", "text": "again", "start": 1.0, "end": 2.0},
+                        {"speaker": "SPEAKER_01", "text": "Hi", "start": 2.0, "end": 3.0}]:
+                consumed.append(seg["text"])
+                yield seg
+
+        blocks = iter_speaker_blocks(segments())
+
+        self.assertEqual(next(blocks), "[00:00:00 -> 00:00:02] SPEAKER_00: Hello again")
+        self.assertEqual(consumed, ["Hello", "again", "Hi"])
+        self.assertEqual(list(blocks), ["[00:00:02 -> 00:00:03] SPEAKER_01: Hi"])
+
+    def test_joined_blocks_match_format_transcript(self):
+        segments = [{"speaker": f"SPEAKER_0{i // 2}", "text": f"t{i}", "start": i, "end": i + 1} for i in range(6)]
+        self.assertEqual("\n\n".join(iter_speaker_blocks(segments)), format_transcript(segments))
+
+    def test_segments_without_text_are_skipped_by_every_formatter(self):
+        segments = [{"speaker": "SPEAKER_00", "text": "Hello", "start": 0.0, "end": 1.0},
+                    {"speaker": "SPEAKER_01", "start": 1.0, "end": 2.0},
+                    {"speaker": "SPEAKER_01", "text": "  ", "start": 2.0, "end": 3.0},
+                    {"speaker": "SPEAKER_00", "text": "again", "start": 3.0, "end": 4.0}]
+        expected = "[00:00:00 -> 00:00:04] SPEAKER_00: Hello again"
+
+        self.assertEqual(format_transcript(segments), expected)
+        self.assertEqual("\n\n".join(iter_speaker_blocks(segments)), expected)
+        self.assertEqual(TranscriptArtifact.from_segments(segments).render_text(), expected)
+        self.assertEqual(format_transcript([{"speaker": "SPEAKER_00", "start": 0.0}]), "")
+
+
 class ParseSpeakersAndTranscriptTests(unittest.TestCase):
+    def setUp(self):
+        voice_module.get_model_pool().clear()
+
     @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
     @patch.object(voice_module.whisperx, "assign_word_speakers")
     @patch.object(voice_module.whisperx, "align")
@@ -104,6 +150,325 @@ class ParseSpeakersAndTranscriptTests(unittest.TestCase):
         )
         self.assertEqual(transcript, "[00:00:00 -> 00:00:01] SPEAKER_00: Hello")
 
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_models_are_loaded_once_across_calls(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        load_model.return_value.transcribe.return_value = {
+            "language": "en",
+            "segments": [{"text": "Hello"}],
+        }
+        load_audio.return_value = [0.0]
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": [{"text": "Hello"}]}
+        assign_word_speakers.return_value = {"segments": [{"speaker": "SPEAKER_00", "text": "Hello"}]}
+
+        pool = ModelPool()
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            for _ in range(2):
+                voice_module.parse_speakers_and_transcript(
+                    "audio.wav", "en", 1, 2, "hf-token", model_pool=pool
+                )
+
+        load_model.assert_called_once()
+        load_align_model.assert_called_once()
+        diarization_pipeline.assert_called_once()
+        self.assertEqual(len(pool), 3)
+
+        pool = ModelPool(policy=LOW_MEMORY_POLICY)
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            voice_module.parse_speakers_and_transcript(
+                "audio.wav", "en", 1, 2, "hf-token", model_pool=pool
+            )
+        self.assertEqual(len(pool), 0)
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_batch_runs_stage_wise_and_isolates_failures(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        calls = []
+        load_audio.side_effect = lambda path: [] if path == "empty.wav" else [0.0]
+        load_model.return_value.transcribe.side_effect = lambda audio, batch_size: calls.append("transcribe") or {
+            "language": "en", "segments": [{"text": "Hello"}]}
+        load_align_model.return_value = (MagicMock(), {})
+        align.side_effect = lambda *args, **kwargs: calls.append("align") or {"segments": [{"text": "Hello"}]}
+        assign_word_speakers.return_value = {"segments": [{"speaker": "SPEAKER_00", "text": "Hello"}]}
+
+        pool = ModelPool(policy=LOW_MEMORY_POLICY)
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            results = voice_module.parse_speakers_and_transcript_batch(
+                ["a.wav", "empty.wav", "b.wav"], "en", 1, 2, "hf-token", model_pool=pool
+            )
+
+        self.assertEqual(list(results), ["a.wav", "empty.wav", "b.wav"])
+        self.assertIsInstance(results["empty.wav"], ValueError)
+        self.assertEqual(results["a.wav"], "[00:00:00 -> 00:00:00] SPEAKER_00: Hello")
+        self.assertEqual(calls, ["transcribe", "transcribe", "align", "align"])
+        load_model.assert_called_once()
+        load_align_model.assert_called_once()
+        diarization_pipeline.assert_called_once()
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_stage_cache_skips_cached_stages(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        load_model.return_value.transcribe.return_value = {
+            "language": "en", "segments": [{"text": "Hello"}]}
+        load_audio.return_value = [0.0]
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": [{"text": "Hello", "start": 0.0, "end": 1.0}]}
+        assign_word_speakers.return_value = {
+            "segments": [{"speaker": "SPEAKER_00", "text": "Hello", "start": 0.0, "end": 1.0}]}
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            audio_path = Path(tmp) / "audio.wav"
+            audio_path.write_bytes(b"fake audio")
+            cache = StageCache(str(Path(tmp) / "cache"))
+
+            first = voice_module.parse_speakers_and_transcript(
+                str(audio_path), "en", 1, 2, "hf-token", model_pool=ModelPool(), stage_cache=cache)
+            second = voice_module.parse_speakers_and_transcript(
+                str(audio_path), "en", 1, 2, "hf-token", model_pool=ModelPool(), stage_cache=cache)
+            self.assertEqual(first, second)
+            load_audio.assert_called_once()
+            load_model.assert_called_once()
+
+            # Changing only the diarization bounds reuses the cached transcription and alignment
+            voice_module.parse_speakers_and_transcript(
+                str(audio_path), "en", 1, 3, "hf-token", model_pool=ModelPool(), stage_cache=cache)
+            load_model.assert_called_once()
+            align.assert_called_once()
+            self.assertEqual(diarization_pipeline.call_count, 2)
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module, "load_audio_window")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_streaming_stitches_windows_and_speakers(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio_window,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        sample_rate = voice_module.SAMPLE_RATE
+        load_audio_window.side_effect = lambda path, offset, duration: (
+            [0.0] * (10 * sample_rate) if offset == 0.0 else [0.0] * (5 * sample_rate))
+        load_model.return_value.transcribe.return_value = {"language": "en", "segments": []}
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": []}
+        # Window 2 (offset 8s) labels the same people with swapped local labels
+        diarization_pipeline.return_value.side_effect = [
+            pd.DataFrame([{"start": 0.0, "end": 9.0, "speaker": "SPEAKER_00"},
+                          {"start": 9.0, "end": 10.0, "speaker": "SPEAKER_01"}]),
+            pd.DataFrame([{"start": 0.0, "end": 1.0, "speaker": "SPEAKER_01"},
+                          {"start": 1.0, "end": 5.0, "speaker": "SPEAKER_00"}]),
+        ]
+        assign_word_speakers.side_effect = [
+            {"segments": [{"text": "a", "start": 0.0, "end": 4.0, "speaker": "SPEAKER_00"},
+                          {"text": "b", "start": 8.5, "end": 9.5, "speaker": "SPEAKER_01"}]},
+            {"segments": [{"text": "b", "start": 0.5, "end": 1.5, "speaker": "SPEAKER_00"},
+                          {"text": "c", "start": 2.0, "end": 4.0, "speaker": "SPEAKER_01"}]},
+        ]
+
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            segments = list(voice_module.iter_streaming_segments(
+                "long.wav", "en", 1, 2, "hf-token", model_pool=ModelPool(),
+                window_seconds=10, overlap_seconds=2))
+
+        self.assertEqual(
+            [(seg["text"], seg["speaker"], seg["start"], seg["end"]) for seg in segments],
+            [("a", "SPEAKER_00", 0.0, 4.0), ("b", "SPEAKER_01", 8.5, 9.5), ("c", "SPEAKER_00", 10.0, 12.0)])
+        self.assertEqual([call.args[1] for call in load_audio_window.call_args_list], [0.0, 8.0])
+        load_model.assert_called_once()
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_metrics_time_model_loads_and_stages(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        load_model.return_value.transcribe.return_value = {"language": "en", "segments": [{"text": "Hello"}]}
+        load_audio.return_value = [0.0] * (3 * voice_module.SAMPLE_RATE)
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": [{"text": "Hello"}]}
+        assign_word_speakers.return_value = {"segments": [{"speaker": "SPEAKER_00", "text": "Hello"}]}
+
+        metrics = RunMetrics()
+        pool = ModelPool()
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32"}):
+            for _ in range(2):
+                voice_module.parse_speakers_and_transcript(
+                    "audio.wav", "en", 1, 2, "hf-token", model_pool=pool, metrics=metrics)
+
+        summary = metrics.stage_summary()
+        for stage in ("decode", "transcribe", "align", "diarize"):
+            self.assertEqual(summary[stage]["count"], 2)
+            self.assertEqual(summary[stage]["audio_seconds"], 6.0)
+        for stage in ("load_whisper_model", "load_align_model", "load_diarization_model"):
+            self.assertEqual(summary[stage]["count"], 1)
+        self.assertEqual(metrics.values["compute_type"], "float32")
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_vad_trims_silence_and_keeps_recording_time(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        sr = voice_module.SAMPLE_RATE
+        # 5s non-speech, 2s speech, 5s non-speech, 2s speech
+        load_audio.return_value = np.zeros(14 * sr, dtype=np.float32)
+        vad_model = MagicMock(return_value=[(5.0, 7.0), (12.0, 14.0)])
+        vad_model.preprocess_audio.side_effect = lambda audio: audio
+        vad_model.merge_chunks.side_effect = lambda turns, chunk_size, onset, offset: [
+            {"start": turns[0][0], "end": turns[-1][1], "segments": turns}]
+        load_model.return_value.transcribe.return_value = {"language": "en", "segments": [{"text": "Hello"}]}
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": [{"text": "Hello"}]}
+        # Speech-only (trimmed) time: the first region is [0, 2), the second [2, 4)
+        assign_word_speakers.return_value = {"segments": [
+            {"speaker": "SPEAKER_00", "text": "Hello", "start": 0.5, "end": 1.5},
+            {"speaker": "SPEAKER_01", "text": "Hi", "start": 2.5, "end": 3.5}]}
+
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "float32", "VAD_PAD_SECONDS": "0"}), \
+                patch.object(voice_module, "load_vad_model", return_value=vad_model) as load_vad_model:
+            transcript = voice_module.parse_speakers_and_transcript(
+                "audio.wav", "en", 1, 2, "hf-token", model_pool=ModelPool(), vad=True)
+
+        self.assertEqual(load_vad_model.call_args.args[1], "cpu")
+
+        transcribed_audio = load_model.return_value.transcribe.call_args.args[0]
+        self.assertAlmostEqual(len(transcribed_audio) / sr, 4.0, delta=0.1)
+        self.assertIs(diarization_pipeline.return_value.call_args.args[0], transcribed_audio)
+        self.assertEqual(transcript, "[00:00:05 -> 00:00:06] SPEAKER_00: Hello\n\n"
+                                     "[00:00:12 -> 00:00:13] SPEAKER_01: Hi")
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    @patch.object(voice_module.whisperx, "assign_word_speakers")
+    @patch.object(voice_module.whisperx, "align")
+    @patch.object(voice_module.whisperx, "load_align_model")
+    @patch.object(voice_module.whisperx, "load_audio")
+    @patch.object(voice_module.whisperx, "load_model")
+    @patch.object(voice_module, "DiarizationPipeline")
+    def test_speaker_index_keeps_labels_stable_across_recordings(
+        self,
+        diarization_pipeline,
+        load_model,
+        load_audio,
+        load_align_model,
+        align,
+        assign_word_speakers,
+        _cuda_available,
+    ):
+        load_model.return_value.transcribe.return_value = {"language": "en", "segments": [{"text": "Hello"}]}
+        load_audio.return_value = [0.0]
+        load_align_model.return_value = (MagicMock(), {})
+        align.return_value = {"segments": [{"text": "Hello"}]}
+        assign_word_speakers.side_effect = lambda diarize_segments, result: {"segments": [
+            {"speaker": "SPEAKER_00", "text": "Hello", "start": 0.0, "end": 1.0},
+            {"speaker": "SPEAKER_01", "text": "Hi", "start": 1.0, "end": 2.0}]}
+        alice, bob = [1.0, 0.0, 0.1], [0.0, 1.0, 0.1]
+        # The diarization pipeline numbers the same two people differently in the second recording
+        diarization_pipeline.return_value.side_effect = [
+            (MagicMock(), {"SPEAKER_00": alice, "SPEAKER_01": bob}),
+            (MagicMock(), {"SPEAKER_00": bob, "SPEAKER_01": alice}),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {
+                "COMPUTE_TYPE": "float32", "SPEAKER_INDEX_PATH": os.path.join(tmp, "speakers.npz")}):
+            first, second = (voice_module.parse_speakers_and_transcript(
+                path, "en", 1, 2, "hf-token", model_pool=ModelPool()) for path in ("a.wav", "b.wav"))
+
+        self.assertTrue(diarization_pipeline.return_value.call_args.kwargs["return_embeddings"])
+        self.assertEqual(first, "[00:00:00 -> 00:00:01] SPEAKER_00: Hello\n\n[00:00:01 -> 00:00:02] SPEAKER_01: Hi")
+        self.assertEqual(second, "[00:00:00 -> 00:00:01] SPEAKER_01: Hello\n\n[00:00:01 -> 00:00:02] SPEAKER_00: Hi")
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    def test_streaming_cache_key_leaves_out_the_unused_speaker_index(self, _cuda_available):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {
+                "COMPUTE_TYPE": "float32", "SPEAKER_INDEX_PATH": os.path.join(tmp, "speakers.npz")}):
+            stages = voice_module.FileStages("en", 1, 2, "hf-token", model_pool=ModelPool())
+
+        self.assertIn("speaker_index", stages.diarize_params)
+        self.assertNotIn("speaker_index", stages.streaming_params(600, 15))
+
+    @patch.object(voice_module.torch.cuda, "is_available", return_value=False)
+    def test_cache_keys_leave_auto_runtime_options_unresolved(self, _cuda_available):
+        with patch.dict(os.environ, {"COMPUTE_TYPE": "auto", "BATCH_SIZE": "auto"}):
+            stages = voice_module.FileStages("en", 1, 2, "hf-token", model_pool=ModelPool(), device="cpu")
+            _, diarize_params = voice_module.stage_cache_params("en", 1, 2)
+
+        self.assertEqual(stages.compute_type, "int8")
+        self.assertEqual(stages.diarize_params, diarize_params)
+        self.assertEqual(diarize_params["compute_type"], "auto")
+
 
 if __name__ == "__main__":
     unittest.main()